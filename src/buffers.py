@@ -0,0 +1,85 @@
+import io
+from typing import Optional, Union
+
+
+class SharedBuffer(io.BufferedIOBase):
+    """
+    A read-only, seekable binary stream over a buffer that is owned elsewhere.
+
+    Several streams can be opened over the same buffer (see ``fork``), each with its own position,
+    so that the safety analysis and the unpickling read the same memory without copying it. Reads
+    only copy the requested bytes, and ``readinto`` lets the unpickler fill large ``bytes`` objects
+    straight from the shared buffer.
+    """
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        super().__init__()
+        self._data = data.obj if isinstance(data, memoryview) else data
+        self._view = memoryview(data).toreadonly()
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def fork(self) -> "SharedBuffer":
+        """
+        Opens a new stream over the same buffer, positioned at its start.
+
+        :rtype: SharedBuffer
+        """
+        return SharedBuffer(self._view)
+
+    def getbuffer(self) -> memoryview:
+        return memoryview(self._view)
+
+    def getvalue(self) -> bytes:
+        return self._data if isinstance(self._data, bytes) else self._view.tobytes()
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._pos = offset
+        return self._pos
+
+    def _end(self, size: Optional[int]) -> int:
+        if size is None or size < 0:
+            return len(self._view)
+        return min(self._pos + size, len(self._view))
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        end = self._end(size)
+        chunk = self._view[self._pos:end].tobytes()
+        self._pos = max(self._pos, end)
+        return chunk
+
+    read1 = read
+
+    def readinto(self, b) -> int:
+        target = memoryview(b).cast("B")
+        end = self._end(len(target))
+        n = max(end - self._pos, 0)
+        target[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    readinto1 = readinto
+
+    def readline(self, size: Optional[int] = -1) -> bytes:
+        newline = self._data.find(b"\n", self._pos)
+        end = len(self._view) if newline == -1 else newline + 1
+        if size is not None and size >= 0:
+            end = min(end, self._pos + size)
+        return self.read(end - self._pos)
+
+    def peek(self, size: int = 0) -> bytes:
+        return self._view[self._pos:self._end(max(size, 1))].tobytes()
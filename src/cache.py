@@ -0,0 +1,154 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+import config as cfg
+from exceptions import ExceptionLoadBudget, ExceptionSandboxFailure, ExceptionUnsafePickle
+
+# The verdicts of the files PickleLoader.load refuses (or fails to load), by the exception raised:
+_REFUSALS = {
+    ExceptionUnsafePickle: "UNSAFE",
+    ExceptionLoadBudget: "OVER_BUDGET",
+    ExceptionSandboxFailure: "KILLED",
+}
+
+# The nominal size counted for a refusal, which only keeps its verdict, exception type and message, so
+# that refused files take their share of the cache and get evicted like any other entry:
+_REFUSAL_NBYTES = 256
+
+
+class ByteBoundedCache:
+    """
+    A least-recently-used cache whose capacity is expressed in bytes rather than in entries.
+
+    Every entry is stored together with its (estimated) size; once the accumulated size exceeds
+    ``max_bytes`` the least recently used entries are evicted. Hits and misses are counted so the
+    effectiveness of the cache can be reported.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the value stored under ``key`` and marks it as the most recently used one.
+
+        :param key: The key to look up.
+        :type key: Hashable
+        :param default: The value returned when ``key`` is not cached.
+        :type default: Any
+        :return: The cached value, or ``default`` on a miss.
+        :rtype: Any
+        """
+        try:
+            value, _ = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any, nbytes: int) -> None:
+        """
+        Stores ``value`` under ``key``, evicting the least recently used entries until the cache
+        fits within ``max_bytes`` again. Values larger than the whole cache are not stored.
+
+        :param key: The key to store the value under.
+        :type key: Hashable
+        :param value: The value to cache.
+        :type value: Any
+        :param nbytes: The (estimated) size of the value in bytes.
+        :type nbytes: int
+        :return: None
+        """
+        self.pop(key)
+        if nbytes > self.max_bytes:
+            return
+        self._entries[key] = (value, nbytes)
+        self.total_bytes += nbytes
+        while self.total_bytes > self.max_bytes:
+            _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted_nbytes
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self.total_bytes -= entry[1]
+        return entry[0]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class LoadCache(ByteBoundedCache):
+    """
+    Caches the outcome of ``PickleLoader.load`` keyed by the SHA-256 digest of the uploaded bytes
+    and the ``allow_unsafe_file`` flag, so Streamlit reruns don't read, decompress, analyze and
+    unpickle the same upload again.
+
+    Both outcomes are cached: the loaded result together with its safety verdict, and the verdict
+    and message of the ``ExceptionUnsafePickle`` (or ``ExceptionLoadBudget``) raised for files that
+    were refused, or of the ``ExceptionSandboxFailure`` raised for those whose sandbox worker failed.
+    Refusals are raised again as new exceptions, so the cache never pins the traceback (and the
+    buffers of the loader frames) of the first attempt.
+    """
+
+    def load(self, loader) -> Tuple[Any, bool, bool]:
+        """
+        Returns the result of ``loader.load()``, serving it from the cache when the same content was
+        already loaded with the same ``allow_unsafe_file`` flag. Either way, ``loader.verdict`` is
+        set to the verdict of the content.
+
+        :param loader: The loader wrapping the uploaded file.
+        :type loader: PickleLoader
+        :return: The same tuple returned by ``PickleLoader.load``.
+        :rtype: Tuple[Any, bool, bool]
+        :raises ExceptionUnsafePickle: If the content was (or had previously been) refused.
+        :raises ExceptionLoadBudget: If the content was (or had previously been) found too expensive
+            to unpickle.
+        :raises ExceptionSandboxFailure: If the sandbox worker unpickling the content failed (this
+            time or before).
+        """
+        key = loader.cache_key
+        entry = self.get(key)
+        if entry is None:
+            try:
+                result = loader.load()
+            except tuple(_REFUSALS) as err:
+                message = str(err)
+                refusal = (cfg.VERDICTS[_REFUSALS[type(err)]], (type(err), message))
+                self.put(key, refusal, nbytes=_REFUSAL_NBYTES + len(message))
+                raise
+            entry = (loader.verdict, result)
+            self.put(key, entry, nbytes=loader.nbytes)
+
+        verdict, payload = entry
+        loader.verdict = verdict
+        if verdict in (cfg.VERDICTS[name] for name in _REFUSALS.values()):
+            error_type, message = payload
+            raise error_type(message)
+        return payload
+
+
+LOAD_CACHE = LoadCache(cfg.CONFIG["LOAD_CACHE_MAX_BYTES"])
@@ -0,0 +1,254 @@
+import argparse
+import functools
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, Iterator, List, Optional
+
+import config as cfg
+from exceptions import ExceptionLoadBudget, ExceptionSandboxFailure
+from handlers.registry import get_handler_registry
+from preview import StaticPreview, build_preview
+from telemetry import METRICS, trace
+from utils import PickleLoader, ExceptionUnsafePickle
+
+
+def summarize_object(obj: Any, multiple: bool = False) -> dict:
+    """
+    Builds a short, JSON-friendly summary of a loaded object: its type and, where they apply, its
+    shape, length and dtype, followed by the name of the handler the app would display it with and
+    the summary of that handler. Handlers summarize objects without importing Streamlit.
+
+    :param obj: The loaded object.
+    :type obj: Any
+    :param multiple: Whether the object stands for several pickled objects.
+    :type multiple: bool
+    :return: The summary.
+    :rtype: dict
+    """
+    summary = {"type": f"{type(obj).__module__}.{type(obj).__qualname__}", "multiple": multiple}
+    shape = getattr(obj, "shape", None)
+    if isinstance(shape, tuple):
+        summary["shape"] = list(shape)
+    dtype = getattr(obj, "dtype", None)
+    if dtype is not None:
+        summary["dtype"] = str(dtype)
+    try:
+        summary["length"] = len(obj)
+    except TypeError:
+        pass
+    handler = get_handler_registry().dispatch(obj)
+    if handler is not None:
+        summary["handler"] = handler.name
+        summary.update(handler.summarize(obj))
+    return summary
+
+
+def summarize_preview(preview: StaticPreview) -> dict:
+    """
+    Builds a short, JSON-friendly summary of the static preview of a refused file: the globals it
+    imports, the number of calls it makes and the size of its large payloads.
+
+    :param preview: The static preview.
+    :type preview: StaticPreview
+    :return: The summary.
+    :rtype: dict
+    """
+    return {
+        "imports": sorted(f"{module}.{name}" for module, name in preview.globals),
+        "calls": preview.call_count,
+        "payload_bytes": preview.payload_bytes,
+    }
+
+
+def scan_file(path: str, allow_unsafe_file: bool = False, timings: bool = False, memory: Optional[bool] = None) -> dict:
+    """
+    Loads a single file with PickleLoader and reports its safety verdict together with a summary of
+    its content. Files failing the safety checks are never unpickled unless ``allow_unsafe_file``
+    is set.
+
+    :param path: The path of the file to scan.
+    :type path: str
+    :param allow_unsafe_file: Whether files failing the safety checks may be unpickled anyway.
+    :type allow_unsafe_file: bool
+    :param timings: Whether to time the stages of the load even if telemetry isn't enabled in
+        ``config.CONFIG``.
+    :type timings: bool
+    :param memory: Whether to also profile the memory taken by each stage of the load and by the
+        loaded object, ``CONFIG["MEMORY_PROFILING"]`` by default.
+    :type memory: Optional[bool]
+    :return: A JSON-serializable record with the path, the verdict, the summary (or the error, or
+        the summary of the static preview of refused files) and the time spent on the file, plus the
+        trace record of the load (see ``telemetry.Trace.record``) if it was timed.
+    :rtype: dict
+    """
+    with trace(path, force=timings, publish=False, memory=memory) as current:
+        record = _scan_file(path, allow_unsafe_file)
+    if current is not None:
+        current.attributes["verdict"] = record["verdict"]
+        record["timings"] = current.record()
+    return record
+
+
+def _scan_file(path: str, allow_unsafe_file: bool) -> dict:
+    record = {"path": path}
+    start = time.perf_counter()
+    loader = None
+    try:
+        with open(path, "rb") as file:
+            loader = PickleLoader(file, allow_unsafe_file=allow_unsafe_file)
+            obj, multiple, _ = loader.load()
+        record["verdict"] = loader.verdict
+        record["summary"] = summarize_object(obj, multiple)
+    except ExceptionUnsafePickle:
+        record["verdict"] = cfg.VERDICTS["UNSAFE"]
+        record["preview"] = summarize_preview(build_preview(loader.buffer.getbuffer()))
+    except ExceptionLoadBudget as ex:
+        record["verdict"] = cfg.VERDICTS["OVER_BUDGET"]
+        record["error"] = str(ex)
+    except ExceptionSandboxFailure as ex:
+        record["verdict"] = cfg.VERDICTS["KILLED"]
+        record["error"] = str(ex)
+    except Exception as ex:
+        record["verdict"] = cfg.VERDICTS["ERROR"]
+        record["error"] = f"{type(ex).__name__}: {ex}"
+    record["seconds"] = round(time.perf_counter() - start, 6)
+    return record
+
+
+def _has_pickle_extension(path: str) -> bool:
+    return path.lower().endswith(tuple(cfg.UI["file_extensions"]))
+
+
+def iter_paths(targets: Iterable[str], recursive: bool = False) -> Iterator[str]:
+    """
+    Expands files, directories and glob patterns into the paths of the files to scan. Directories
+    contribute the files with one of the extensions accepted by the app; files and glob matches
+    are taken as they are.
+
+    :param targets: Files, directories or glob patterns.
+    :type targets: Iterable[str]
+    :param recursive: Whether directories are scanned recursively (and ``**`` matches in globs).
+    :type recursive: bool
+    :return: An iterator over the paths of the files to scan, without duplicates.
+    :rtype: Iterator[str]
+    """
+    seen = set()
+    for target in targets:
+        if os.path.isdir(target):
+            walker = os.walk(target) if recursive else [next(os.walk(target))]
+            candidates = (
+                os.path.join(root, name)
+                for root, _, names in walker
+                for name in sorted(names)
+                if _has_pickle_extension(name)
+            )
+        elif glob.has_magic(target):
+            candidates = sorted(glob.glob(target, recursive=recursive))
+        else:
+            candidates = [target]
+
+        for path in candidates:
+            if path not in seen and not os.path.isdir(path):
+                seen.add(path)
+                yield path
+
+
+def _published(records: Iterable[dict]) -> Iterator[dict]:
+    for record in records:
+        if "timings" in record:
+            METRICS.publish(record["timings"])
+        yield record
+
+
+def scan(
+    paths: List[str], workers: int = 1, allow_unsafe_file: bool = False, timings: bool = False,
+    memory: Optional[bool] = None,
+) -> Iterator[dict]:
+    """
+    Scans files, spreading them over a pool of ``workers`` processes when more than one worker is
+    requested. Records are yielded in the same order as ``paths``. The trace records of the loads
+    are published by the calling process, which aggregates the metrics of every worker.
+
+    :param paths: The paths of the files to scan.
+    :type paths: List[str]
+    :param workers: The number of worker processes.
+    :type workers: int
+    :param allow_unsafe_file: Whether files failing the safety checks may be unpickled anyway.
+    :type allow_unsafe_file: bool
+    :param timings: Whether to time the stages of each load even if telemetry isn't enabled.
+    :type timings: bool
+    :param memory: Whether to also profile memory, ``CONFIG["MEMORY_PROFILING"]`` by default.
+    :type memory: Optional[bool]
+    :return: An iterator over the scan records.
+    :rtype: Iterator[dict]
+    """
+    scan_one = functools.partial(scan_file, allow_unsafe_file=allow_unsafe_file, timings=timings, memory=memory)
+    if workers <= 1 or len(paths) <= 1:
+        yield from _published(map(scan_one, paths))
+        return
+
+    chunksize = max(1, min(cfg.CONFIG["CLI_MAX_CHUNKSIZE"], len(paths) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from _published(executor.map(scan_one, paths, chunksize=chunksize))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="picklevw",
+        description="Scans pickle files and prints a safety verdict and a summary for each one, "
+                    "as JSON lines.",
+    )
+    parser.add_argument("targets", nargs="+", help="files, directories or glob patterns to scan")
+    parser.add_argument(
+        "-r", "--recursive", action="store_true",
+        help="scan directories recursively and let '**' match any number of directories in globs",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=cfg.CONFIG["CLI_WORKERS"] or os.cpu_count() or 1,
+        help="number of worker processes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--timings", action="store_true",
+        help="time the stages of each load, add them to its line and export them to CONFIG['TELEMETRY_DIR']",
+    )
+    parser.add_argument(
+        "--memory", action="store_true",
+        help="also trace the memory peak of each stage and the deep size of each loaded object (implies --timings)",
+    )
+    parser.add_argument(
+        "--allow-unsafe", action="store_true",
+        help="unpickle files that fail the safety checks. WARNING: this may execute malicious code",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the ``picklevw`` command line interface.
+
+    :param argv: The command line arguments, ``sys.argv[1:]`` by default.
+    :type argv: Optional[List[str]]
+    :return: The exit status: 0 if every file was loaded, 1 if any file was refused (as unsafe or
+        over budget), killed in the sandbox or unreadable.
+    :rtype: int
+    """
+    args = build_parser().parse_args(argv)
+    paths = list(iter_paths(args.targets, recursive=args.recursive))
+    METRICS.role = "cli"  # Kept apart from the metrics of the app in the telemetry directory
+
+    status = 0
+    records = scan(
+        paths, workers=args.workers, allow_unsafe_file=args.allow_unsafe, timings=args.timings, memory=args.memory or None
+    )
+    for record in records:
+        if record["verdict"] in (
+            cfg.VERDICTS["UNSAFE"], cfg.VERDICTS["OVER_BUDGET"], cfg.VERDICTS["KILLED"], cfg.VERDICTS["ERROR"]
+        ):
+            status = 1
+        sys.stdout.write(json.dumps(record) + "\n")
+        sys.stdout.flush()
+    return status
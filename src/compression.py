@@ -0,0 +1,217 @@
+import importlib
+import zlib
+from typing import Callable, Iterator, NamedTuple, Optional, Union
+
+import config as cfg
+from buffers import SharedBuffer
+from exceptions import ExceptionDecompressionLimit, ExceptionMissingCodec
+
+CHUNK_SIZE = 1024 * 1024
+
+EOF_ERROR = "Compressed file ended before the end-of-stream marker was reached"
+
+
+def _import_codec_module(module: str, package: str):
+    """
+    Imports the module implementing a codec. Codecs are only imported once their magic bytes have
+    been seen, so that neither the standard library codecs nor the optional ones slow the startup.
+
+    :raises ExceptionMissingCodec: If the module belongs to an optional package that isn't installed.
+    """
+    try:
+        return importlib.import_module(module)
+    except ImportError as err:
+        raise ExceptionMissingCodec(cfg.MESSAGES["MISSING_CODEC"].format(package=package)) from err
+
+
+def iter_gzip_chunks(data: memoryview, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Decompresses gzip data incrementally, yielding chunks of at most ``chunk_size`` bytes. Files
+    made of several concatenated gzip members are decompressed member after member.
+
+    :param data: The compressed data.
+    :type data: memoryview
+    :param chunk_size: The maximum size of the input slices fed to zlib and of the yielded chunks.
+    :type chunk_size: int
+    :raises EOFError: If the data ends before the end of a gzip member.
+    :raises zlib.error: If the data is not valid gzip data.
+    :return: An iterator over the decompressed chunks.
+    :rtype: Iterator[bytes]
+    """
+    pos = 0
+    while pos < len(data):
+        decompressor = zlib.decompressobj(wbits=31)  # 16 + MAX_WBITS: expect a gzip header
+        while not decompressor.eof:
+            if decompressor.unconsumed_tail:
+                chunk = decompressor.decompress(decompressor.unconsumed_tail, chunk_size)
+            elif pos < len(data):
+                chunk = decompressor.decompress(data[pos:pos + chunk_size], chunk_size)
+                pos += min(chunk_size, len(data) - pos)
+            else:
+                chunk = decompressor.flush()
+                if not decompressor.eof:
+                    raise EOFError(EOF_ERROR)
+            if chunk:
+                yield chunk
+        # Whatever zlib read past the end of this member belongs to the next one:
+        pos -= len(decompressor.unused_data)
+
+
+def _iter_decompressor_chunks(
+    data: memoryview, new_decompressor: Callable, chunk_size: int
+) -> Iterator[bytes]:
+    """
+    Drives decompressor objects following the ``bz2``/``lzma`` protocol (``decompress(data,
+    max_length)``, ``needs_input``, ``eof``, ``unused_data``), starting a new one for each of the
+    concatenated streams found in the data.
+    """
+    pos = 0
+    while pos < len(data):
+        decompressor = new_decompressor()
+        while not decompressor.eof:
+            feed = b""
+            if decompressor.needs_input:
+                if pos >= len(data):
+                    raise EOFError(EOF_ERROR)
+                feed = data[pos:pos + chunk_size]
+                pos += len(feed)
+            chunk = decompressor.decompress(feed, chunk_size)
+            if chunk:
+                yield chunk
+        pos -= len(decompressor.unused_data or b"")  # lz4 reports None instead of b""
+
+
+def iter_bz2_chunks(data: memoryview, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    bz2 = _import_codec_module("bz2", "bz2")
+    return _iter_decompressor_chunks(data, bz2.BZ2Decompressor, chunk_size)
+
+
+def iter_xz_chunks(data: memoryview, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    lzma = _import_codec_module("lzma", "lzma")
+    return _iter_decompressor_chunks(
+        data, lambda: lzma.LZMADecompressor(format=lzma.FORMAT_XZ), chunk_size
+    )
+
+
+def iter_lzma_alone_chunks(data: memoryview, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    lzma = _import_codec_module("lzma", "lzma")
+    return _iter_decompressor_chunks(
+        data, lambda: lzma.LZMADecompressor(format=lzma.FORMAT_ALONE), chunk_size
+    )
+
+
+def iter_lz4_chunks(data: memoryview, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    lz4_frame = _import_codec_module("lz4.frame", "lz4")
+    return _iter_decompressor_chunks(data, lz4_frame.LZ4FrameDecompressor, chunk_size)
+
+
+def iter_zstd_chunks(data: memoryview, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    zstandard = _import_codec_module("zstandard", "zstandard")
+    reader = zstandard.ZstdDecompressor().stream_reader(data, read_across_frames=True)
+    with reader:
+        while chunk := reader.read(chunk_size):
+            yield chunk
+
+
+def iter_zip_chunks(data: memoryview, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Decompresses the pickle stored in a zip archive: the first member with a pickle extension, or
+    the first file of the archive otherwise.
+    """
+    zipfile = _import_codec_module("zipfile", "zipfile")
+    with zipfile.ZipFile(SharedBuffer(data)) as archive:
+        members = [info for info in archive.infolist() if not info.is_dir()]
+        if not members:
+            return
+        pickles = [info for info in members if info.filename.endswith((".pkl", ".pickle"))]
+        with archive.open((pickles or members)[0]) as member:
+            while chunk := member.read(chunk_size):
+                yield chunk
+
+
+class Codec(NamedTuple):
+    name: str
+    magic: bytes
+    iter_chunks: Callable[..., Iterator[bytes]]
+
+
+CODECS = (
+    Codec("gzip", b"\x1f\x8b", iter_gzip_chunks),
+    Codec("bz2", b"BZh", iter_bz2_chunks),
+    Codec("xz", b"\xfd7zXZ\x00", iter_xz_chunks),
+    Codec("lzma", b"\x5d\x00\x00", iter_lzma_alone_chunks),  # Legacy .lzma, never a valid pickle start
+    Codec("zstd", b"\x28\xb5\x2f\xfd", iter_zstd_chunks),
+    Codec("lz4", b"\x04\x22\x4d\x18", iter_lz4_chunks),
+    Codec("zip", b"PK\x03\x04", iter_zip_chunks),
+)
+
+
+def detect_codec(data: Union[bytes, bytearray, memoryview]) -> Optional[Codec]:
+    """
+    Detects the compression format of some data from its magic bytes.
+
+    :param data: The (possibly compressed) data.
+    :type data: Union[bytes, bytearray, memoryview]
+    :return: The codec whose magic bytes start the data, or None for uncompressed data.
+    :rtype: Optional[Codec]
+    """
+    head = bytes(data[:8])
+    for codec in CODECS:
+        if head.startswith(codec.magic):
+            return codec
+    return None
+
+
+def decompress_capped(
+    data: Union[bytes, bytearray, memoryview],
+    codec: Optional[Codec] = None,
+    max_size: int = None,
+    max_ratio: float = None,
+) -> bytearray:
+    """
+    Streams compressed data into a growable buffer, failing as soon as the expanded content grows
+    beyond the configured limits, so that a decompression bomb is stopped before it exhausts the
+    memory.
+
+    The expanded size is capped by ``max_size`` and by ``max_ratio`` times the compressed size. The
+    ratio limit is only enforced above ``CONFIG["RATIO_CHECK_MIN_BYTES"]``, since small, highly
+    compressible pickles are harmless.
+
+    :param data: The compressed data.
+    :type data: Union[bytes, bytearray, memoryview]
+    :param codec: The codec to decompress the data with, detected from the data by default.
+    :type codec: Optional[Codec]
+    :param max_size: The maximum expanded size, ``CONFIG["MAX_DECOMPRESSED_BYTES"]`` by default.
+    :type max_size: int
+    :param max_ratio: The maximum compression ratio, ``CONFIG["MAX_COMPRESSION_RATIO"]`` by default.
+    :type max_ratio: float
+    :raises ValueError: If the codec isn't given and the data isn't compressed.
+    :raises ExceptionMissingCodec: If the codec needs an optional package that isn't installed.
+    :raises ExceptionDecompressionLimit: If the expanded content exceeds one of the limits.
+    :return: The decompressed content.
+    :rtype: bytearray
+    """
+    max_size = cfg.CONFIG["MAX_DECOMPRESSED_BYTES"] if max_size is None else max_size
+    max_ratio = cfg.CONFIG["MAX_COMPRESSION_RATIO"] if max_ratio is None else max_ratio
+    view = memoryview(data)
+    codec = codec or detect_codec(view)
+    if codec is None:
+        raise ValueError("The data isn't compressed with any of the supported codecs.")
+    ratio_limit = max(int(len(view) * max_ratio), cfg.CONFIG["RATIO_CHECK_MIN_BYTES"])
+
+    out = bytearray()
+    for chunk in codec.iter_chunks(view):
+        out += chunk
+        if len(out) > max_size:
+            raise ExceptionDecompressionLimit(
+                cfg.MESSAGES["DECOMPRESSION_LIMIT"].format(
+                    reason=f"more than {max_size} bytes", setting="MAX_DECOMPRESSED_BYTES"
+                )
+            )
+        if len(out) > ratio_limit:
+            raise ExceptionDecompressionLimit(
+                cfg.MESSAGES["DECOMPRESSION_LIMIT"].format(
+                    reason=f"a compression ratio above {max_ratio}", setting="MAX_COMPRESSION_RATIO"
+                )
+            )
+    return out
@@ -3,7 +3,9 @@ UI = {
     "icon": "🥒",
     "layout": "wide",
     "logo_size": "large",
-    "file_extensions": [".pkl", ".pickle", ".gz", ".pt", ".pth"],
+    "file_extensions": [
+        ".pkl", ".pickle", ".gz", ".bz2", ".xz", ".lzma", ".zst", ".lz4", ".zip", ".pt", ".pth"
+    ],
     "PICKLE_DOCS_URL": "https://docs.python.org/3/library/pickle.html",
 }
 
@@ -16,8 +18,9 @@ MESSAGES = {
         <span class="is-badge" style="background-color: rgba(128, 132, 149, 0.1); color: rgb(85, 88, 103); font-size: 1rem; padding-left: 0.4375rem; padding-right: 0.4375rem; border-radius: 0.4375rem; font-weight: bold;">{version}</span>
         """
     ),
-    "UPLOAD_PROMPT": "Upload a Pickle (.pkl, .pickle) or Gzip-Pickle (.gz) File",
+    "UPLOAD_PROMPT": "Upload a Pickle (.pkl, .pickle) or a compressed Pickle (.gz, .bz2, .xz, .lzma, .zst, .lz4, .zip) File",
     "GENERIC_LOAD_ERROR": "picklevw could not read the content of this file.",
+    "ANALYSIS_ERROR": "picklevw could not analyze the opcodes of this file.",
     "NOT_JSON_WARNING": "The object is not JSON serializable and is not a DataFrame.",
     "UNSAFE_WARNING": "⚠️ You have enabled loading of potentially unsafe content. Malicious code might be executed.",
     "row_col_summary": "Pandas DataFrame with **{rows}** rows and **{cols}** columns",
@@ -25,6 +28,51 @@ MESSAGES = {
     "TOGGLER_TEXT": "Bypass safety checks (unsafe, but necessary for libraries like NumPy, Pandas, etc.)",
     "CONTENT_DISPLAY": "**Content**",
     "CHART": "**Chart**",
+    "PAGE_SIZE": "Rows per page",
+    "PAGE_NUMBER": "Page (of {pages})",
+    "PAGE_CAPTION": "Rows {first}-{last} of {rows}",
+    "ROWS_CAPPED": "Only the first {max_rows} rows can be browsed. Raise `CONFIG[\"DF_MAX_ROWS\"]` in `src/config.py` and run picklevw locally to browse more.",
+    "CHART_DOWNSAMPLED": "Chart downsampled from {points} to {shown} points ({mode}).",
+    "NDARRAY_SUMMARY": "min = **{min}**, max = **{max}**, mean = **{mean}**, NaN count = **{nans}**",
+    "NDARRAY_EMPTY": "This array is empty: there is no slice to display.",
+    "NDARRAY_ROWS_AXIS": "Rows axis",
+    "NDARRAY_COLS_AXIS": "Columns axis",
+    "NDARRAY_INDEX": "Index along axis {axis} (size {size})",
+    "GALLERY_SUMMARY": "Image batch: **{count}** images of {height}x{width} pixels, {channels} channel(s)",
+    "GALLERY_LABEL": "label {label}",
+    "GALLERY_AS_SLICES": "Browse as slices instead of images",
+    "TREE_ROOT": "root",
+    "TREE_NODE": "{kind}, {size}",
+    "TREE_CHILDREN": "{kind} of {count}",
+    "TREE_OPEN": "Open",
+    "TREE_EXPORT": "Export as JSON",
+    "TREE_DOWNLOAD": "Download JSON",
+    "STREAM_SUMMARY": "Stream of **{count:,}** pickled objects",
+    "STREAM_OBJECT": "Object {position:,}",
+    "STREAM_UNREADABLE": "Could not unpickle this object: {error}",
+    "STREAM_INSPECT": "Object to inspect",
+    "DISASSEMBLY_TITLE": "Opcodes",
+    "DISASSEMBLY_FILTER": "Only show opcodes that",
+    "DISASSEMBLY_SUMMARY": "**{shown:,}** of **{count:,}** opcodes",
+    "DISASSEMBLY_ERROR": "The data could not be disassembled past offset {end:,}: {error}",
+    "PREVIEW_TITLE": "Static preview",
+    "PREVIEW_CAPTION": "Built from the opcodes alone: nothing was imported, called or unpickled.",
+    "PREVIEW_GLOBALS": "Imports **{count:,}** globals",
+    "PREVIEW_CALLS": "Makes **{count:,}** calls",
+    "PREVIEW_PAYLOADS": "Holds **{count:,}** payloads of at least {min_size}, **{size}** in total",
+    "PREVIEW_ERROR": "The preview is incomplete: {error}",
+    "JSON_TRUNCATED": "Only the first {chars} characters are displayed. Raise `CONFIG[\"JSON_MAX_CHARS\"]` in `src/config.py` and run picklevw locally to display more.",
+    "CACHE_STATS": "Load cache: {entries} entries, {bytes} / {max_bytes} bytes, {hits} hits, {misses} misses",
+    "TIMINGS_TITLE": "Timings",
+    "TIMINGS_CAPTION": "**{seconds:.3f} s** in total. Nested stages are included in the time of the stage they run in.",
+    "MEMORY_CAPTION": "Python allocated up to **{peak}** more than before loading. The loaded object takes {bound}**{size}** ({nodes:,} objects walked).",
+    "DECOMPRESSION_LIMIT": "Stopped decompressing: this file expands to {reason}, which might be a decompression bomb. If you trust this file, raise `CONFIG[\"{setting}\"]` in `src/config.py` and run picklevw locally.",
+    "LOAD_BUDGET": "Stopped loading: unpickling this file would take {reason}, beyond what this server allows for a single file. If you trust this file, raise `CONFIG[\"{setting}\"]` in `src/config.py` and run picklevw locally.",
+    "SANDBOX_LIMIT": "Stopped loading: the process unpickling this file was stopped after {reason}. If you trust this file, raise `CONFIG[\"{setting}\"]` in `src/config.py` and run picklevw locally.",
+    "SANDBOX_CRASHED": "Stopped loading: the process unpickling this file {reason}.",
+    "SANDBOX_RESULT": "Stopped loading: the object unpickled from this file can't be handed back from the process that unpickled it ({reason}).",
+    "SANDBOX_BUSY": "Every process unpickling files is busy. Try again in a moment.",
+    "MISSING_CODEC": "This file is compressed with a format that needs the optional `{package}` package. Install it with `pip install {package}` and run picklevw locally.",
     "POTENTIAL_THREAT":  "Stopped loading: a file with 3rd party libraries (like NumPy or Pandas) or a potential **threat** have been detected in this file. If you trust this pickle, clone the code for picklevw on your computer, then open the pickle locally by setting `CONFIG.disable_allow_unsafe=False` in `src/config.py`.",
 }
 
@@ -34,4 +82,63 @@ CONFIG = {
     "allow_unsafe": False, # This is represented by the "Bypass safety checks" toggle button's state
     "SEVERITY_THRESHOLD": 1,
     "DEBUG_MODE": False,
+    "LOAD_CACHE_MAX_BYTES": 1024 ** 3,  # Upper bound for the decompressed size of all cached loads
+    "MAX_DECOMPRESSED_BYTES": 4 * 1024 ** 3,  # Compressed uploads can't expand beyond this size
+    "MAX_COMPRESSION_RATIO": 200,  # ...nor beyond this many times their compressed size,
+    "RATIO_CHECK_MIN_BYTES": 64 * 1024 ** 2,  # ...once they expand beyond this size
+    "VERDICT_STORE_DIR": "~/.cache/picklevw",  # Where Fickling verdicts persist, None to disable the store
+    "VERDICT_STORE_MAX_ENTRIES": 100_000,  # Least recently used verdicts beyond this count are pruned
+    "VERDICT_STORE_MAX_BYTES": 1024 ** 4,  # ...and so are those beyond this total size of the files they cover
+    "VERDICT_STORE_TIMEOUT": 5.0,  # Seconds to wait for a store locked by another process
+    "DF_PAGINATE_ROWS": 10_000,  # DataFrames and Series longer than this are displayed one page at a time
+    "DF_PAGE_SIZES": (100, 1_000, 10_000),  # Page sizes to choose from, the first one is the default
+    "DF_MAX_ROWS": 10_000_000,  # Rows beyond this position can't be paged to
+    "PAGE_CACHE_MAX_BYTES": 256 * 1024 ** 2,  # Upper bound for the Arrow-serialized pages kept around
+    "CHART_MAX_POINTS": 5_000,  # Longer lines are downsampled to about this many points before charting
+    "CHART_DOWNSAMPLING": "lttb",  # "lttb" (Largest-Triangle-Three-Buckets) or "minmax" (min/max envelope)
+    "GALLERY_PAGE_SIZE": 60,  # Images per page of the gallery
+    "GALLERY_THUMBNAIL_SIZE": 96,  # Width of the thumbnails, larger images are subsampled down to about this size
+    "TREE_MIN_NODES": 10_000,  # Containers with at least this many nodes are explored as a tree rather than as JSON
+    "TREE_PAGE_SIZE": 50,  # Children listed per page of a tree node
+    "TREE_SIZE_NODES": 1_000,  # Nodes walked to estimate the size of each child listed
+    "STREAM_PAGE_SIZE": 20,  # Objects unpickled and listed per page of a stream of concatenated pickles
+    "DISASSEMBLY_PAGE_SIZE": 200,  # Opcodes listed per page of the disassembly
+    "DISASSEMBLY_ARG_BYTES": 64,  # Longer opcode arguments are not decoded, only their first bytes are shown
+    "OPCODE_INDEX_CACHE_MAX_BYTES": 1024 ** 3,  # Upper bound for the opcode indexes (and the data they index) kept around
+    "PREVIEW_MAX_OPCODES": 5_000_000,  # The static preview of a pickle stops after running this many opcodes
+    "PREVIEW_MAX_ITEMS": 20,  # Items kept per container (and arguments per call) in the static preview
+    "PREVIEW_MAX_ENTRIES": 1_000,  # Calls and payloads listed in the static preview
+    "PREVIEW_PAYLOAD_BYTES": 1024,  # Byte and string arguments at least this large are listed as payloads
+    "PREVIEW_CACHE_MAX_BYTES": 256 * 1024 ** 2,  # Upper bound for the static previews kept around
+    "PREVIEW_MAX_DEPTH": 6,  # Nodes deeper than this aren't expanded in the outline of the static preview
+    "PREVIEW_MAX_LINES": 500,  # The outline of the static preview is cut after this many lines
+    "JSON_MAX_CHARS": 1_000_000,  # JSON views are cut after this many characters
+    "LOAD_BUDGET_BYTES": 2 * 1024 ** 3,  # Files whose unpickled objects are estimated to take more memory than this aren't unpickled
+    "LOAD_MAX_DEPTH": 10_000,  # ...nor are files whose containers are nested deeper than this
+    "LOAD_OVER_BUDGET": "preview",  # What to show for such files: "preview" (their static preview) or "refuse" (nothing)
+    "SANDBOX_WORKERS": 2,  # Worker processes unpickling the files loaded with the bypass, 0 to unpickle them in the server process
+    "SANDBOX_START_METHOD": "forkserver",  # How workers are started: "forkserver" forks them from a process that imported SANDBOX_PRELOAD
+    "SANDBOX_PRELOAD": ("numpy", "pandas"),  # Modules imported once, before any worker is forked
+    "SANDBOX_JOB_TIMEOUT": 60.0,  # Seconds a worker may take to unpickle a file (or an object of a stream) before it is killed
+    "SANDBOX_JOB_CPU_SECONDS": 60,  # CPU seconds a worker may spend on a single file or object (RLIMIT_CPU)
+    "SANDBOX_MAX_MEMORY_BYTES": 4 * 1024 ** 3,  # Memory a worker may map beyond what it maps once started (RLIMIT_AS)
+    "SANDBOX_MAX_JOBS": 50,  # Workers are replaced by new ones after this many files or objects
+    "CLI_WORKERS": None,  # Worker processes used by the command line interface, None for one per CPU
+    "CLI_MAX_CHUNKSIZE": 16,  # Upper bound for the number of files handed to a worker at once
+    "SUMMARY_MAX_COLUMNS": 20,  # DataFrame columns named in the summaries printed by the command line interface
+    "TELEMETRY": False,  # Time the stages of each load (always done in DEBUG_MODE)
+    "TELEMETRY_DIR": "~/.cache/picklevw",  # Where timings are exported as JSON lines and Prometheus metrics, None to disable
+    "TELEMETRY_BUCKETS": (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),  # Histogram buckets, in seconds
+    "MEMORY_PROFILING": False,  # Also trace the memory peaks of each stage and the deep size of the loaded object (slow)
+    "DEEP_SIZE_NODES": 1_000_000,  # Upper bound for the objects walked to measure the deep size of a loaded object
+}
+
+VERDICTS = {
+    "SAFE": "safe",  # Passed the safety checks
+    "ALLOWLISTED": "allowlisted",  # Only imports allowlisted NumPy/pandas reconstructors
+    "BYPASSED": "bypassed",  # Failed the safety checks, loaded because the bypass is enabled
+    "UNSAFE": "unsafe",  # Failed the safety checks, refused
+    "OVER_BUDGET": "over_budget",  # Expected to take more memory than the load budget allows, refused
+    "KILLED": "killed",  # Loaded because the bypass is enabled, but its sandbox worker hit its limits, crashed or built a non-allowlisted object
+    "ERROR": "error",  # Could not be read at all
 }
@@ -2,3 +2,27 @@ class ExceptionUnsafePickle(Exception):
     """Exception raised when a pickle file is determined to be unsafe for loading."""
 
     pass
+
+
+class ExceptionDecompressionLimit(Exception):
+    """Exception raised when a compressed file expands beyond the configured limits."""
+
+    pass
+
+
+class ExceptionMissingCodec(Exception):
+    """Exception raised when a file is compressed with a codec whose optional package is missing."""
+
+    pass
+
+
+class ExceptionLoadBudget(Exception):
+    """Exception raised when unpickling a file is expected to take more than the configured budget."""
+
+    pass
+
+
+class ExceptionSandboxFailure(Exception):
+    """Exception raised when the worker process unpickling a file hits its limits or crashes."""
+
+    pass
@@ -1,3 +1,16 @@
-from .numpy_handlers import handle_streamlit_ndarray
-from .pandas_handlers import handle_streamlit_df, handle_streamlit_pd_series
-from .builtin_handlers import handle_streamlit_none, handle_streamlit_json
\ No newline at end of file
+from lazy import deferred
+
+# The handlers are only imported when first called, so that importing the package doesn't pull in
+# pandas, NumPy and pyarrow before an object that needs them is displayed:
+handle_streamlit_ndarray = deferred(".numpy_handlers", "handle_streamlit_ndarray", __name__)
+handle_streamlit_image_batch = deferred(".numpy_handlers", "handle_streamlit_image_batch", __name__)
+handle_streamlit_df = deferred(".pandas_handlers", "handle_streamlit_df", __name__)
+handle_streamlit_pd_series = deferred(".pandas_handlers", "handle_streamlit_pd_series", __name__)
+handle_streamlit_none = deferred(".builtin_handlers", "handle_streamlit_none", __name__)
+handle_streamlit_json = deferred(".builtin_handlers", "handle_streamlit_json", __name__)
+handle_streamlit_tree = deferred(".tree_handlers", "handle_streamlit_tree", __name__)
+should_explore = deferred(".tree_handlers", "should_explore", __name__)
+handle_streamlit_object_stream = deferred(".stream_handlers", "handle_streamlit_object_stream", __name__)
+handle_streamlit_disassembly = deferred(".disassembly_handlers", "handle_streamlit_disassembly", __name__)
+handle_streamlit_preview = deferred(".preview_handlers", "handle_streamlit_preview", __name__)
+handle_streamlit_timings = deferred(".timing_handlers", "handle_streamlit_timings", __name__)
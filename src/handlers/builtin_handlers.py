@@ -1,8 +1,6 @@
-import json
-import re
-
 import streamlit as st
 import config as cfg
+from utils import serialize_json
 
 
 def handle_streamlit_none():
@@ -10,7 +8,9 @@ def handle_streamlit_none():
 
 
 def handle_streamlit_json(obj, were_spared_objs):
-    formatted = json.dumps(obj, indent=4)
-    if were_spared_objs:
-        formatted = re.sub(r'^"(.*)"$', r"\1", formatted)
+    formatted, truncated = serialize_json(obj)
+    if were_spared_objs and formatted.startswith('"'):
+        formatted = formatted[1:] if truncated else formatted[1:-1]
     st.code(formatted, language="json")
+    if truncated:
+        st.caption(cfg.MESSAGES["JSON_TRUNCATED"].format(chars=len(formatted)))
@@ -0,0 +1,146 @@
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+import config as cfg
+
+DOWNSAMPLING_MODES = {
+    "lttb": "Largest-Triangle-Three-Buckets",
+    "minmax": "min/max envelope",
+}
+
+ChartData = Union[np.ndarray, pd.Series, pd.DataFrame]
+
+
+def _buckets(values: np.ndarray, buckets: int, fill: float) -> np.ndarray:
+    """
+    Splits ``values`` into ``buckets`` rows of equal width, padding the last row with ``fill``.
+    """
+    width = -(-len(values) // buckets)
+    padded = np.full(width * buckets, fill, dtype=np.float64)
+    padded[:len(values)] = values
+    return padded.reshape(buckets, width)
+
+
+def lttb_indices(values: np.ndarray, points: int) -> np.ndarray:
+    """
+    Selects the positions of the points that best preserve the shape of a line, following the
+    Largest-Triangle-Three-Buckets algorithm. The first and last points are always kept; every
+    bucket in between contributes the point forming the largest triangle with the centroids of the
+    previous and of the next bucket.
+
+    Anchoring triangles on the previous centroid rather than on the previously selected point is
+    what lets every bucket be processed at once, without a Python-level loop.
+
+    :param values: The values of the line, one per position.
+    :type values: np.ndarray
+    :param points: The number of points to keep.
+    :type points: int
+    :return: The sorted positions of the points to keep.
+    :rtype: np.ndarray
+    """
+    n = len(values)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    y = np.asarray(values, dtype=np.float64)
+    inner = y[1:-1]
+    width = -(-len(inner) // (points - 2))
+    buckets = -(-len(inner) // width)
+    y_rows = _buckets(inner, buckets, np.nan)
+    x_rows = _buckets(np.arange(1, n - 1, dtype=np.float64), buckets, np.nan)
+
+    # Centroids of every bucket, flanked by the first and last points:
+    counts = np.count_nonzero(~np.isnan(x_rows), axis=1)
+    x_centroids = np.concatenate(([0.0], np.nansum(x_rows, axis=1) / counts, [n - 1.0]))
+    y_centroids = np.concatenate(([y[0]], np.nansum(y_rows, axis=1) / counts, [y[-1]]))
+    x_prev, y_prev = x_centroids[:-2, None], y_centroids[:-2, None]
+    x_next, y_next = x_centroids[2:, None], y_centroids[2:, None]
+
+    areas = np.abs((x_prev - x_next) * (y_rows - y_prev) - (x_prev - x_rows) * (y_next - y_prev))
+    areas[np.isnan(areas)] = -1.0  # Padding and missing values are only picked in empty buckets
+    selected = 1 + np.arange(buckets) * width + np.argmax(areas, axis=1)
+    return np.concatenate(([0], selected[selected < n - 1], [n - 1]))
+
+
+def minmax_indices(values: np.ndarray, points: int) -> np.ndarray:
+    """
+    Selects the positions of the minimum and of the maximum of each bucket, so that the chart keeps
+    the envelope of the line, spikes included.
+
+    :param values: The values of the line, one per position.
+    :type values: np.ndarray
+    :param points: The number of points to keep.
+    :type points: int
+    :return: The sorted positions of the points to keep.
+    :rtype: np.ndarray
+    """
+    n = len(values)
+    if points >= n or points < 2:
+        return np.arange(n)
+
+    y = np.asarray(values, dtype=np.float64)
+    width = -(-n // (points // 2))
+    buckets = -(-n // width)
+    starts = np.arange(buckets) * width
+    lows = starts + np.argmin(_buckets(np.where(np.isnan(y), np.inf, y), buckets, np.inf), axis=1)
+    highs = starts + np.argmax(_buckets(np.where(np.isnan(y), -np.inf, y), buckets, -np.inf), axis=1)
+    return np.unique(np.concatenate((lows, highs)))
+
+
+_SELECTORS = {"lttb": lttb_indices, "minmax": minmax_indices}
+
+
+def _as_float_columns(data: ChartData) -> np.ndarray:
+    if isinstance(data, (pd.Series, pd.DataFrame)):
+        values = data.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        values = np.asarray(data, dtype=np.float64)
+    return values.reshape(len(values), -1)
+
+
+def downsample_for_chart(
+    data: ChartData,
+    max_points: Optional[int] = None,
+    mode: Optional[str] = None,
+) -> Tuple[ChartData, Optional[str]]:
+    """
+    Reduces a line chart to at most ``max_points`` points per line, so the browser doesn't receive
+    every point of a long series. Each column of a 2-D array or DataFrame is downsampled on its own
+    share of the budget; the chart keeps the union of the positions selected for every column.
+
+    Downsampled NumPy arrays are returned as pandas objects indexed by the original positions of the
+    points, so the x-axis of the chart is unaffected.
+
+    :param data: The 1-D or 2-D data to chart.
+    :type data: Union[np.ndarray, pd.Series, pd.DataFrame]
+    :param max_points: The point budget, ``CONFIG["CHART_MAX_POINTS"]`` by default.
+    :type max_points: Optional[int]
+    :param mode: ``"lttb"`` or ``"minmax"``, ``CONFIG["CHART_DOWNSAMPLING"]`` by default.
+    :type mode: Optional[str]
+    :return: The data to chart, and a caption describing the downsampling, or None if the data was
+        left untouched.
+    :rtype: Tuple[Union[np.ndarray, pd.Series, pd.DataFrame], Optional[str]]
+    """
+    max_points = max_points or cfg.CONFIG["CHART_MAX_POINTS"]
+    mode = mode or cfg.CONFIG["CHART_DOWNSAMPLING"]
+    if len(data) <= max_points:
+        return data, None
+
+    columns = _as_float_columns(data)
+    per_column = max(3, max_points // columns.shape[1])
+    select = _SELECTORS[mode]
+    positions = np.unique(np.concatenate([select(column, per_column) for column in columns.T]))
+
+    if isinstance(data, (pd.Series, pd.DataFrame)):
+        chart = data.iloc[positions]
+    elif data.ndim == 1:
+        chart = pd.Series(data[positions], index=positions)
+    else:
+        chart = pd.DataFrame(data[positions], index=positions)
+
+    caption = cfg.MESSAGES["CHART_DOWNSAMPLED"].format(
+        shown=len(positions), points=len(data), mode=DOWNSAMPLING_MODES[mode]
+    )
+    return chart, caption
@@ -0,0 +1,90 @@
+from typing import Callable, Iterable
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+import config as cfg
+from cache import ByteBoundedCache
+from opcodes import OPCODE_CLASSES, OpcodeIndex, build_opcode_index
+from telemetry import timed
+from .pagination import cached_for, page_bounds, to_arrow
+
+# The opcode indexes of the files disassembled, keyed by the digest of their content, so that
+# Streamlit reruns neither decompress nor index the same file again:
+OPCODE_INDEX_CACHE = ByteBoundedCache(cfg.CONFIG["OPCODE_INDEX_CACHE_MAX_BYTES"])
+
+
+def opcode_index_for(digest: str, data: Callable[[], memoryview]) -> OpcodeIndex:
+    """
+    Returns the opcode index of some pickle data, building it only if it isn't cached yet.
+
+    :param digest: The digest identifying the data.
+    :type digest: str
+    :param data: Returns the pickle data, only called when the index has to be built.
+    :type data: Callable[[], memoryview]
+    :rtype: OpcodeIndex
+    """
+    index = OPCODE_INDEX_CACHE.get(digest)
+    if index is None:
+        index = build_opcode_index(data())
+        OPCODE_INDEX_CACHE.put(digest, index, nbytes=index.nbytes)
+    return index
+
+
+def disassemble(index: OpcodeIndex, positions: Iterable[int]) -> pa.Table:
+    """
+    Disassembles some of the opcodes of an index, decoding their arguments.
+
+    :param index: The opcode index.
+    :type index: OpcodeIndex
+    :param positions: The positions of the opcodes in the index.
+    :type positions: Iterable[int]
+    :return: The offset (as the index), the name and the argument of each opcode.
+    :rtype: pa.Table
+    """
+    rows = [index.describe(int(position), cfg.CONFIG["DISASSEMBLY_ARG_BYTES"]) for position in positions]
+    frame = pd.DataFrame(rows, columns=["offset", "opcode", "argument"]).set_index("offset")
+    return to_arrow(frame)
+
+
+@timed("render.disassembly")
+def handle_streamlit_disassembly(digest: str, data: Callable[[], memoryview]) -> None:
+    """
+    Displays the opcodes of a pickle one page at a time, optionally only those that import
+    something, call something or use the memo. The file is indexed once, and only the opcodes of
+    the page on display are disassembled.
+
+    :param digest: The digest identifying the data.
+    :type digest: str
+    :param data: Returns the pickle data, only called when the data has to be indexed.
+    :type data: Callable[[], memoryview]
+    :return: None
+    """
+    index = opcode_index_for(digest, data)
+    with st.expander(cfg.MESSAGES["DISASSEMBLY_TITLE"], expanded=True):
+        classes = st.multiselect(cfg.MESSAGES["DISASSEMBLY_FILTER"], list(OPCODE_CLASSES), key="disassembly_classes")
+        positions = index.positions(classes)
+        st.write(cfg.MESSAGES["DISASSEMBLY_SUMMARY"].format(shown=len(positions), count=len(index)))
+
+        if len(positions):
+            page_size = cfg.CONFIG["DISASSEMBLY_PAGE_SIZE"]
+            pages = -(-len(positions) // page_size)
+            page = st.number_input(
+                cfg.MESSAGES["PAGE_NUMBER"].format(pages=pages),
+                min_value=1,
+                max_value=pages,
+                step=1,
+                key="disassembly_page",
+            )
+            start, stop = page_bounds(len(positions), page_size, int(page))
+            table = cached_for(
+                index,
+                ("disassembly", frozenset(classes), start, stop),
+                lambda: disassemble(index, positions[start:stop]),
+                nbytes=lambda value: value.nbytes,
+            )
+            st.dataframe(table)
+
+        if index.error:
+            st.warning(cfg.MESSAGES["DISASSEMBLY_ERROR"].format(end=index.end, error=index.error))
@@ -0,0 +1,172 @@
+import collections
+import itertools
+import reprlib
+from typing import Any, Tuple
+
+import config as cfg
+from lazy import imported
+from sizing import CONTAINERS, estimate_size, format_bytes
+from streams import PickleObjectStream
+
+# What the handlers need to pick and summarize objects without displaying them. Nothing here imports
+# Streamlit, so that the command line interface can use it too.
+
+
+class _Preview(reprlib.Repr):
+    """
+    A ``reprlib.Repr`` that only looks at the items it displays: the stock one sorts whole dicts and
+    sets, and falls back to the full ``repr`` of container subclasses.
+    """
+
+    def repr1(self, x: Any, level: int) -> str:
+        for base in CONTAINERS:
+            if isinstance(x, base) and type(x) is not base:
+                return f"{type(x).__name__}({getattr(self, 'repr_' + base.__name__)(x, level)})"
+        return super().repr1(x, level)
+
+    def repr_dict(self, x: dict, level: int) -> str:
+        return super().repr_dict(dict(itertools.islice(x.items(), self.maxdict + 1)), level)
+
+    def repr_set(self, x: set, level: int) -> str:
+        return super().repr_set(set(itertools.islice(x, self.maxset + 1)), level)
+
+    def repr_frozenset(self, x: frozenset, level: int) -> str:
+        return super().repr_frozenset(frozenset(itertools.islice(x, self.maxfrozenset + 1)), level)
+
+
+_PREVIEW = _Preview()
+_PREVIEW.maxstring = 120
+_PREVIEW.maxother = 120
+_PREVIEW.maxlist = _PREVIEW.maxtuple = _PREVIEW.maxdict = _PREVIEW.maxset = _PREVIEW.maxfrozenset = 5
+
+
+def should_explore(obj: Any) -> bool:
+    """
+    Whether a container is too large to be rendered as a whole and should be explored as a tree:
+    it holds at least ``CONFIG["TREE_MIN_NODES"]`` nodes. Counting stops at that many nodes.
+
+    :param obj: The object to display.
+    :type obj: Any
+    :rtype: bool
+    """
+    return isinstance(obj, CONTAINERS) and not estimate_size(obj, cfg.CONFIG["TREE_MIN_NODES"]).complete
+
+
+def is_image_batch(obj: Any) -> bool:
+    """
+    Whether an object is a batch of images, see ``numpy_image_batches.image_batch``. NumPy isn't
+    imported to tell: an object can only hold NumPy arrays once it is imported.
+
+    :param obj: The object to display.
+    :type obj: Any
+    :rtype: bool
+    """
+    if imported("numpy") is None:
+        return False
+    from .numpy_handlers.numpy_image_batches import image_batch
+
+    return image_batch(obj) is not None
+
+
+def describe(obj: Any) -> Tuple[str, str]:
+    """
+    Describes a node by its type (and number of children, for containers) and its estimated size,
+    walking at most ``CONFIG["TREE_SIZE_NODES"]`` nodes below it.
+
+    :param obj: The node to describe.
+    :type obj: Any
+    :return: The type and size descriptions.
+    :rtype: Tuple[str, str]
+    """
+    kind = type(obj).__name__
+    if isinstance(obj, CONTAINERS):
+        kind = cfg.MESSAGES["TREE_CHILDREN"].format(kind=kind, count=len(obj))
+    estimate = estimate_size(obj, cfg.CONFIG["TREE_SIZE_NODES"])
+    size = format_bytes(estimate.nbytes)
+    return kind, size if estimate.complete else f"≥ {size}"
+
+
+def summarize_stream(stream: PickleObjectStream) -> dict:
+    """
+    Summarizes a stream of concatenated pickles by its number of objects, none of which is unpickled.
+
+    :param stream: The stream.
+    :type stream: PickleObjectStream
+    :rtype: dict
+    """
+    return {"objects": len(stream)}
+
+
+def summarize_dataframe(frame: Any) -> dict:
+    """
+    Summarizes a DataFrame by the names of its first ``CONFIG["SUMMARY_MAX_COLUMNS"]`` columns and
+    the number of columns of each dtype.
+
+    :param frame: The DataFrame.
+    :type frame: pd.DataFrame
+    :rtype: dict
+    """
+    return {
+        "columns": [str(column) for column in frame.columns[:cfg.CONFIG["SUMMARY_MAX_COLUMNS"]]],
+        "dtypes": dict(collections.Counter(str(dtype) for dtype in frame.dtypes)),
+    }
+
+
+def summarize_series(series: Any) -> dict:
+    """
+    Summarizes a Series by its name.
+
+    :param series: The Series.
+    :type series: pd.Series
+    :rtype: dict
+    """
+    return {"name": None if series.name is None else str(series.name)}
+
+
+def summarize_ndarray(array: Any) -> dict:
+    """
+    Summarizes an array by the size of its data.
+
+    :param array: The array.
+    :type array: np.ndarray
+    :rtype: dict
+    """
+    return {"nbytes": int(array.nbytes)}
+
+
+def summarize_image_batch(batch: Any) -> dict:
+    """
+    Summarizes a batch of images by their number and dimensions.
+
+    :param batch: The batch, see ``numpy_image_batches.image_batch``.
+    :type batch: Any
+    :rtype: dict
+    """
+    from .numpy_handlers.numpy_image_batches import image_batch
+
+    images, height, width, channels = image_batch(batch).shape
+    return {"images": images, "height": height, "width": width, "channels": channels}
+
+
+def summarize_container(obj: Any) -> dict:
+    """
+    Summarizes a container by its estimated size, walking at most ``CONFIG["TREE_SIZE_NODES"]``
+    nodes.
+
+    :param obj: The container.
+    :type obj: Any
+    :rtype: dict
+    """
+    estimate = estimate_size(obj, cfg.CONFIG["TREE_SIZE_NODES"])
+    return {"estimated_bytes": estimate.nbytes, "estimate_complete": estimate.complete}
+
+
+def summarize_json(obj: Any) -> dict:
+    """
+    Summarizes a JSON serializable object by a short preview of its value.
+
+    :param obj: The object.
+    :type obj: Any
+    :rtype: dict
+    """
+    return {"preview": _PREVIEW.repr(obj)}
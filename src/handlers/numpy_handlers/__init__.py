@@ -1 +1,5 @@
-from .numpy_ndarray_handlers import handle_streamlit_ndarray
+from lazy import deferred
+
+# Deferred, so that importing numpy_image_batches doesn't import Streamlit:
+handle_streamlit_ndarray = deferred(".numpy_ndarray_handlers", "handle_streamlit_ndarray", __name__)
+handle_streamlit_image_batch = deferred(".numpy_image_handlers", "handle_streamlit_image_batch", __name__)
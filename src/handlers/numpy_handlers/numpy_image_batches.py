@@ -0,0 +1,44 @@
+from typing import Any, Optional
+
+import numpy as np
+
+CHANNELS = (1, 3, 4)  # Grayscale, RGB and RGBA
+
+
+def _get(batch: dict, key: str) -> Any:
+    # Batches pickled by Python 2 and loaded with ``encoding="bytes"`` have bytes keys:
+    return batch.get(key, batch.get(key.encode()))
+
+
+def image_batch(obj: Any) -> Optional[np.ndarray]:
+    """
+    Views a batch of images as an ``(N, H, W, C)`` array, without copying it. Supported batches are:
+
+    - ``(N, H, W, C)`` and ``(N, C, H, W)`` arrays, with 1, 3 or 4 channels;
+    - CIFAR-style dicts whose ``data`` key holds ``(N, C * S * S)`` rows of square, channel-major
+      images, e.g. ``(N, 3072)`` for 32x32 RGB images.
+
+    :param obj: The object to view as a batch of images.
+    :type obj: Any
+    :return: The ``(N, H, W, C)`` view, or None if the object isn't a batch of images.
+    :rtype: Optional[np.ndarray]
+    """
+    if isinstance(obj, dict):
+        data = _get(obj, "data")
+        if not isinstance(data, np.ndarray) or data.ndim not in (2, 4) or data.dtype.kind not in "uif":
+            return None
+        if data.ndim == 4:
+            return image_batch(data)
+        for channels in (3, 1):
+            side = int(round((data.shape[1] / channels) ** 0.5))
+            if side > 0 and channels * side * side == data.shape[1]:
+                return data.reshape(len(data), channels, side, side).transpose(0, 2, 3, 1)
+        return None
+
+    if not isinstance(obj, np.ndarray) or obj.ndim != 4 or obj.dtype.kind not in "uif":
+        return None
+    if obj.shape[3] in CHANNELS:
+        return obj
+    if obj.shape[1] in CHANNELS:
+        return obj.transpose(0, 2, 3, 1)
+    return None
@@ -0,0 +1,115 @@
+from typing import Any, List, Optional
+
+import numpy as np
+import streamlit as st
+
+import config as cfg
+from ..pagination import cached_for, page_bounds
+from .numpy_image_batches import _get, image_batch
+
+LABEL_KEYS = ("labels", "fine_labels", "coarse_labels")
+
+
+def image_captions(batch: Any, start: int, stop: int) -> Optional[List[str]]:
+    """
+    Builds the captions of the images ``start:stop`` of a batch from its ``labels`` (or CIFAR-100's
+    ``fine_labels``/``coarse_labels``) and ``filenames`` keys, when present.
+
+    :param batch: The batch of images.
+    :type batch: Any
+    :param start: The position of the first image.
+    :type start: int
+    :param stop: The position past the last image.
+    :type stop: int
+    :return: One caption per image, or None if the batch has neither labels nor filenames.
+    :rtype: Optional[List[str]]
+    """
+    if not isinstance(batch, dict):
+        return None
+    labels = next((_get(batch, key) for key in LABEL_KEYS if _get(batch, key) is not None), None)
+    filenames = _get(batch, "filenames")
+    if labels is None and filenames is None:
+        return None
+
+    captions = []
+    for position in range(start, stop):
+        parts = []
+        if filenames is not None:
+            filename = filenames[position]
+            parts.append(filename.decode(errors="replace") if isinstance(filename, bytes) else str(filename))
+        if labels is not None:
+            parts.append(cfg.MESSAGES["GALLERY_LABEL"].format(label=labels[position]))
+        captions.append(" · ".join(parts))
+    return captions
+
+
+def thumbnails(images: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """
+    Builds the ``uint8`` thumbnails of the images ``start:stop`` of an ``(N, H, W, C)`` batch. Images
+    larger than ``CONFIG["GALLERY_THUMBNAIL_SIZE"]`` are subsampled, and float images are scaled to
+    0-255 (from 0-1 if that's their range).
+
+    :param images: The batch of images.
+    :type images: np.ndarray
+    :param start: The position of the first image.
+    :type start: int
+    :param stop: The position past the last image.
+    :type stop: int
+    :return: The ``(stop - start, h, w, C)`` thumbnails, or ``(stop - start, h, w)`` ones for
+        grayscale images.
+    :rtype: np.ndarray
+    """
+    step = max(1, -(-max(images.shape[1:3]) // cfg.CONFIG["GALLERY_THUMBNAIL_SIZE"]))
+    page = images[start:stop, ::step, ::step]
+    if page.dtype != np.uint8:
+        page = page.astype(np.float64)
+        if page.size and np.nanmax(page) <= 1.0:
+            page *= 255.0
+        page = np.clip(np.nan_to_num(page), 0, 255).astype(np.uint8)
+    return page[..., 0] if page.shape[3] == 1 else np.ascontiguousarray(page)
+
+
+def render_gallery(batch: Any, images: np.ndarray) -> None:
+    """
+    Displays a batch of images as a grid, one page at a time. Only the thumbnails of the page on
+    display are built, and they are cached so that paging back doesn't build them again.
+
+    :param batch: The batch the images come from, for its labels and filenames.
+    :type batch: Any
+    :param images: The ``(N, H, W, C)`` view of the images, as returned by ``image_batch``.
+    :type images: np.ndarray
+    :return: None
+    """
+    count, height, width, channels = images.shape
+    st.write(cfg.MESSAGES["GALLERY_SUMMARY"].format(count=count, height=height, width=width, channels=channels))
+    if count == 0:
+        return
+
+    page_size = cfg.CONFIG["GALLERY_PAGE_SIZE"]
+    pages = -(-count // page_size)
+    page = st.number_input(
+        cfg.MESSAGES["PAGE_NUMBER"].format(pages=pages), min_value=1, max_value=pages, step=1, key="gallery_page"
+    )
+    start, stop = page_bounds(count, page_size, int(page))
+
+    # The images may be a view, so the cache is keyed by the array they were taken from:
+    owner = _get(batch, "data") if isinstance(batch, dict) else batch
+    page_thumbnails = cached_for(
+        owner,
+        ("thumbnails", start, stop),
+        lambda: thumbnails(images, start, stop),
+        nbytes=lambda value: value.nbytes,
+    )
+    st.image(
+        list(page_thumbnails),
+        caption=image_captions(batch, start, stop),
+        width=cfg.CONFIG["GALLERY_THUMBNAIL_SIZE"],
+    )
+
+
+def handle_streamlit_image_batch(obj: Any) -> None:
+    images = image_batch(obj)
+    if images is None:
+        st.warning(cfg.MESSAGES["NOT_JSON_WARNING"])
+        return
+    render_gallery(obj, images)
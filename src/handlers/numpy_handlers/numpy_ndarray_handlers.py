@@ -3,6 +3,9 @@ import numpy as np
 import pandas as pd
 
 import config as cfg
+from ..charting import downsample_for_chart
+from .numpy_image_handlers import image_batch, render_gallery
+from .numpy_ndarray_viewer import render_ndarray_slices
 
 
 def handle_streamlit_ndarray(obj: np.ndarray):
@@ -12,13 +15,26 @@ def handle_streamlit_ndarray(obj: np.ndarray):
         st.dataframe(pd.DataFrame(obj, columns=["Values"]))
         if np.issubdtype(obj.dtype, np.number):
             st.markdown(cfg.MESSAGES["CHART"])
-            st.line_chart(obj)
+            chart, caption = downsample_for_chart(obj)
+            st.line_chart(chart)
+            if caption:
+                st.caption(caption)
 
     elif obj.ndim == 2:
         st.dataframe(pd.DataFrame(obj))
         if np.issubdtype(obj.dtype, np.number):
             st.markdown(cfg.MESSAGES["CHART"])
-            st.line_chart(pd.DataFrame(obj))
+            chart, caption = downsample_for_chart(obj)
+            st.line_chart(pd.DataFrame(chart))
+            if caption:
+                st.caption(caption)
+
+    elif obj.ndim > 2:
+        images = image_batch(obj)
+        if images is not None and not st.toggle(cfg.MESSAGES["GALLERY_AS_SLICES"], key="ndarray_as_slices"):
+            render_gallery(obj, images)
+        else:
+            render_ndarray_slices(obj)
 
     else:
-        st.warning("NumPy array has more than 2 dimensions and cannot be displayed directly.")
+        st.warning("NumPy array has no dimensions and cannot be displayed directly.")
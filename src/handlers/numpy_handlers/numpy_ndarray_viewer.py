@@ -0,0 +1,101 @@
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+import config as cfg
+from ..pagination import cached_for, to_arrow
+
+
+def array_summary(obj: np.ndarray) -> Optional[dict]:
+    """
+    Computes the minimum, maximum, mean and NaN count of a whole numeric array with vectorized
+    reductions. The summary is cached, so it is only computed once per array.
+
+    :param obj: The array to summarize.
+    :type obj: np.ndarray
+    :return: The summary, or None if the array is empty or not made of real numbers.
+    :rtype: Optional[dict]
+    """
+    if obj.size == 0 or obj.dtype.kind not in "iuf":
+        return None
+
+    def build() -> dict:
+        nans = int(np.count_nonzero(np.isnan(obj))) if obj.dtype.kind == "f" else 0
+        if nans == obj.size:
+            return {"min": np.nan, "max": np.nan, "mean": np.nan, "nans": nans}
+        if nans:  # The nan* reductions copy the array, so they are only used when needed
+            return {"min": np.nanmin(obj), "max": np.nanmax(obj), "mean": np.nanmean(obj), "nans": nans}
+        return {"min": obj.min(), "max": obj.max(), "mean": obj.mean(), "nans": 0}
+
+    return cached_for(obj, "summary", build)
+
+
+def select_slice(obj: np.ndarray, rows_axis: int, cols_axis: int, index: Dict[int, int]) -> np.ndarray:
+    """
+    Selects the 2-D slice of an array spanned by two of its axes, at the given positions along the
+    other ones. The slice is a view: no data is copied.
+
+    :param obj: The array to slice.
+    :type obj: np.ndarray
+    :param rows_axis: The axis laid out along the rows of the slice.
+    :type rows_axis: int
+    :param cols_axis: The axis laid out along the columns of the slice.
+    :type cols_axis: int
+    :param index: The position along each of the other axes.
+    :type index: Dict[int, int]
+    :return: A view of the slice, with ``rows_axis`` first.
+    :rtype: np.ndarray
+    """
+    view = obj[tuple(slice(None) if axis in (rows_axis, cols_axis) else index[axis] for axis in range(obj.ndim))]
+    return view.T if rows_axis > cols_axis else view
+
+
+def render_ndarray_slices(obj: np.ndarray) -> None:
+    """
+    Displays an array with more than two dimensions one 2-D slice at a time: the user picks the two
+    axes to display and a position along each of the other ones. The Arrow table of every slice
+    displayed is cached, so going back to a slice doesn't serialize it again.
+
+    :param obj: The array to display.
+    :type obj: np.ndarray
+    :return: None
+    """
+    summary = array_summary(obj)
+    if summary is not None:
+        st.write(cfg.MESSAGES["NDARRAY_SUMMARY"].format(**summary))
+    if obj.size == 0:
+        st.warning(cfg.MESSAGES["NDARRAY_EMPTY"])
+        return
+
+    axes = list(range(obj.ndim))
+    rows_column, cols_column = st.columns(2)
+    rows_axis = rows_column.selectbox(
+        cfg.MESSAGES["NDARRAY_ROWS_AXIS"], axes, index=obj.ndim - 2, key="ndarray_rows_axis"
+    )
+    other_axes = [axis for axis in axes if axis != rows_axis]
+    cols_axis = cols_column.selectbox(
+        cfg.MESSAGES["NDARRAY_COLS_AXIS"], other_axes, index=len(other_axes) - 1, key="ndarray_cols_axis"
+    )
+
+    index = {}
+    for axis in axes:
+        if axis in (rows_axis, cols_axis):
+            continue
+        if obj.shape[axis] == 1:
+            index[axis] = 0  # Nothing to choose from
+            continue
+        index[axis] = st.slider(
+            cfg.MESSAGES["NDARRAY_INDEX"].format(axis=axis, size=obj.shape[axis]),
+            min_value=0,
+            max_value=obj.shape[axis] - 1,
+            key=f"ndarray_index_{axis}",
+        )
+
+    def build() -> pa.Table:
+        return to_arrow(pd.DataFrame(select_slice(obj, rows_axis, cols_axis, index)))
+
+    key = ("slice", rows_axis, cols_axis, tuple(sorted(index.items())))
+    st.dataframe(cached_for(obj, key, build, nbytes=lambda table: table.nbytes))
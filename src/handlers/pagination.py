@@ -0,0 +1,129 @@
+import weakref
+from typing import Any, Callable, Hashable, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+import config as cfg
+from cache import ByteBoundedCache
+from telemetry import timed
+
+# What was derived from the displayed objects to render them (e.g. the Arrow tables of the pages
+# already displayed), keyed by the identity of the object:
+PAGE_CACHE = ByteBoundedCache(cfg.CONFIG["PAGE_CACHE_MAX_BYTES"])
+
+
+def page_bounds(rows: int, page_size: int, page: int) -> Tuple[int, int]:
+    """
+    Returns the bounds of a page, clamping the page number to the pages available.
+
+    :param rows: The number of rows that can be paged through.
+    :type rows: int
+    :param page_size: The number of rows per page.
+    :type page_size: int
+    :param page: The 1-based page number.
+    :type page: int
+    :return: The ``(start, stop)`` row positions of the page.
+    :rtype: Tuple[int, int]
+    """
+    pages = max(1, -(-rows // page_size))
+    start = (min(max(page, 1), pages) - 1) * page_size
+    return start, min(start + page_size, rows)
+
+
+def cached_for(
+    obj: Any,
+    key: Hashable,
+    build: Callable[[], Any],
+    nbytes: Callable[[Any], int] = lambda value: 0,
+) -> Any:
+    """
+    Returns what ``build`` derives from ``obj``, caching it in ``PAGE_CACHE`` for as long as ``obj``
+    is alive, so that Streamlit reruns don't derive it again.
+
+    :param obj: The object the value is derived from. It must support weak references.
+    :type obj: Any
+    :param key: What identifies the value among those derived from ``obj``.
+    :type key: Hashable
+    :param build: Derives the value.
+    :type build: Callable[[], Any]
+    :param nbytes: Returns the (estimated) size of the value in bytes.
+    :type nbytes: Callable[[Any], int]
+    :return: The cached or freshly derived value.
+    :rtype: Any
+    """
+    cache_key = (id(obj), key)
+    entry = PAGE_CACHE.get(cache_key)
+    if entry is not None:
+        ref, value = entry
+        if ref() is obj:  # Not derived from an object that was collected and whose id was reused
+            return value
+
+    value = build()
+    PAGE_CACHE.put(cache_key, (weakref.ref(obj), value), nbytes=nbytes(value))
+    return value
+
+
+@timed("arrow")
+def to_arrow(frame: pd.DataFrame) -> pa.Table:
+    return pa.Table.from_pandas(frame, preserve_index=True)
+
+
+def serialize_page(obj: Union[pd.DataFrame, pd.Series], start: int, stop: int) -> pa.Table:
+    """
+    Serializes the rows ``start:stop`` of a DataFrame or Series to Arrow. Only the ``iloc`` view of
+    the page is converted, and the result is cached, so that paging back and forth doesn't
+    serialize the same rows twice.
+
+    :param obj: The DataFrame or Series to page through.
+    :type obj: Union[pd.DataFrame, pd.Series]
+    :param start: The position of the first row of the page.
+    :type start: int
+    :param stop: The position past the last row of the page.
+    :type stop: int
+    :return: The page, as an Arrow table.
+    :rtype: pa.Table
+    """
+    def build() -> pa.Table:
+        page = obj.iloc[start:stop]
+        return to_arrow(page.to_frame() if isinstance(page, pd.Series) else page)
+
+    return cached_for(obj, ("page", start, stop), build, nbytes=lambda table: table.nbytes)
+
+
+def render_paginated(obj: Union[pd.DataFrame, pd.Series], key: str) -> None:
+    """
+    Displays a DataFrame or Series one page at a time, with page size and page number controls.
+    Objects with at most ``CONFIG["DF_PAGINATE_ROWS"]`` rows are displayed whole, and no more than
+    ``CONFIG["DF_MAX_ROWS"]`` rows can be paged through.
+
+    :param obj: The DataFrame or Series to display.
+    :type obj: Union[pd.DataFrame, pd.Series]
+    :param key: The prefix of the keys of the paging widgets.
+    :type key: str
+    :return: None
+    """
+    if len(obj) <= cfg.CONFIG["DF_PAGINATE_ROWS"]:
+        st.dataframe(obj.to_frame() if isinstance(obj, pd.Series) else obj)
+        return
+
+    rows = min(len(obj), cfg.CONFIG["DF_MAX_ROWS"])
+    size_column, page_column = st.columns(2)
+    page_size = size_column.selectbox(
+        cfg.MESSAGES["PAGE_SIZE"], cfg.CONFIG["DF_PAGE_SIZES"], key=f"{key}_page_size"
+    )
+    pages = -(-rows // page_size)
+    page = page_column.number_input(
+        cfg.MESSAGES["PAGE_NUMBER"].format(pages=pages),
+        min_value=1,
+        max_value=pages,
+        step=1,
+        key=f"{key}_page",
+    )
+
+    start, stop = page_bounds(rows, page_size, int(page))
+    st.dataframe(serialize_page(obj, start, stop))
+    st.caption(cfg.MESSAGES["PAGE_CAPTION"].format(first=start + 1, last=stop, rows=len(obj)))
+    if rows < len(obj):
+        st.caption(cfg.MESSAGES["ROWS_CAPPED"].format(max_rows=rows))
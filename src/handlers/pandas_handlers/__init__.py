@@ -1,2 +1,4 @@
-from .pandas_dataframe_handlers import handle_streamlit_df
-from .pandas_series_handlers import handle_streamlit_pd_series
\ No newline at end of file
+from lazy import deferred
+
+handle_streamlit_df = deferred(".pandas_dataframe_handlers", "handle_streamlit_df", __name__)
+handle_streamlit_pd_series = deferred(".pandas_series_handlers", "handle_streamlit_pd_series", __name__)
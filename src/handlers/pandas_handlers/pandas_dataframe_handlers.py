@@ -1,8 +1,9 @@
 import streamlit as st
 
 import config as cfg
+from ..pagination import render_paginated
 
 
 def handle_streamlit_df(obj):
     st.write(cfg.MESSAGES["row_col_summary"].format(rows=len(obj), cols=len(obj.columns)))
-    st.dataframe(obj)
+    render_paginated(obj, key="df")
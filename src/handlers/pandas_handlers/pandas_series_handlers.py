@@ -2,11 +2,16 @@ import streamlit as st
 import pandas as pd
 
 import config as cfg
+from ..charting import downsample_for_chart
+from ..pagination import render_paginated
 
 
 def handle_streamlit_pd_series(obj):
     st.write(f"Pandas Series: **{obj.name or 'unnamed'}**, {len(obj)} elements")
-    st.dataframe(obj.to_frame())
+    render_paginated(obj, key="series")
     if pd.api.types.is_numeric_dtype(obj):
         st.markdown(cfg.MESSAGES["CHART"])
-        st.line_chart(obj)
+        chart, caption = downsample_for_chart(obj)
+        st.line_chart(chart)
+        if caption:
+            st.caption(caption)
@@ -0,0 +1,85 @@
+from typing import Callable
+
+import pandas as pd
+import streamlit as st
+
+import config as cfg
+from cache import ByteBoundedCache
+from preview import StaticPreview, build_preview
+from sizing import format_bytes
+from telemetry import timed
+
+# The static previews of the files displayed, keyed by the digest of their content. Unlike opcode
+# indexes, previews don't hold the data they were built from, so that files too large to be
+# unpickled can still be previewed:
+PREVIEW_CACHE = ByteBoundedCache(cfg.CONFIG["PREVIEW_CACHE_MAX_BYTES"])
+
+
+def static_preview_for(digest: str, data: Callable[[], memoryview]) -> StaticPreview:
+    """
+    Returns the static preview of some pickle data, building it only if it isn't cached yet.
+
+    :param digest: The digest identifying the data.
+    :type digest: str
+    :param data: Returns the pickle data, only called when the preview has to be built.
+    :type data: Callable[[], memoryview]
+    :rtype: StaticPreview
+    """
+    preview = PREVIEW_CACHE.get(digest)
+    if preview is None:
+        preview = build_preview(data())
+        PREVIEW_CACHE.put(digest, preview, nbytes=preview.nbytes)
+    return preview
+
+
+@timed("render.preview")
+def handle_streamlit_preview(digest: str, data: Callable[[], memoryview]) -> None:
+    """
+    Displays what a pickle would build without unpickling it: the outline of its structure, the
+    globals it imports, the calls it makes and the sizes of its large payloads.
+
+    :param digest: The digest identifying the data.
+    :type digest: str
+    :param data: Returns the pickle data, only called when the preview has to be built.
+    :type data: Callable[[], memoryview]
+    :return: None
+    """
+    preview = static_preview_for(digest, data)
+    with st.expander(cfg.MESSAGES["PREVIEW_TITLE"], expanded=True):
+        st.caption(cfg.MESSAGES["PREVIEW_CAPTION"])
+        st.code(
+            preview.outline(cfg.CONFIG["PREVIEW_MAX_DEPTH"], cfg.CONFIG["PREVIEW_MAX_LINES"]), language=None
+        )
+
+        if preview.globals:
+            st.write(cfg.MESSAGES["PREVIEW_GLOBALS"].format(count=len(preview.globals)))
+            st.dataframe(
+                pd.DataFrame(
+                    [(module, name, count) for (module, name), count in preview.globals.most_common()],
+                    columns=["module", "name", "imports"],
+                ),
+                hide_index=True,
+            )
+        if preview.calls:
+            st.write(cfg.MESSAGES["PREVIEW_CALLS"].format(count=preview.call_count))
+            st.dataframe(
+                pd.DataFrame(
+                    [(offset, node.inline()) for offset, node in preview.calls], columns=["offset", "call"]
+                ).set_index("offset")
+            )
+        if preview.payloads:
+            st.write(
+                cfg.MESSAGES["PREVIEW_PAYLOADS"].format(
+                    count=preview.payload_count,
+                    min_size=format_bytes(cfg.CONFIG["PREVIEW_PAYLOAD_BYTES"]),
+                    size=format_bytes(preview.payload_bytes),
+                )
+            )
+            st.dataframe(
+                pd.DataFrame(
+                    [(offset, opcode, format_bytes(size)) for offset, opcode, size in preview.payloads],
+                    columns=["offset", "opcode", "size"],
+                ).set_index("offset")
+            )
+        if preview.error:
+            st.warning(cfg.MESSAGES["PREVIEW_ERROR"].format(error=preview.error))
@@ -0,0 +1,255 @@
+import importlib
+import warnings
+import weakref
+from functools import lru_cache
+from importlib import metadata
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from lazy import imported
+from sizing import CONTAINERS
+from streams import PickleObjectStream
+from telemetry import span
+
+# The entry point group third-party packages list their handlers in: each entry point refers to a
+# ``Handler`` or to an iterable of them.
+ENTRY_POINT_GROUP = "picklevw.handlers"
+
+Target = Union[Callable, str]
+
+
+def resolve(target: Target) -> Callable:
+    """
+    Resolves a ``"module:name"`` reference to a function, importing its module if it isn't yet.
+    Modules starting with a dot are relative to this package. Callables are returned as they are.
+
+    :param target: The reference or the function.
+    :type target: Target
+    :rtype: Callable
+    """
+    if callable(target):
+        return target
+    module, _, name = target.partition(":")
+    return getattr(importlib.import_module(module, __package__), name)
+
+
+def _resolve_type(name: str) -> Optional[type]:
+    # An object can only be an instance of a class whose module was imported, so there is no need
+    # to import the module to resolve the class:
+    module, _, attribute = name.rpartition(".")
+    found = imported(module)
+    return getattr(found, attribute, None) if found is not None else None
+
+
+class Handler:
+    """
+    Displays the objects of some types with ``render``, which may import Streamlit and whatever the
+    display needs, and summarizes them with ``summarize``, which must stay cheap and must not import
+    Streamlit: the command line interface uses it.
+
+    Functions can be given as ``"module:name"`` references, so that their modules are only imported
+    when first called, and types as ``"module.Class"`` names, resolved once their module is imported.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        types: Iterable[Union[type, str]],
+        render: Target,
+        summarize: Optional[Target] = None,
+        accepts: Optional[Target] = None,
+        options: Tuple[str, ...] = (),
+    ):
+        """
+        :param name: The name of the handler, reported in summaries.
+        :type name: str
+        :param types: The types of the objects handled, subclasses included.
+        :type types: Iterable[Union[type, str]]
+        :param render: Displays an object. It is called with the object, followed by the values of the
+            ``options`` it takes.
+        :type render: Target
+        :param summarize: Returns a short, JSON-friendly dict describing an object, an empty one by default.
+        :type summarize: Optional[Target]
+        :param accepts: Whether an object of the ``types`` is handled, every one is by default. Handlers
+            registered for the same type are tried in turn, until one accepts the object.
+        :type accepts: Optional[Target]
+        :param options: The rendering options passed to ``render``, among ``were_spared_objs`` (whether
+            JSON is displayed unquoted) and ``display`` (renders another object, e.g. an item of the
+            object).
+        :type options: Tuple[str, ...]
+        """
+        self.name = name
+        self.types = tuple(types)
+        self.options = options
+        self._render = render
+        self._summarize = summarize
+        self._accepts = accepts
+
+    def __repr__(self) -> str:
+        return f"Handler({self.name!r})"
+
+    def accepts(self, obj: Any) -> bool:
+        """
+        :param obj: An object of one of the types of the handler.
+        :type obj: Any
+        :return: Whether the handler displays the object.
+        :rtype: bool
+        """
+        return self._accepts is None or bool(resolve(self._accepts)(obj))
+
+    def render(self, obj: Any, **options: Any) -> None:
+        """
+        Displays an object, timed as the ``render.<name>`` stage of the current trace.
+
+        :param obj: The object.
+        :type obj: Any
+        :param options: The values of the rendering options, see ``__init__``.
+        :type options: Any
+        :return: None
+        """
+        with span(f"render.{self.name}"):
+            resolve(self._render)(obj, *(options[option] for option in self.options))
+
+    def summarize(self, obj: Any) -> dict:
+        """
+        :param obj: The object.
+        :type obj: Any
+        :return: A short, JSON-friendly description of the object.
+        :rtype: dict
+        """
+        return resolve(self._summarize)(obj) if self._summarize is not None else {}
+
+
+class HandlerRegistry:
+    """
+    Maps types to the handlers of their objects. As with ``functools.singledispatch``, the handlers
+    of a type are those registered for the first of its classes, in method resolution order, to
+    have some. The handlers found for each type are cached, so an object is dispatched with a
+    dictionary lookup plus the ``accepts`` checks of its handlers.
+    """
+
+    def __init__(self):
+        self._registrations: List[Tuple[Union[type, str], Handler]] = []
+        self._unresolved: Set[str] = set()  # The modules of the type names, until they are imported
+        self._cache: "weakref.WeakKeyDictionary[type, List[Handler]]" = weakref.WeakKeyDictionary()
+
+    def register(self, handler: Handler) -> Handler:
+        """
+        Registers a handler for its types, after the handlers already registered for them.
+
+        :param handler: The handler.
+        :type handler: Handler
+        :return: The handler.
+        :rtype: Handler
+        """
+        for key in handler.types:
+            self._registrations.append((key, handler))
+            if isinstance(key, str):
+                self._unresolved.add(key.rpartition(".")[0])
+        self._cache.clear()
+        return handler
+
+    def load_entry_points(self, group: str = ENTRY_POINT_GROUP) -> None:
+        """
+        Registers the handlers third-party packages list in an entry point group. Packages whose
+        handlers can't be loaded are skipped with a warning.
+
+        :param group: The entry point group.
+        :type group: str
+        :return: None
+        """
+        for entry_point in metadata.entry_points(group=group):
+            try:
+                loaded = entry_point.load()
+                handlers = [loaded] if isinstance(loaded, Handler) else list(loaded)
+            except Exception as ex:
+                warnings.warn(f"Skipping the picklevw handlers of {entry_point.name!r}: {ex}")
+                continue
+            for handler in handlers:
+                self.register(handler)
+
+    def handlers_for(self, cls: type) -> List[Handler]:
+        """
+        :param cls: A type.
+        :type cls: type
+        :return: The handlers of the objects of the type, in the order they are tried.
+        :rtype: List[Handler]
+        """
+        if any(imported(module) is not None for module in self._unresolved):
+            self._cache.clear()  # Some type names can be resolved now
+            self._unresolved = {module for module in self._unresolved if imported(module) is None}
+        try:
+            return self._cache[cls]
+        except KeyError:
+            pass
+
+        by_class: Dict[type, List[Handler]] = {}
+        for key, handler in self._registrations:
+            registered = key if isinstance(key, type) else _resolve_type(key)
+            if registered is not None:
+                by_class.setdefault(registered, []).append(handler)
+        handlers = [handler for base in cls.__mro__ for handler in by_class.get(base, ())]
+        self._cache[cls] = handlers
+        return handlers
+
+    def dispatch(self, obj: Any) -> Optional[Handler]:
+        """
+        :param obj: An object to display.
+        :type obj: Any
+        :return: The first handler of its type to accept it, None if there is none.
+        :rtype: Optional[Handler]
+        """
+        for handler in self.handlers_for(type(obj)):
+            if handler.accepts(obj):
+                return handler
+        return None
+
+
+# Large containers are explored as a tree rather than serialized as a whole, and so are those that
+# aren't JSON serializable:
+BUILTIN_HANDLERS = (
+    Handler(
+        "object_stream", [PickleObjectStream], ".stream_handlers:handle_streamlit_object_stream",
+        summarize=".inspection:summarize_stream", options=("display",),
+    ),
+    Handler(
+        "dataframe", ["pandas.DataFrame"], ".pandas_handlers.pandas_dataframe_handlers:handle_streamlit_df",
+        summarize=".inspection:summarize_dataframe",
+    ),
+    Handler(
+        "series", ["pandas.Series"], ".pandas_handlers.pandas_series_handlers:handle_streamlit_pd_series",
+        summarize=".inspection:summarize_series",
+    ),
+    Handler(
+        "ndarray", ["numpy.ndarray"], ".numpy_handlers.numpy_ndarray_handlers:handle_streamlit_ndarray",
+        summarize=".inspection:summarize_ndarray",
+    ),
+    Handler(
+        "image_batch", [dict], ".numpy_handlers.numpy_image_handlers:handle_streamlit_image_batch",
+        summarize=".inspection:summarize_image_batch", accepts=".inspection:is_image_batch",
+    ),
+    Handler(
+        "tree", CONTAINERS, ".tree_handlers:handle_streamlit_tree",
+        summarize=".inspection:summarize_container", accepts=".inspection:should_explore",
+    ),
+    Handler(
+        "json", [dict, list, tuple, str, int, float, type(None)], ".builtin_handlers:handle_streamlit_json",
+        summarize=".inspection:summarize_json", accepts="utils:is_json_serializable", options=("were_spared_objs",),
+    ),
+    Handler("tree", CONTAINERS, ".tree_handlers:handle_streamlit_tree", summarize=".inspection:summarize_container"),
+)
+
+
+@lru_cache(maxsize=1)
+def get_handler_registry() -> HandlerRegistry:
+    """
+    Returns the registry used to display and summarize objects, built on first use: the handlers of
+    installed third-party packages come first, so that they take precedence over the built-in ones
+    for the same types.
+
+    :rtype: HandlerRegistry
+    """
+    registry = HandlerRegistry()
+    registry.load_entry_points()
+    for handler in BUILTIN_HANDLERS:
+        registry.register(handler)
+    return registry
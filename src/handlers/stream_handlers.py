@@ -0,0 +1,90 @@
+from typing import Any, Callable, List, NamedTuple
+
+import streamlit as st
+
+import config as cfg
+from sizing import estimate_size
+from streams import PickleObjectStream
+from .pagination import cached_for, page_bounds
+from .inspection import _PREVIEW
+
+
+class UnreadableObject(NamedTuple):
+    """
+    Stands for an object of a stream that could not be unpickled.
+
+    :ivar error: What was raised while unpickling it.
+    """
+    error: Exception
+
+
+def load_page(stream: PickleObjectStream, start: int, stop: int) -> List[Any]:
+    """
+    Unpickles the objects ``start:stop`` of a stream, and only those.
+
+    :param stream: The stream of objects.
+    :type stream: PickleObjectStream
+    :param start: The position of the first object.
+    :type start: int
+    :param stop: The position past the last object.
+    :type stop: int
+    :return: The objects, with an ``UnreadableObject`` in place of those that could not be
+        unpickled.
+    :rtype: List[Any]
+    """
+    objects = []
+    for position in range(start, stop):
+        try:
+            objects.append(stream[position])
+        except Exception as ex:
+            objects.append(UnreadableObject(ex))
+    return objects
+
+
+def _page_nbytes(objects: List[Any]) -> int:
+    return sum(estimate_size(obj, cfg.CONFIG["TREE_SIZE_NODES"]).nbytes for obj in objects)
+
+
+def handle_streamlit_object_stream(stream: PickleObjectStream, display: Callable[[Any], None]) -> None:
+    """
+    Displays a stream of concatenated pickles one page of objects at a time: only the objects of
+    the page on display are unpickled, and they are cached so that paging back doesn't unpickle
+    them again. One object of the page can be inspected in full.
+
+    :param stream: The stream of objects.
+    :type stream: PickleObjectStream
+    :param display: Displays the object picked for inspection.
+    :type display: Callable[[Any], None]
+    :return: None
+    """
+    count = len(stream)
+    st.write(cfg.MESSAGES["STREAM_SUMMARY"].format(count=count))
+    if count == 0:
+        return
+
+    page_size = cfg.CONFIG["STREAM_PAGE_SIZE"]
+    pages = -(-count // page_size)
+    page = st.number_input(
+        cfg.MESSAGES["PAGE_NUMBER"].format(pages=pages), min_value=1, max_value=pages, step=1, key="stream_page"
+    )
+    start, stop = page_bounds(count, page_size, int(page))
+    objects = cached_for(stream, ("objects", start, stop), lambda: load_page(stream, start, stop), nbytes=_page_nbytes)
+
+    for position, obj in enumerate(objects, start):
+        position_column, kind_column, value_column = st.columns([2, 2, 6])
+        position_column.write(cfg.MESSAGES["STREAM_OBJECT"].format(position=position))
+        if isinstance(obj, UnreadableObject):
+            value_column.error(cfg.MESSAGES["STREAM_UNREADABLE"].format(error=obj.error))
+            continue
+        kind_column.write(type(obj).__name__)
+        value_column.code(_PREVIEW.repr(obj), language=None)
+
+    selected = st.selectbox(
+        cfg.MESSAGES["STREAM_INSPECT"],
+        range(start, stop),
+        format_func=lambda position: cfg.MESSAGES["STREAM_OBJECT"].format(position=position),
+        key=f"stream_inspect_{start}",
+    )
+    obj = objects[selected - start]
+    if not isinstance(obj, UnreadableObject):
+        display(obj)
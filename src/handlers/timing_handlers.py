@@ -0,0 +1,54 @@
+import pandas as pd
+import streamlit as st
+
+import config as cfg
+from sizing import format_bytes
+from telemetry import Trace
+
+
+def timings_table(trace: Trace) -> pd.DataFrame:
+    """
+    Lists the spans of a trace in the order they were entered, nested stages being indented below
+    the stage they ran in.
+
+    :param trace: The trace.
+    :type trace: Trace
+    :return: The stage, start and duration of each span, in milliseconds, and if the trace profiles
+        memory, the peak of the memory allocated by Python and the growth of the resident set size.
+    :rtype: pd.DataFrame
+    """
+    table = pd.DataFrame(
+        [
+            (" " * span.depth + span.stage, round(span.start * 1000, 3), round(span.seconds * 1000, 3))
+            for span in trace.spans
+        ],
+        columns=["stage", "start (ms)", "duration (ms)"],
+    )
+    if trace.memory:
+        table["peak"] = [format_bytes(span.peak_bytes) for span in trace.spans]
+        table["RSS delta"] = [
+            None if span.rss_delta is None else format_bytes(span.rss_delta) for span in trace.spans
+        ]
+    return table
+
+
+def handle_streamlit_timings(trace: Trace) -> None:
+    """
+    Displays the time spent in each stage of loading and displaying a file so far, and if the trace
+    profiles memory, the memory each stage took and the deep size of the loaded object.
+
+    :param trace: The trace of the load.
+    :type trace: Trace
+    :return: None
+    """
+    with st.expander(cfg.MESSAGES["TIMINGS_TITLE"]):
+        st.caption(cfg.MESSAGES["TIMINGS_CAPTION"].format(seconds=trace.seconds))
+        size = trace.attributes.get("deep_size")
+        if size is not None:
+            st.caption(cfg.MESSAGES["MEMORY_CAPTION"].format(
+                peak=format_bytes(trace.peak_bytes),
+                bound="" if size["complete"] else "at least ",
+                size=format_bytes(size["nbytes"]),
+                nodes=size["nodes"],
+            ))
+        st.dataframe(timings_table(trace), hide_index=True)
@@ -0,0 +1,134 @@
+import itertools
+import json
+from typing import Any, Iterator, Tuple
+
+import streamlit as st
+
+import config as cfg
+from sizing import CONTAINERS
+from .inspection import _PREVIEW, describe, should_explore  # noqa: F401 (should_explore is re-exported)
+from .pagination import page_bounds
+
+
+def iter_children(node: Any, start: int, stop: int) -> Iterator[Tuple[Any, Any]]:
+    """
+    Iterates over the children ``start:stop`` of a container, without touching the others.
+
+    :param node: The container.
+    :type node: Any
+    :param start: The position of the first child.
+    :type start: int
+    :param stop: The position past the last child.
+    :type stop: int
+    :return: An iterator over ``(step, child)`` pairs, where ``step`` is the key of the child for
+        dicts and its position for the other containers.
+    :rtype: Iterator[Tuple[Any, Any]]
+    """
+    if isinstance(node, dict):
+        return itertools.islice(node.items(), start, stop)
+    if isinstance(node, (list, tuple)):
+        return enumerate(node[start:stop], start)
+    return itertools.islice(enumerate(node), start, stop)
+
+
+def resolve(root: Any, path: Tuple[Any, ...]) -> Any:
+    """
+    Follows a path of steps, as yielded by ``iter_children``, from the root of a tree.
+
+    :param root: The root of the tree.
+    :type root: Any
+    :param path: The steps to follow.
+    :type path: Tuple[Any, ...]
+    :return: The node the path leads to.
+    :rtype: Any
+    :raises LookupError: If the path doesn't lead anywhere in this tree.
+    """
+    node = root
+    for step in path:
+        if isinstance(node, (dict, list, tuple)):
+            node = node[step]
+        elif isinstance(node, (set, frozenset)) and 0 <= step < len(node):
+            node = next(itertools.islice(node, step, None))
+        else:
+            raise LookupError(step)
+    return node
+
+
+def _open(path: Tuple[Any, ...]) -> None:
+    st.session_state["tree_path"] = path
+
+
+def _render_breadcrumbs(path: Tuple[Any, ...]) -> None:
+    columns = st.columns(len(path) + 1)
+    columns[0].button(cfg.MESSAGES["TREE_ROOT"], key="tree_crumb_0", on_click=_open, args=((),))
+    for depth, step in enumerate(path, 1):
+        columns[depth].button(
+            _PREVIEW.repr(step), key=f"tree_crumb_{depth}", on_click=_open, args=(path[:depth],),
+        )
+
+
+def _render_export(node: Any) -> None:
+    if st.button(cfg.MESSAGES["TREE_EXPORT"], key="tree_export"):
+        st.download_button(
+            cfg.MESSAGES["TREE_DOWNLOAD"],
+            data=json.dumps(node, indent=4, default=repr),
+            file_name="picklevw_export.json",
+            mime="application/json",
+            key="tree_download",
+        )
+
+
+def handle_streamlit_tree(obj: Any) -> None:
+    """
+    Displays a container as a tree, one node at a time: only the children of the node the user
+    opened are rendered, a page at a time, each with its type, number of children and estimated
+    size. Nothing is serialized unless the user exports the node.
+
+    :param obj: The container to explore.
+    :type obj: Any
+    :return: None
+    """
+    state = st.session_state
+    if state.get("tree_root") != id(obj):  # A new object: start from its root
+        state["tree_root"] = id(obj)
+        state["tree_path"] = ()
+    path = state.get("tree_path", ())
+    try:
+        node = resolve(obj, path)
+    except (LookupError, TypeError):
+        path, node = (), obj
+        state["tree_path"] = path
+
+    _render_breadcrumbs(path)
+    kind, size = describe(node)
+    st.write(cfg.MESSAGES["TREE_NODE"].format(kind=kind, size=size))
+
+    if isinstance(node, CONTAINERS) and len(node):
+        page_size = cfg.CONFIG["TREE_PAGE_SIZE"]
+        pages = -(-len(node) // page_size)
+        page = 1
+        if pages > 1:
+            page = st.number_input(
+                cfg.MESSAGES["PAGE_NUMBER"].format(pages=pages),
+                min_value=1,
+                max_value=pages,
+                step=1,
+                key=f"tree_page_{len(path)}_{hash(path)}",
+            )
+        start, stop = page_bounds(len(node), page_size, int(page))
+
+        for position, (step, child) in enumerate(iter_children(node, start, stop), start):
+            key_column, value_column, kind_column, size_column, open_column = st.columns([2, 4, 2, 1, 1])
+            key_column.code(_PREVIEW.repr(step), language=None)
+            value_column.code(_PREVIEW.repr(child), language=None)
+            child_kind, child_size = describe(child)
+            kind_column.write(child_kind)
+            size_column.write(child_size)
+            if isinstance(child, CONTAINERS) and len(child):
+                open_column.button(
+                    cfg.MESSAGES["TREE_OPEN"], key=f"tree_open_{position}", on_click=_open, args=(path + (step,),)
+                )
+    else:
+        st.code(_PREVIEW.repr(node), language=None)
+
+    _render_export(node)
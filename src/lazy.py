@@ -0,0 +1,42 @@
+import importlib
+import sys
+from types import ModuleType
+from typing import Callable, Optional
+
+
+def imported(module: str) -> Optional[ModuleType]:
+    """
+    Returns a module if it has been imported already, None otherwise, without importing it. An
+    object can only be an instance of a class whose module has been imported, so e.g.
+    ``imported("pandas")`` being None means that no object can be a DataFrame, and that telling
+    objects apart doesn't have to pay for importing pandas.
+
+    :param module: The absolute name of the module.
+    :type module: str
+    :rtype: Optional[ModuleType]
+    """
+    return sys.modules.get(module)
+
+
+def deferred(module: str, name: str, package: Optional[str] = None) -> Callable:
+    """
+    Returns a function calling the function ``name`` of ``module``, which is only imported on the
+    first call. It lets a package export its functions without paying for the imports of the
+    modules defining them (e.g. pandas and NumPy for the handlers of their objects) until one of
+    them is actually used.
+
+    :param module: The name of the module defining the function, relative to ``package`` if it
+        starts with a dot.
+    :type module: str
+    :param name: The name of the function.
+    :type name: str
+    :param package: The package relative module names are resolved against.
+    :type package: Optional[str]
+    :rtype: Callable
+    """
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module, package), name)(*args, **kwargs)
+
+    call.__name__ = call.__qualname__ = name
+    call.__doc__ = f"Calls ``{module}.{name}``, importing ``{module}`` on first use."
+    return call
@@ -0,0 +1,559 @@
+import array
+import functools
+import io
+import pickletools
+import re
+import struct
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import numpy as np  # Only imported to build an OpcodeIndex, scans don't need it
+
+# Opcodes that import or call something. A pickle without any of them can only build builtin
+# containers and scalars, so there is nothing for the safety analysis to flag.
+CODE_OPCODES = frozenset({
+    "GLOBAL", "STACK_GLOBAL", "INST", "OBJ", "REDUCE", "NEWOBJ", "NEWOBJ_EX", "BUILD",
+    "EXT1", "EXT2", "EXT4", "PERSID", "BINPERSID",
+})
+
+_CODE2OP = {ord(op.code): op for op in pickletools.opcodes}
+_NAME2CODE = {op.name: ord(op.code) for op in pickletools.opcodes}
+
+# The classes of opcodes the disassembly can be filtered by:
+OPCODE_CLASSES = {
+    "imports": frozenset({"GLOBAL", "STACK_GLOBAL", "INST", "EXT1", "EXT2", "EXT4"}),
+    "calls": frozenset({"REDUCE", "OBJ", "INST", "NEWOBJ", "NEWOBJ_EX", "BUILD", "PERSID", "BINPERSID"}),
+    "memo": frozenset({"PUT", "BINPUT", "LONG_BINPUT", "GET", "BINGET", "LONG_BINGET", "MEMOIZE"}),
+}
+
+# Size prefixes of the arguments whose length is taken from the pickle itself:
+_LENGTH_PREFIXES = {
+    pickletools.TAKEN_FROM_ARGUMENT1: struct.Struct("<B"),
+    pickletools.TAKEN_FROM_ARGUMENT4: struct.Struct("<i"),
+    pickletools.TAKEN_FROM_ARGUMENT4U: struct.Struct("<I"),
+    pickletools.TAKEN_FROM_ARGUMENT8U: struct.Struct("<Q"),
+}
+
+_STRING_OPCODES = frozenset({"SHORT_BINUNICODE", "BINUNICODE", "BINUNICODE8", "UNICODE"})
+_MEMO_PUT_OPCODES = frozenset({"PUT", "BINPUT", "LONG_BINPUT"})
+_MEMO_GET_OPCODES = frozenset({"GET", "BINGET", "LONG_BINGET"})
+# Opcodes that neither push nor pop anything:
+_NEUTRAL_OPCODES = frozenset({"PROTO", "FRAME", "MEMOIZE", "STOP"}) | _MEMO_PUT_OPCODES
+
+# What the cost of unpickling is estimated from, as flags per opcode: the opcodes with a byte or
+# string payload and those building a container.
+_PAYLOAD, _CONTAINER = 1, 2
+_COST_FLAGS = {}
+for _names, _flag in (
+    (("STRING", "BINSTRING", "SHORT_BINSTRING", "BINBYTES", "SHORT_BINBYTES", "BINBYTES8", "BYTEARRAY8"), _PAYLOAD),
+    (_STRING_OPCODES, _PAYLOAD),
+    (("EMPTY_LIST", "EMPTY_TUPLE", "EMPTY_DICT", "EMPTY_SET", "TUPLE1", "TUPLE2", "TUPLE3"), _CONTAINER),
+    (("LIST", "TUPLE", "DICT", "FROZENSET"), _CONTAINER),
+):
+    _COST_FLAGS.update(dict.fromkeys(_names, _flag))
+# How each opcode changes the unpickling stack: whether it first pops everything down to the last
+# mark, how many values it pops (below that mark, if it pops to one) and how many it then pushes.
+# MARK itself is left out, since marks are kept apart from the values.
+_STACK_EFFECTS = {}
+for _opcode in pickletools.opcodes:
+    if pickletools.markobject in _opcode.stack_before:
+        _STACK_EFFECTS[_opcode.name] = (
+            True, _opcode.stack_before.index(pickletools.markobject), len(_opcode.stack_after)
+        )
+    elif _opcode.name != "MARK":
+        _STACK_EFFECTS[_opcode.name] = (False, len(_opcode.stack_before), len(_opcode.stack_after))
+# The opcodes adding the values they pop to the container (or object) below them:
+_FILL_OPCODES = frozenset({"APPEND", "APPENDS", "SETITEM", "SETITEMS", "ADDITEMS", "BUILD"})
+# The depth cell shared by all the scalars pushed, which are never filled:
+_SCALAR = [0]
+# Rough sizes of the Python objects built: an empty container, any other value (including the
+# reference to it) and a memo entry.
+_CONTAINER_BYTES = 64
+_VALUE_BYTES = 40
+_MEMO_ENTRY_BYTES = 64
+
+_NEWLINE_SEARCH_STEP = 256
+
+
+def _opcode_class(names: Iterable[str]) -> bytes:
+    return b"[" + b"".join(re.escape(bytes([_NAME2CODE[name]])) for name in names) + b"]"
+
+
+def _sized_argument(padding: bytes) -> bytes:
+    # An argument of less than 256 bytes after its size, with one alternative per size, grouped by
+    # the high digit of the size so that finding the right one takes at most 32 tries:
+    groups = []
+    for high in range(0, 256, 16):
+        sizes = b"|".join(re.escape(bytes([size])) + padding + b".{%d}" % size for size in range(high, high + 16))
+        groups.append(b"(?=[\\x%02x-\\x%02x])(?:%s)" % (high, high + 15, sizes))
+    return b"(?:" + b"|".join(groups) + b")"
+
+
+# The opcodes memo_indices_below skips over at C speed, as patterns matching each of them with its
+# argument: those whose argument has a fixed size (or that have none), those whose single-line
+# argument is a scalar or a memo index to read, and those whose argument is prefixed by its size,
+# when it's short. LONG_BINPUT and PUT are only skipped over when their memo index is small enough
+# (see _memo_skip_pattern), and STOP ends the check.
+_FIXED_SIZE_OPCODES = {}
+for _opcode in pickletools.opcodes:
+    _size = 0 if _opcode.arg is None else _opcode.arg.n
+    if _size >= 0 and _opcode.name not in ("LONG_BINPUT", "STOP"):
+        _FIXED_SIZE_OPCODES.setdefault(_size, []).append(_opcode.name)
+_SKIPPED_OPCODE_PATTERNS = [
+    _opcode_class(names) + b".{%d}" % size for size, names in sorted(_FIXED_SIZE_OPCODES.items())
+] + [
+    _opcode_class(("INT", "LONG", "FLOAT", "STRING", "UNICODE", "GET")) + b"[^\\n]*\\n",
+    _opcode_class(("SHORT_BINSTRING", "SHORT_BINBYTES", "SHORT_BINUNICODE", "LONG1")) + _sized_argument(b""),
+    _opcode_class(("BINSTRING", "BINBYTES", "BINUNICODE", "LONG4")) + _sized_argument(b"\\x00{3}"),
+]
+# How many opcodes a single match skips over at most, which keeps the backtracking stack of the
+# regular expression engine small:
+_MEMO_CHECK_STEP = 4096
+
+
+def _find_newline(view: memoryview, start: int) -> int:
+    pos = start
+    while pos < len(view):
+        found = bytes(view[pos:pos + _NEWLINE_SEARCH_STEP]).find(b"\n")
+        if found != -1:
+            return pos + found
+        pos += _NEWLINE_SEARCH_STEP
+    raise ValueError(f"no newline found for the argument starting at offset {start}")
+
+
+def _arg_end(arg: pickletools.ArgumentDescriptor, view: memoryview, start: int) -> int:
+    if arg is None:
+        return start
+    if arg.n >= 0:
+        return start + arg.n
+    if arg.n == pickletools.UP_TO_NEWLINE:
+        end = _find_newline(view, start) + 1
+        if arg is pickletools.stringnl_noescape_pair:  # GLOBAL and INST take two lines
+            end = _find_newline(view, end) + 1
+        return end
+    prefix = _LENGTH_PREFIXES[arg.n]
+    if start + prefix.size > len(view):
+        raise ValueError(f"truncated argument size at offset {start}")
+    (length,) = prefix.unpack_from(view, start)
+    if length < 0:
+        raise ValueError(f"negative argument size at offset {start}")
+    return start + prefix.size + length
+
+
+def iter_opcodes(
+    data: Union[bytes, bytearray, memoryview],
+) -> Iterator[Tuple[pickletools.OpcodeInfo, int, int, int]]:
+    """
+    Walks the opcodes of a pickle (or of a stream of concatenated pickles) in a single linear pass.
+    Unlike ``pickletools.genops``, arguments are skipped rather than decoded, so that walking over
+    large byte payloads neither copies nor allocates anything.
+
+    :param data: The pickle data.
+    :type data: Union[bytes, bytearray, memoryview]
+    :raises ValueError: If the data contains an unknown opcode or a truncated argument.
+    :return: An iterator over ``(opcode, offset, arg_start, arg_end)`` tuples, where
+        ``data[arg_start:arg_end]`` holds the encoded argument of the opcode.
+    :rtype: Iterator[Tuple[pickletools.OpcodeInfo, int, int, int]]
+    """
+    view = memoryview(data).cast("B")
+    pos = 0
+    while pos < len(view):
+        opcode = _CODE2OP.get(view[pos])
+        if opcode is None:
+            raise ValueError(f"unknown opcode {bytes(view[pos:pos + 1])!r} at offset {pos}")
+        arg_end = _arg_end(opcode.arg, view, pos + 1)
+        if arg_end > len(view):
+            raise ValueError(f"truncated {opcode.name} argument at offset {pos}")
+        yield opcode, pos, pos + 1, arg_end
+        pos = arg_end
+
+
+def decode_arg(opcode: pickletools.OpcodeInfo, view: memoryview, arg_start: int, arg_end: int):
+    """
+    Decodes the argument of an opcode found by ``iter_opcodes``.
+
+    :return: The decoded argument, as ``pickletools.genops`` would report it.
+    """
+    return opcode.arg.reader(io.BytesIO(view[arg_start:arg_end]))
+
+
+@functools.lru_cache(maxsize=64)
+def _memo_skip_pattern(top_byte: int, top_value: int, digits: int) -> "re.Pattern[bytes]":
+    patterns = list(_SKIPPED_OPCODE_PATTERNS)
+    # A LONG_BINPUT index is below the limit when its top bytes are below those of the limit, and a
+    # PUT index when it has fewer digits:
+    if top_byte >= 4:
+        patterns.append(b"r.{4}")
+    elif top_value:
+        patterns.append(b"r.{%d}[\\x00-\\x%02x]\\x00{%d}" % (top_byte, top_value - 1, 3 - top_byte))
+    if digits > 1:
+        patterns.append(b"p[0-9]{1,%d}\\n" % (digits - 1))
+    return re.compile(b"(?:" + b"|".join(patterns) + b"){0,%d}" % _MEMO_CHECK_STEP, re.DOTALL)
+
+
+def memo_indices_below(data: Union[bytes, bytearray, memoryview], limit: int) -> bool:
+    """
+    Checks that no PUT or LONG_BINPUT opcode of the first pickle in ``data`` stores a value at a
+    memo index of ``limit`` or more. They are the only opcodes choosing the index they store at,
+    and the C unpickler allocates (and zeroes) its memo up to twice that index, however few values
+    were memoized.
+
+    Unlike ``scan_opcodes``, the opcodes are skipped over by a regular expression, at C speed, and
+    only those it doesn't match (long arguments, out-of-bounds memo indices, imports) are looked
+    at one at a time.
+
+    :param data: The pickle data.
+    :type data: Union[bytes, bytearray, memoryview]
+    :param limit: The smallest memo index that isn't allowed.
+    :type limit: int
+    :return: Whether all the memo indices of the pickle are below ``limit``. Malformed data is
+        reported as not being so.
+    :rtype: bool
+    """
+    top_byte = min(max(limit.bit_length() - 1, 0) // 8, 4)
+    top_value = limit >> (8 * top_byte) if top_byte < 4 else 0
+    pattern = _memo_skip_pattern(top_byte, top_value, len(str(limit)))
+    view = memoryview(data).cast("B")
+    pos = 0
+    while True:
+        pos = pattern.match(view, pos).end()
+        opcode = _CODE2OP.get(view[pos]) if pos < len(view) else None
+        if opcode is None:
+            return False
+        if opcode.name == "STOP":
+            return True
+        try:
+            arg_end = _arg_end(opcode.arg, view, pos + 1)
+            if arg_end > len(view):
+                return False
+            if opcode.name in ("PUT", "LONG_BINPUT") and decode_arg(opcode, view, pos + 1, arg_end) >= limit:
+                return False
+        except ValueError:
+            return False
+        pos = arg_end
+
+
+class LoadCost(NamedTuple):
+    """
+    What unpickling a pickle is expected to cost, as counted from its opcodes.
+
+    :ivar payload_bytes: The total size of its byte and string arguments.
+    :ivar containers: The number of containers it builds.
+    :ivar opcodes: The number of opcodes it runs.
+    :ivar max_memo: The largest memo index it uses, -1 if it doesn't use the memo.
+    :ivar max_depth: How deeply its containers are nested.
+    """
+    payload_bytes: int = 0
+    containers: int = 0
+    opcodes: int = 0
+    max_memo: int = -1
+    max_depth: int = 0
+
+    @property
+    def estimated_bytes(self) -> int:
+        """
+        A rough estimate of the memory the unpickled objects take: the payloads, plus the usual
+        size of an empty container, of a small object and of a memo entry for each of them.
+
+        :rtype: int
+        """
+        return (
+            self.payload_bytes
+            + self.containers * _CONTAINER_BYTES
+            + self.opcodes * _VALUE_BYTES
+            + (self.max_memo + 1) * _MEMO_ENTRY_BYTES
+        )
+
+    @classmethod
+    def of_plain_data(cls, nbytes: int) -> "LoadCost":
+        """
+        The most a pickle of ``nbytes`` bytes that only holds builtin containers and scalars can
+        cost, without looking at its opcodes: as if each of its bytes were a payload byte, and an
+        opcode building a container that gets its own memo entry. This only bounds the memo of
+        pickles whose memo indices are below ``nbytes`` (see ``memo_indices_below``), and leaves
+        the nesting of the containers unbounded.
+
+        :param nbytes: The size of the pickle.
+        :type nbytes: int
+        :rtype: LoadCost
+        """
+        return cls(payload_bytes=nbytes, containers=nbytes, opcodes=nbytes, max_memo=nbytes - 1)
+
+
+class OpcodeScan:
+    """
+    The outcome of a single pass over the opcodes of a pickle stream.
+
+    :ivar opcode_names: The names of the opcodes found in the stream.
+    :ivar object_offsets: The offsets at which each of the concatenated pickles starts.
+    :ivar code_objects: The positions (in ``object_offsets``) of the pickles that import or call
+        something.
+    :ivar globals: The ``(module, name)`` pairs the stream imports. Imports whose operands couldn't
+        be resolved statically are reported as ``(None, None)``.
+    :ivar cost: The cost of unpickling any one of the concatenated pickles (which are unpickled one
+        at a time): the largest count of each kind found in a single pickle.
+    """
+
+    def __init__(
+        self,
+        opcode_names: FrozenSet[str],
+        object_offsets: List[int],
+        globals: FrozenSet[Tuple[Optional[str], Optional[str]]] = frozenset(),
+        code_objects: Optional[List[int]] = None,
+        cost: LoadCost = LoadCost(),
+    ):
+        self.opcode_names = opcode_names
+        self.object_offsets = object_offsets
+        self.globals = globals
+        self.code_objects = code_objects if code_objects is not None else []
+        self.cost = cost
+
+    def only_imports(self, allowed: FrozenSet[Tuple[str, str]]) -> bool:
+        """
+        Whether every global imported by the stream belongs to ``allowed``.
+
+        :param allowed: The allowed ``(module, name)`` pairs.
+        :type allowed: FrozenSet[Tuple[str, str]]
+        :rtype: bool
+        """
+        return bool(self.object_offsets) and self.globals <= allowed
+
+    @property
+    def is_plain_data(self) -> bool:
+        """
+        Whether the stream only builds builtin containers and scalars: it neither imports nor calls
+        anything.
+
+        :rtype: bool
+        """
+        return bool(self.object_offsets) and not self.code_objects
+
+
+def scan_opcodes(data: Union[bytes, bytearray, memoryview]) -> OpcodeScan:
+    """
+    Scans a pickle stream once, recording which opcodes it uses, where each pickle starts, which of
+    the pickles import or call something, which globals they import and what unpickling them costs.
+
+    ``STACK_GLOBAL`` takes its module and name from the stack, so the scan keeps track of the last
+    two values pushed (and of the memoized strings) to resolve them. Strings are only decoded when
+    they turn out to be the operands of an import.
+
+    :param data: The pickle data.
+    :type data: Union[bytes, bytearray, memoryview]
+    :raises ValueError: If the data isn't a well-formed stream of complete pickles.
+    :return: The outcome of the scan.
+    :rtype: OpcodeScan
+    """
+    view = memoryview(data).cast("B")
+    names = set()
+    object_offsets = []
+    code_objects = []
+    globals_ = set()
+    at_object_start = True
+    recent = [None, None]  # The last two values pushed: the spans of strings, None for anything else
+    memo = {}  # Memo index -> the span of the memoized string, None for anything else
+    memo_depths = {}  # Memo index -> the depth cell of the memoized value
+    cost = LoadCost()
+    payload_bytes = containers = count = max_depth = 0
+    max_memo = -1
+    # How deeply the containers of each value on the stack are nested (0 for scalars), in cells
+    # shared with the memo, since containers are memoized before they are filled:
+    depths = []
+    marks = []  # The heights of the stack when each of the open marks was pushed
+    for opcode, pos, arg_start, arg_end in iter_opcodes(view):
+        if at_object_start:
+            object_offsets.append(pos)
+            recent = [None, None]
+            memo.clear()
+            memo_depths.clear()
+            payload_bytes = containers = count = max_depth = 0
+            max_memo = -1
+            depths.clear()
+            marks.clear()
+        name = opcode.name
+        names.add(name)
+        at_object_start = name == "STOP"
+        if name in CODE_OPCODES and code_objects[-1:] != [len(object_offsets) - 1]:
+            code_objects.append(len(object_offsets) - 1)
+
+        count += 1
+        flags = _COST_FLAGS.get(name)
+        if flags:
+            if flags & _PAYLOAD:
+                payload_bytes += arg_end - arg_start
+            if flags & _CONTAINER:
+                containers += 1
+        if name == "MARK":
+            marks.append(len(depths))
+        else:
+            # A container is nested one level deeper than the deepest value put in it, and anything
+            # else built from values (e.g. by a call) as deeply as the deepest of them:
+            to_mark, popped, pushed = _STACK_EFFECTS[name]
+            if to_mark or popped:
+                start = max((marks.pop() if marks and to_mark else len(depths)) - popped, 0)
+                cells = depths[start:]
+                del depths[start:]
+                if name in _FILL_OPCODES and cells:
+                    cell = cells[0] if cells[0] is not _SCALAR else [0]
+                    cell[0] = max(cell[0], 1 + max((value[0] for value in cells[1:]), default=0))
+                else:
+                    cell = [max((value[0] for value in cells), default=0) + (flags == _CONTAINER)]
+            else:
+                cell = [1] if flags == _CONTAINER else _SCALAR
+            if pushed == 1:
+                depths.append(cell)
+            elif pushed:
+                depths.extend([cell] * pushed)
+            if pushed and cell[0] > max_depth:
+                max_depth = cell[0]
+
+        if name in _STRING_OPCODES:
+            recent = [recent[1], (opcode, arg_start, arg_end)]
+        elif name in _MEMO_GET_OPCODES:
+            index = decode_arg(opcode, view, arg_start, arg_end)
+            recent = [recent[1], memo.get(index)]
+            depths[-1] = memo_depths.get(index, depths[-1])
+        elif name == "MEMOIZE":
+            max_memo = max(max_memo, len(memo))
+            if depths:
+                memo_depths[len(memo)] = depths[-1]
+            memo[len(memo)] = recent[1]
+        elif name in _MEMO_PUT_OPCODES:
+            index = decode_arg(opcode, view, arg_start, arg_end)
+            max_memo = max(max_memo, index)
+            memo[index] = recent[1]
+            if depths:
+                memo_depths[index] = depths[-1]
+        elif name in ("GLOBAL", "INST"):
+            module, _, qualname = decode_arg(opcode, view, arg_start, arg_end).partition(" ")
+            globals_.add((module, qualname))
+        elif name == "STACK_GLOBAL":
+            if None in recent:
+                globals_.add((None, None))
+            else:
+                globals_.add(tuple(decode_arg(op, view, start, end) for op, start, end in recent))
+            recent = [None, None]
+        elif name not in _NEUTRAL_OPCODES:
+            recent = [recent[1], None]
+
+        if at_object_start:
+            cost = LoadCost(*map(max, cost, (payload_bytes, containers, count, max_memo, max_depth)))
+
+    if not at_object_start:
+        raise ValueError("pickle data was truncated before its STOP opcode")
+    return OpcodeScan(frozenset(names), object_offsets, frozenset(globals_), code_objects, cost)
+
+
+class OpcodeIndex:
+    """
+    An index of the opcodes of a pickle stream, held in two NumPy arrays rather than in one Python
+    object per opcode: the offset of each opcode (8 bytes) and its code (1 byte). Opcodes follow
+    each other without gaps, so the argument of an opcode spans from the byte after it to the
+    offset of the next one, and doesn't need to be stored.
+
+    Arguments are only decoded for the opcodes actually displayed, see ``describe``.
+
+    :ivar view: The pickle data.
+    :ivar offsets: The offset of each opcode.
+    :ivar codes: The code of each opcode.
+    :ivar end: Where the argument of the last opcode ends.
+    :ivar error: Why the data couldn't be indexed past ``end``, None if it was indexed to its end.
+    """
+
+    def __init__(self, view: memoryview, offsets: "np.ndarray", codes: "np.ndarray", end: int, error: Optional[str] = None):
+        self.view = view
+        self.offsets = offsets
+        self.codes = codes
+        self.end = end
+        self.error = error
+        self._positions: Dict[FrozenSet[str], "np.ndarray"] = {}
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The memory held by the index, the pickle data included.
+
+        :rtype: int
+        """
+        return self.offsets.nbytes + self.codes.nbytes + self.view.nbytes
+
+    def positions(self, classes: Iterable[str] = ()) -> "np.ndarray":
+        """
+        Returns the positions (in the index) of the opcodes belonging to some of the
+        ``OPCODE_CLASSES``. The positions of each combination of classes are only computed once.
+
+        :param classes: The names of the classes, every opcode is selected when empty.
+        :type classes: Iterable[str]
+        :return: The positions, in ascending order.
+        :rtype: np.ndarray
+        """
+        import numpy as np
+
+        classes = frozenset(classes)
+        if classes not in self._positions:
+            if not classes:
+                self._positions[classes] = np.arange(len(self))
+            else:
+                names = frozenset().union(*(OPCODE_CLASSES[name] for name in classes))
+                wanted = np.array(sorted(_NAME2CODE[name] for name in names), dtype=np.uint8)
+                self._positions[classes] = np.flatnonzero(np.isin(self.codes, wanted))
+        return self._positions[classes]
+
+    def describe(self, position: int, max_bytes: int = 64) -> Tuple[int, str, str]:
+        """
+        Describes an opcode as ``pickletools.dis`` would, decoding its argument. Arguments longer
+        than ``max_bytes`` are not decoded: only their size and first bytes are shown.
+
+        :param position: The position of the opcode in the index.
+        :type position: int
+        :param max_bytes: The size of the largest argument to decode.
+        :type max_bytes: int
+        :return: The offset of the opcode, its name and its argument.
+        :rtype: Tuple[int, str, str]
+        """
+        offset = int(self.offsets[position])
+        opcode = _CODE2OP[int(self.codes[position])]
+        arg_end = int(self.offsets[position + 1]) if position + 1 < len(self) else self.end
+        if opcode.arg is None:
+            arg = ""
+        elif arg_end - offset - 1 > max_bytes:
+            arg = f"<{arg_end - offset - 1:,} bytes> {bytes(self.view[offset + 1:offset + 1 + max_bytes])!r}..."
+        else:
+            arg = repr(decode_arg(opcode, self.view, offset + 1, arg_end))
+        return offset, opcode.name, arg
+
+
+def build_opcode_index(data: Union[bytes, bytearray, memoryview]) -> OpcodeIndex:
+    """
+    Indexes the opcodes of a pickle stream in a single pass with ``iter_opcodes``. Malformed data
+    is indexed up to the first opcode that can't be read, and the reason is kept in the index.
+
+    :param data: The pickle data.
+    :type data: Union[bytes, bytearray, memoryview]
+    :return: The index.
+    :rtype: OpcodeIndex
+    """
+    import numpy as np
+
+    view = memoryview(data).cast("B")
+    offsets = array.array("q")
+    codes = array.array("B")
+    end = 0
+    error = None
+    try:
+        for opcode, pos, _, arg_end in iter_opcodes(view):
+            offsets.append(pos)
+            codes.append(view[pos])
+            end = arg_end
+    except ValueError as ex:
+        error = str(ex)
+    return OpcodeIndex(
+        view,
+        np.frombuffer(offsets, dtype=np.int64) if offsets else np.empty(0, dtype=np.int64),
+        np.frombuffer(codes, dtype=np.uint8) if codes else np.empty(0, dtype=np.uint8),
+        end,
+        error,
+    )
@@ -1,21 +1,17 @@
 from pathlib import Path
 
-import numpy as np
-import pandas as pd
-
 import streamlit as st
 from streamlit.runtime.uploaded_file_manager import UploadedFile
 
 import config as cfg
-from handlers import (
-    handle_streamlit_none,
-    handle_streamlit_json,
-    handle_streamlit_ndarray,
-    handle_streamlit_df,
-    handle_streamlit_pd_series,
-)
+from cache import LOAD_CACHE
+from handlers import handle_streamlit_none, handle_streamlit_disassembly, handle_streamlit_preview, handle_streamlit_timings
+from handlers.registry import get_handler_registry
 
-from utils import PickleLoader, is_json_serializable, ExceptionUnsafePickle
+from exceptions import ExceptionDecompressionLimit, ExceptionLoadBudget, ExceptionMissingCodec, ExceptionSandboxFailure
+from sandbox import get_sandbox_pool
+from telemetry import trace
+from utils import PickleLoader, ExceptionUnsafePickle
 
 
 class PickleViewerApp:
@@ -86,8 +82,9 @@ class PickleViewerApp:
         of the object. The function utilizes Streamlit for rendering output to the user interface
         and provides fallbacks where applicable.
 
-        :param obj: The object to be displayed. It can be a pandas DataFrame, pandas Series or a
-        JSON-serializable object. Certain unsupported types may emit warnings.
+        :param obj: The object to be displayed. It can be a stream of concatenated pickles, a pandas
+        DataFrame, pandas Series, NumPy ndarray, CIFAR-style dict of images or a JSON-serializable object. Large containers are
+        explored as a tree rather than serialized as a whole. Certain unsupported types may emit warnings.
         :type obj: object
         :param were_spared_objs: Boolean flag indicating whether objects formatted as JSON will be
             unquoted for display.
@@ -105,22 +102,55 @@ class PickleViewerApp:
                 handle_streamlit_none()
                 return
 
-            if isinstance(obj, pd.DataFrame):
-                handle_streamlit_df(obj)
+            PickleViewerApp.render_object(obj, were_spared_objs)
+        except Exception as ex:
+            if cfg.CONFIG["DEBUG_MODE"]:
+                st.error(f"Display Error: {ex}")
 
-            elif isinstance(obj, pd.Series):
-                handle_streamlit_pd_series(obj)
+    @staticmethod
+    def render_object(obj, were_spared_objs):
+        """
+        Renders an object with the handler the registry dispatches it to, see
+        ``handlers.registry``. Streams of concatenated pickles are displayed a page of objects at a
+        time, and the object picked for inspection is rendered in turn.
 
-            elif isinstance(obj, np.ndarray):
-                handle_streamlit_ndarray(obj)
+        :param obj: The object to be rendered.
+        :type obj: object
+        :param were_spared_objs: Boolean flag indicating whether objects formatted as JSON will be
+            unquoted for display.
+        :type were_spared_objs: bool
+        :return: None
+        :rtype: None
+        """
+        handler = get_handler_registry().dispatch(obj)
+        if handler is None:
+            st.warning(cfg.MESSAGES["NOT_JSON_WARNING"])
+            return
+        handler.render(
+            obj,
+            were_spared_objs=were_spared_objs,
+            display=lambda item: PickleViewerApp.render_object(item, False),
+        )
 
-            elif is_json_serializable(obj):
-                handle_streamlit_json(obj, were_spared_objs)
-            else:
-                st.warning(cfg.MESSAGES["NOT_JSON_WARNING"])
+    @staticmethod
+    def show_analysis(handler, loader) -> None:
+        """
+        Displays the static preview or the disassembly of the file loaded by ``loader``. Failures are
+        reported as a warning rather than raised, so that they don't take the place of the message
+        about why the file wasn't displayed.
+
+        :param handler: ``handle_streamlit_preview`` or ``handle_streamlit_disassembly``.
+        :type handler: Callable[[str, Callable[[], memoryview]], None]
+        :param loader: The loader of the file.
+        :type loader: PickleLoader
+        :return: None
+        """
+        try:
+            handler(loader.digest, lambda: loader.buffer.getbuffer())
         except Exception as ex:
+            st.warning(cfg.MESSAGES["ANALYSIS_ERROR"])
             if cfg.CONFIG["DEBUG_MODE"]:
-                st.error(f"Display Error: {ex}")
+                st.exception(ex)
 
     def process_file(self, uploaded_file, allow_unsafe_file: bool) -> None:
         """
@@ -128,8 +158,18 @@ class PickleViewerApp:
         provided file and determining its content. It then displays the content using the
         `display_content` method, handling both standard data and dataframes.
 
+        Loads go through the load cache, so that Streamlit reruns triggered by widget interactions
+        don't decompress, analyze and unpickle the same content again.
+
         If an error occurs during the loading process, it will handle specific unsafe pickle
-        exceptions or general errors by showing appropriate messages to the user.
+        exceptions or general errors by showing appropriate messages to the user. The opcodes of
+        files failing the safety checks are disassembled, whether they were refused or loaded
+        because of the bypass, and a static preview of what refused files would build is shown. So is
+        the static preview of files too large to be unpickled, unless ``CONFIG["LOAD_OVER_BUDGET"]``
+        is ``"refuse"``. Files whose sandbox worker hit its limits or crashed are disassembled too.
+
+        When telemetry is enabled, the stages of the load are timed (see ``telemetry``), and their
+        timings are displayed in ``DEBUG_MODE``.
 
         :param uploaded_file: The file provided by the user for processing.
         :type uploaded_file: Any
@@ -137,30 +177,65 @@ class PickleViewerApp:
         :type allow_unsafe_file: bool
         :raises ExceptionUnsafePickle: Custom exception raised when unsafe pickle operations
             are encountered.
+        :raises ExceptionDecompressionLimit: Custom exception raised when a compressed file expands
+            beyond the configured limits.
+        :raises ExceptionLoadBudget: Custom exception raised when unpickling a file is expected to
+            take more memory than the configured budget.
+        :raises ExceptionMissingCodec: Custom exception raised when a compressed file needs an
+            optional package that isn't installed.
+        :raises ExceptionSandboxFailure: Custom exception raised when the worker process unpickling
+            a file hits its limits or crashes.
         :raises Exception: Generic exceptions raised during the loading process.
         :return: None
         """
-        try:
-            loader = PickleLoader(uploaded_file, allow_unsafe_file=allow_unsafe_file)
-            obj, were_spared_objs, is_dataframe = loader.load()
-            self.display_content(obj, were_spared_objs, is_dataframe)
-        except ExceptionUnsafePickle as err:
-            st.error(str(err))
-            st.stop()
-        except (IOError, OSError) as io_err:
-            if cfg.CONFIG["DEBUG_MODE"]:
-                st.error(f"File access error: {io_err}")
-        except Exception as ex:
-            st.error(cfg.MESSAGES["GENERIC_LOAD_ERROR"])
-            if cfg.CONFIG["DEBUG_MODE"]:
-                st.exception(ex)
+        with trace(getattr(uploaded_file, "name", None)) as current:
+            loader = None
+            try:
+                loader = PickleLoader(uploaded_file, allow_unsafe_file=allow_unsafe_file)
+                obj, were_spared_objs, is_dataframe = LOAD_CACHE.load(loader)
+                if cfg.CONFIG["DEBUG_MODE"]:
+                    st.caption(cfg.MESSAGES["CACHE_STATS"].format(**LOAD_CACHE.stats()))
+                self.display_content(obj, were_spared_objs, is_dataframe)
+                if loader.verdict == cfg.VERDICTS["BYPASSED"]:
+                    PickleViewerApp.show_analysis(handle_streamlit_disassembly, loader)
+                if current is not None and cfg.CONFIG["DEBUG_MODE"]:
+                    handle_streamlit_timings(current)
+            except ExceptionUnsafePickle as err:
+                st.error(str(err))
+                if loader is not None:
+                    PickleViewerApp.show_analysis(handle_streamlit_preview, loader)
+                    PickleViewerApp.show_analysis(handle_streamlit_disassembly, loader)
+                st.stop()
+            except ExceptionLoadBudget as err:
+                st.error(str(err))
+                if cfg.CONFIG["LOAD_OVER_BUDGET"] == "preview":
+                    PickleViewerApp.show_analysis(handle_streamlit_preview, loader)
+                st.stop()
+            except ExceptionSandboxFailure as err:
+                st.error(str(err))
+                PickleViewerApp.show_analysis(handle_streamlit_disassembly, loader)
+                st.stop()
+            except (ExceptionDecompressionLimit, ExceptionMissingCodec) as err:
+                st.error(str(err))
+                st.stop()
+            except (IOError, OSError) as io_err:
+                if cfg.CONFIG["DEBUG_MODE"]:
+                    st.error(f"File access error: {io_err}")
+            except Exception as ex:
+                st.error(cfg.MESSAGES["GENERIC_LOAD_ERROR"])
+                if cfg.CONFIG["DEBUG_MODE"]:
+                    st.exception(ex)
+            finally:
+                if current is not None and loader is not None:
+                    current.attributes.update(verdict=loader.verdict, digest=loader.digest)
 
     def run(self) -> None:
         """
         Handles the primary operation flow for setting up a page, managing user preferences, and
         processing an uploaded file. This method initializes the necessary states and toggles,
         presents warnings where applicable, and ensures a secure or unsafe file upload based on
-        configuration and user input.
+        configuration and user input. The workers of the sandbox pool are started as soon as the
+        bypass is enabled, so that they are ready by the time a file is uploaded.
 
         :return: None
         """
@@ -178,6 +253,8 @@ class PickleViewerApp:
 
         if allow_unsafe_file:
             st.warning(cfg.MESSAGES["UNSAFE_WARNING"])
+            if cfg.CONFIG["SANDBOX_WORKERS"]:
+                get_sandbox_pool()
 
         uploaded_file = self.upload_file()
         if uploaded_file:
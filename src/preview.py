@@ -0,0 +1,354 @@
+import collections
+import itertools
+from typing import Counter, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+import config as cfg
+from opcodes import decode_arg, iter_opcodes
+from sizing import format_bytes
+
+_SCALAR_OPCODES = frozenset({
+    "INT", "BININT", "BININT1", "BININT2", "LONG", "LONG1", "LONG4", "FLOAT", "BINFLOAT",
+    "NONE", "NEWTRUE", "NEWFALSE",
+})
+_STRING_OPCODES = frozenset({
+    "STRING", "BINSTRING", "SHORT_BINSTRING", "UNICODE", "SHORT_BINUNICODE", "BINUNICODE", "BINUNICODE8",
+})
+_BYTES_OPCODES = frozenset({"BINBYTES", "SHORT_BINBYTES", "BINBYTES8", "BYTEARRAY8"})
+_EMPTY_CONTAINERS = {"EMPTY_LIST": "list", "EMPTY_TUPLE": "tuple", "EMPTY_DICT": "dict", "EMPTY_SET": "set"}
+_MARKED_CONTAINERS = {"LIST": "list", "TUPLE": "tuple", "DICT": "dict", "FROZENSET": "frozenset"}
+_SMALL_TUPLES = {"TUPLE1": 1, "TUPLE2": 2, "TUPLE3": 3}
+_IGNORED_OPCODES = frozenset({"PROTO", "FRAME", "READONLY_BUFFER"})
+
+CONTAINER_KINDS = frozenset({"list", "tuple", "dict", "set", "frozenset"})
+
+_MAX_LABEL = 80
+_MAX_INLINE_DEPTH = 3  # Calls nested deeper than this are elided from the line describing a node
+_NODE_BYTES = 200  # A node with a short label and a few children
+
+
+class PreviewNode:
+    """
+    A value of the pickle, as far as it can be known without importing anything: a container, a
+    scalar, a byte or string payload, a global, or the call of a global.
+
+    Only the first ``CONFIG["PREVIEW_MAX_ITEMS"]`` children of a node are kept, ``length`` counts
+    all of them.
+
+    :ivar kind: ``"list"``, ``"tuple"``, ``"dict"``, ``"set"``, ``"frozenset"``, ``"scalar"``,
+        ``"payload"``, ``"global"``, ``"call"`` or ``"unknown"``.
+    :ivar label: The value of scalars, the size of payloads, the name of globals and of the
+        callable of calls.
+    :ivar children: The ``(key, value)`` pairs kept. Keys are the keys of dicts, the names of the
+        keyword arguments of calls (and ``"state"`` for the state set by ``BUILD``), and None for
+        the items of sequences and the positional arguments of calls.
+    :ivar length: The number of children.
+    :ivar memo: The first memo index the node was stored at, None if it never was.
+    """
+
+    __slots__ = ("kind", "label", "children", "length", "memo")
+
+    def __init__(self, kind: str, label: str = ""):
+        self.kind = kind
+        self.label = label
+        self.children: List[Tuple[Union["PreviewNode", str, None], "PreviewNode"]] = []
+        self.length = 0
+        self.memo: Optional[int] = None
+
+    def add(self, value: "PreviewNode", key: Union["PreviewNode", str, None] = None) -> None:
+        self.length += 1
+        if len(self.children) < cfg.CONFIG["PREVIEW_MAX_ITEMS"]:
+            self.children.append((key, value))
+
+    def inline(self, on_path: Optional[Set[int]] = None, depth: int = 0) -> str:
+        """
+        Describes the node on a single line, without its children. The arguments of calls are
+        described in turn, except those nested deeper than ``_MAX_INLINE_DEPTH`` and those which
+        are the call itself or one of the calls it is an argument of: pickles can build cycles
+        through the memo, and these are described by a back-reference.
+
+        :param on_path: The ids of the calls being described, which this node is an argument of.
+        :type on_path: Optional[Set[int]]
+        :param depth: The number of calls being described.
+        :type depth: int
+        :rtype: str
+        """
+        if self.kind in CONTAINER_KINDS:
+            return f"{self.kind} of {self.length:,}"
+        if self.kind == "payload":
+            return f"<{self.label}>"
+        if self.kind == "call":
+            on_path = set() if on_path is None else on_path
+            if id(self) in on_path or depth >= _MAX_INLINE_DEPTH:
+                return self.reference()
+            on_path.add(id(self))
+            args = ", ".join(_prefix(key) + value.inline(on_path, depth + 1) for key, value in self.children[:3])
+            on_path.discard(id(self))
+            return f"{self.label}({args}{', ...' if self.length > 3 else ''})"
+        return self.label
+
+    def reference(self) -> str:
+        """
+        Refers to the node without describing it: by the memo index it was stored at, if any.
+
+        :rtype: str
+        """
+        return "<...>" if self.memo is None else f"<memo {self.memo}>"
+
+
+class StaticPreview:
+    """
+    What a symbolic run of a pickle stream found out, without importing or calling anything.
+
+    :ivar roots: The objects built by each of the concatenated pickles.
+    :ivar globals: How many times each ``(module, name)`` pair is imported. Imports whose operands
+        aren't plain strings are counted as ``("?", "?")``.
+    :ivar calls: The offset of the first ``CONFIG["PREVIEW_MAX_ENTRIES"]`` calls, and what they call.
+    :ivar call_count: The number of calls.
+    :ivar payloads: The offset, opcode and size of the first ``CONFIG["PREVIEW_MAX_ENTRIES"]`` byte
+        and string arguments of at least ``CONFIG["PREVIEW_PAYLOAD_BYTES"]`` bytes.
+    :ivar payload_count: The number of such payloads, and ``payload_bytes`` their total size.
+    :ivar opcodes: The number of opcodes run.
+    :ivar error: Why the run stopped before the end of the data, None if it didn't.
+    """
+
+    def __init__(self):
+        self.roots: List[PreviewNode] = []
+        self.globals: Counter[Tuple[str, str]] = collections.Counter()
+        self.calls: List[Tuple[int, PreviewNode]] = []
+        self.call_count = 0
+        self.payloads: List[Tuple[int, str, int]] = []
+        self.payload_count = 0
+        self.payload_bytes = 0
+        self.opcodes = 0
+        self.error: Optional[str] = None
+
+    @property
+    def nbytes(self) -> int:
+        """
+        An upper bound of the memory held by the preview: each opcode run builds at most one node.
+
+        :rtype: int
+        """
+        return self.opcodes * _NODE_BYTES
+
+    def outline(self, max_depth: int = 6, max_lines: int = 500) -> str:
+        """
+        Renders the structure of the objects built as an indented outline.
+
+        :param max_depth: The depth below which nodes aren't expanded.
+        :type max_depth: int
+        :param max_lines: The number of lines after which the outline is cut.
+        :type max_lines: int
+        :rtype: str
+        """
+        lines = itertools.chain.from_iterable(
+            _outline(root, f"#{position}: " if len(self.roots) > 1 else "", 0, max_depth, set())
+            for position, root in enumerate(self.roots)
+        )
+        kept = list(itertools.islice(lines, max_lines + 1))
+        if len(kept) > max_lines:
+            kept[max_lines:] = ["..."]
+        return "\n".join(kept)
+
+
+def _prefix(key: Union[PreviewNode, str, None]) -> str:
+    if isinstance(key, PreviewNode):
+        return f"{key.inline()}: "
+    return "" if key is None else f"{key}="
+
+
+def _outline(node: PreviewNode, prefix: str, depth: int, max_depth: int, on_path: set) -> Iterator[str]:
+    if id(node) in on_path:
+        yield "    " * depth + prefix + node.reference()
+        return
+    yield "    " * depth + prefix + node.inline()
+    if not node.children or depth >= max_depth:
+        return
+    on_path.add(id(node))
+    for position, (key, value) in enumerate(node.children):
+        prefix = f"[{position}] " if key is None and node.kind != "call" else _prefix(key)
+        yield from _outline(value, prefix, depth + 1, max_depth, on_path)
+    if node.length > len(node.children):
+        yield "    " * (depth + 1) + f"... {node.length - len(node.children):,} more"
+    on_path.discard(id(node))
+
+
+def _label(value) -> str:
+    text = repr(value)
+    return text if len(text) <= _MAX_LABEL else text[:_MAX_LABEL] + "..."
+
+
+def build_preview(data: Union[bytes, bytearray, memoryview]) -> StaticPreview:
+    """
+    Runs a pickle stream on a symbolic stack machine, which builds ``PreviewNode`` objects in place
+    of the actual ones: globals are named but never imported (there is no ``find_class``), calls
+    are recorded but never made, and arguments of more than ``CONFIG["DISASSEMBLY_ARG_BYTES"]``
+    bytes are sized but not decoded.
+
+    The run stops at the first opcode that can't be read or run (e.g. a stack underflow), or after
+    ``CONFIG["PREVIEW_MAX_OPCODES"]`` opcodes, keeping what it found so far.
+
+    :param data: The pickle data.
+    :type data: Union[bytes, bytearray, memoryview]
+    :return: What the run found out.
+    :rtype: StaticPreview
+    """
+    preview = StaticPreview()
+    view = memoryview(data).cast("B")
+    max_opcodes = cfg.CONFIG["PREVIEW_MAX_OPCODES"]
+    max_entries = cfg.CONFIG["PREVIEW_MAX_ENTRIES"]
+    max_arg_bytes = cfg.CONFIG["DISASSEMBLY_ARG_BYTES"]
+    stack: List[PreviewNode] = []
+    marks: List[int] = []
+    memo: Dict[int, PreviewNode] = {}
+
+    def pop_mark() -> List[PreviewNode]:
+        height = marks.pop()
+        items = stack[height:]
+        del stack[height:]
+        return items
+
+    def call(offset: int, label: str, args: List[PreviewNode], kwargs: Optional[PreviewNode] = None) -> PreviewNode:
+        node = PreviewNode("call", label)
+        for arg in args:
+            node.add(arg)
+        if kwargs is not None:
+            for key, value in kwargs.children:
+                node.add(value, key.label.strip("'") if isinstance(key, PreviewNode) else key)
+        preview.call_count += 1
+        if len(preview.calls) < max_entries:
+            preview.calls.append((offset, node))
+        return node
+
+    def imported(module: str, name: str) -> PreviewNode:
+        preview.globals[(module, name)] += 1
+        return PreviewNode("global", f"{module}.{name}")
+
+    def arguments(node: PreviewNode) -> List[PreviewNode]:
+        return [value for _, value in node.children] if node.kind == "tuple" else [node]
+
+    pos = 0
+    try:
+        for count, (opcode, pos, arg_start, arg_end) in enumerate(iter_opcodes(view)):
+            if count >= max_opcodes:
+                preview.error = f"stopped after {max_opcodes:,} opcodes"
+                break
+            preview.opcodes += 1
+            name = opcode.name
+            size = arg_end - arg_start
+
+            if name in _IGNORED_OPCODES:
+                continue
+            if name == "STOP":
+                preview.roots.append(stack.pop())
+                stack.clear()
+                marks.clear()
+                memo.clear()
+            elif name in _SCALAR_OPCODES:
+                stack.append(PreviewNode("scalar", _label(decode_arg(opcode, view, arg_start, arg_end)) if opcode.arg
+                                         else {"NONE": "None", "NEWTRUE": "True", "NEWFALSE": "False"}[name]))
+            elif name in _STRING_OPCODES or name in _BYTES_OPCODES:
+                if size >= cfg.CONFIG["PREVIEW_PAYLOAD_BYTES"]:
+                    preview.payload_count += 1
+                    preview.payload_bytes += size
+                    if len(preview.payloads) < max_entries:
+                        preview.payloads.append((pos, name, size))
+                if size > max_arg_bytes:
+                    kind = "str" if name in _STRING_OPCODES else "bytes"
+                    stack.append(PreviewNode("payload", f"{kind}, {format_bytes(size)}"))
+                else:
+                    stack.append(PreviewNode("scalar", _label(decode_arg(opcode, view, arg_start, arg_end))))
+            elif name == "NEXT_BUFFER":
+                stack.append(PreviewNode("payload", "out-of-band buffer"))
+            elif name in _EMPTY_CONTAINERS:
+                stack.append(PreviewNode(_EMPTY_CONTAINERS[name]))
+            elif name in _MARKED_CONTAINERS:
+                items = pop_mark()
+                node = PreviewNode(_MARKED_CONTAINERS[name])
+                if name == "DICT":
+                    for key, value in zip(items[::2], items[1::2]):
+                        node.add(value, key)
+                else:
+                    for item in items:
+                        node.add(item)
+                stack.append(node)
+            elif name in _SMALL_TUPLES:
+                if len(stack) < _SMALL_TUPLES[name]:
+                    raise IndexError("pop from empty list")
+                node = PreviewNode("tuple")
+                items = stack[-_SMALL_TUPLES[name]:]
+                del stack[-_SMALL_TUPLES[name]:]
+                for item in items:
+                    node.add(item)
+                stack.append(node)
+            elif name == "APPEND":
+                value = stack.pop()
+                stack[-1].add(value)
+            elif name in ("APPENDS", "ADDITEMS"):
+                for item in pop_mark():
+                    stack[-1].add(item)
+            elif name == "SETITEM":
+                value, key = stack.pop(), stack.pop()
+                stack[-1].add(value, key)
+            elif name == "SETITEMS":
+                items = pop_mark()
+                for key, value in zip(items[::2], items[1::2]):
+                    stack[-1].add(value, key)
+            elif name == "POP":
+                stack.pop()
+            elif name == "DUP":
+                stack.append(stack[-1])
+            elif name == "MARK":
+                marks.append(len(stack))
+            elif name == "POP_MARK":
+                pop_mark()
+            elif name in ("PUT", "BINPUT", "LONG_BINPUT", "MEMOIZE"):
+                index = len(memo) if name == "MEMOIZE" else decode_arg(opcode, view, arg_start, arg_end)
+                memo[index] = stack[-1]
+                if stack[-1].memo is None:
+                    stack[-1].memo = index
+            elif name in ("GET", "BINGET", "LONG_BINGET"):
+                stack.append(memo[decode_arg(opcode, view, arg_start, arg_end)])
+            elif name == "GLOBAL":
+                module, _, qualname = decode_arg(opcode, view, arg_start, arg_end).partition(" ")
+                stack.append(imported(module, qualname))
+            elif name == "STACK_GLOBAL":
+                qualname, module = stack.pop(), stack.pop()
+                if module.kind == "scalar" and qualname.kind == "scalar":
+                    stack.append(imported(module.label.strip("'\""), qualname.label.strip("'\"")))
+                else:
+                    stack.append(imported("?", "?"))
+            elif name == "INST":
+                module, _, qualname = decode_arg(opcode, view, arg_start, arg_end).partition(" ")
+                stack.append(call(pos, imported(module, qualname).label, pop_mark()))
+            elif name == "OBJ":
+                items = pop_mark()
+                stack.append(call(pos, items[0].inline(), items[1:]))
+            elif name == "REDUCE":
+                args, func = stack.pop(), stack.pop()
+                stack.append(call(pos, func.inline(), arguments(args)))
+            elif name == "NEWOBJ":
+                args, cls = stack.pop(), stack.pop()
+                stack.append(call(pos, f"{cls.inline()}.__new__", arguments(args)))
+            elif name == "NEWOBJ_EX":
+                kwargs, args, cls = stack.pop(), stack.pop(), stack.pop()
+                stack.append(call(pos, f"{cls.inline()}.__new__", arguments(args), kwargs))
+            elif name == "BUILD":
+                state = stack.pop()
+                stack[-1].add(state, "state")
+            elif name in ("EXT1", "EXT2", "EXT4"):
+                code = decode_arg(opcode, view, arg_start, arg_end)
+                stack.append(imported("copyreg", f"extension {code}"))
+            elif name == "PERSID":
+                stack.append(PreviewNode("unknown", f"persistent id {_label(decode_arg(opcode, view, arg_start, arg_end))}"))
+            elif name == "BINPERSID":
+                stack.append(PreviewNode("unknown", f"persistent id {stack.pop().inline()}"))
+            else:
+                raise ValueError(f"unsupported opcode {name}")
+    except (IndexError, KeyError) as ex:
+        preview.error = f"the pickle can't be run past offset {pos:,} ({type(ex).__name__}: {ex})"
+    except ValueError as ex:
+        preview.error = str(ex)
+
+    preview.roots.extend(stack)  # What was being built when the run stopped
+    return preview
@@ -0,0 +1,371 @@
+import atexit
+import ctypes
+import io
+import json
+import os
+import pickle
+import queue
+import signal
+from functools import lru_cache
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, List, Optional, Tuple, Union
+
+import config as cfg
+from buffers import SharedBuffer
+from exceptions import ExceptionSandboxFailure
+from sizing import format_bytes
+from streams import PickleObjectStream
+from unpicklers import AllowlistUnpickler
+
+try:
+    import resource
+except ImportError:  # Not available on Windows, where the workers run without resource limits
+    resource = None
+
+KIND_OBJECT = "object"
+KIND_DATAFRAME = "dataframe"
+
+
+def _load_object(view: memoryview) -> Any:
+    return pickle.loads(view)
+
+
+def _load_dataframe(view: memoryview) -> Any:
+    import pandas as pd
+
+    # pandas' compatibility shims can still read some pickles written by older versions:
+    return pd.read_pickle(SharedBuffer(view))
+
+
+_LOADERS = {KIND_OBJECT: _load_object, KIND_DATAFRAME: _load_dataframe}
+
+
+def _mapped_bytes() -> int:
+    """
+    The virtual memory the current process maps, or 0 where it can't be told.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _limit_memory(max_bytes: int) -> None:
+    # Both limits are set, so that the unpickled code can't raise the soft one again:
+    if resource is not None and max_bytes:
+        limit = _mapped_bytes() + max_bytes
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _limit_cpu(seconds: int) -> None:
+    # RLIMIT_CPU counts the CPU time of the whole process, so the limit of each job is set from the
+    # time spent so far. Exceeding it kills the worker with SIGXCPU.
+    if resource is not None and seconds:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = int(usage.ru_utime + usage.ru_stime) + seconds
+        resource.setrlimit(resource.RLIMIT_CPU, (soft if hard == resource.RLIM_INFINITY else min(soft, hard), hard))
+
+
+def _hand_off(obj: Any) -> Tuple[dict, bytes]:
+    """
+    Pickles an object to hand it back to the server process. With protocol 5, the data buffers of
+    NumPy arrays (and so of pandas objects) are left out of the pickle: they are copied, one after
+    the other, into a single shared memory segment that the server maps rather than unpickles.
+
+    :return: The header describing the segment, and the pickle without the buffers.
+    """
+    buffers = []
+    payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    views = [buffer.raw() for buffer in buffers]
+    sizes = [view.nbytes for view in views]
+    header = {"segment": None, "sizes": sizes}
+    if sum(sizes):
+        segment = SharedMemory(create=True, size=sum(sizes))
+        pos = 0
+        for view, size in zip(views, sizes):
+            segment.buf[pos:pos + size] = view
+            pos += size
+        header["segment"] = segment.name
+        segment.close()  # The server unlinks it once mapped
+    return header, payload
+
+
+def _run_job(kind: str, name: str, size: int) -> Tuple[dict, bytes]:
+    segment = SharedMemory(name)
+    try:
+        try:
+            obj = _LOADERS[kind](segment.buf[:size])
+        except MemoryError:
+            return {"error": "MemoryError", "limit": True}, b""
+        except Exception as ex:
+            return {"error": f"{type(ex).__name__}: {ex}"}, b""
+    finally:
+        try:
+            segment.close()
+        except BufferError:
+            pass  # Something still refers to the data, the mapping goes away with it
+    try:
+        return _hand_off(obj)
+    except MemoryError:
+        return {"error": "MemoryError", "limit": True}, b""
+    except Exception as ex:
+        return {"error": f"the object could not be handed back: {type(ex).__name__}: {ex}"}, b""
+
+
+def _worker_main(conn: Connection, max_memory: int, cpu_seconds: int) -> None:
+    """
+    The loop of a worker process: reads jobs from the server, unpickles the data each job points
+    to, and replies with a JSON header followed by the pickled result. The worker exits after a
+    job that ran out of memory, since it may have been left in any state.
+    """
+    _limit_memory(max_memory)
+    while True:
+        try:
+            kind, name, size = conn.recv()
+        except EOFError:
+            return
+        _limit_cpu(cpu_seconds)
+        header, payload = _run_job(kind, name, size)
+        conn.send_bytes(json.dumps(header).encode())
+        conn.send_bytes(payload)
+        if header.get("limit"):
+            return
+
+
+def _map_segment(name: str, size: int) -> memoryview:
+    """
+    Maps the shared memory segment a worker handed a result back in, and unlinks it straight away
+    so that it can't outlive the objects built over it. The mapping is kept open by a ``ctypes``
+    array over it, which the objects built over the segment keep alive.
+    """
+    segment = SharedMemory(name)
+    segment.unlink()
+    cell = ctypes.c_char.from_buffer(segment.buf)
+    address = ctypes.addressof(cell)
+    del cell
+    array = (ctypes.c_char * size).from_address(address)
+    array.segment = segment  # Closed (and unmapped) once the array is collected
+    return memoryview(array).cast("B")
+
+
+class _Worker:
+    def __init__(self, context, max_memory: int, cpu_seconds: int):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, max_memory, cpu_seconds), daemon=True)
+        self.process.start()
+        child.close()
+        self.jobs = 0
+
+    def stop(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class SandboxPool:
+    """
+    A pool of worker processes that unpickle untrusted data out of the server process.
+
+    Workers are started as soon as the pool is created, by default by forking them from a server
+    process that has already imported NumPy and pandas, so that a job doesn't wait for a process to
+    start or for its imports. Each worker runs under resource limits: the memory it may map
+    (``RLIMIT_AS``) and the CPU time each job may take (``RLIMIT_CPU``). A job that runs for more
+    than ``timeout`` seconds gets its worker killed. A worker that crashed, hit a limit or served
+    ``max_jobs`` jobs is replaced by a new one, so a pathological pickle only takes down the worker
+    unpickling it.
+
+    The data is handed to the worker through shared memory. Results come back pickled, but the data
+    buffers of NumPy arrays and pandas objects are left out of the pickle (see ``_hand_off``): they
+    are mapped by the server, not copied or unpickled. Results are rebuilt with
+    ``AllowlistUnpickler``, so that only those referencing nothing but allowlisted globals (e.g.
+    builtin containers, NumPy arrays and pandas objects) make it to the server. The pool only
+    isolates the server from the resources and crashes of unpickling: the code a pickle runs in a
+    worker can still do whatever the user running picklevw can do.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        timeout: float,
+        max_memory: int = 0,
+        cpu_seconds: int = 0,
+        max_jobs: int = 0,
+        start_method: Optional[str] = None,
+        preload: Tuple[str, ...] = (),
+    ):
+        """
+        :param workers: The number of worker processes.
+        :type workers: int
+        :param timeout: The seconds a job may take before its worker is killed.
+        :type timeout: float
+        :param max_memory: The bytes a worker may map beyond those it maps once started, 0 for no limit.
+        :type max_memory: int
+        :param cpu_seconds: The CPU seconds a job may take, 0 for no limit.
+        :type cpu_seconds: int
+        :param max_jobs: The number of jobs after which a worker is replaced, 0 to never replace it.
+        :type max_jobs: int
+        :param start_method: The ``multiprocessing`` start method of the workers, the platform's
+            default if None.
+        :type start_method: Optional[str]
+        :param preload: The modules the fork server imports before forking the workers.
+        :type preload: Tuple[str, ...]
+        """
+        self.timeout = timeout
+        self.max_memory = max_memory
+        self.cpu_seconds = cpu_seconds
+        self.max_jobs = max_jobs
+        self._context = get_context(start_method)
+        if start_method == "forkserver":
+            self._context.set_forkserver_preload([*preload, __name__])
+        self._idle = queue.SimpleQueue()
+        for _ in range(workers):
+            self._idle.put(self._start())
+
+    def _start(self) -> _Worker:
+        return _Worker(self._context, self.max_memory, self.cpu_seconds)
+
+    def load(self, data: Union[bytes, bytearray, memoryview], kind: str = KIND_OBJECT) -> Any:
+        """
+        Unpickles the (first) object pickled in some data in one of the workers.
+
+        :param data: The pickle data.
+        :type data: Union[bytes, bytearray, memoryview]
+        :param kind: ``KIND_OBJECT`` to unpickle the data with ``pickle``, ``KIND_DATAFRAME`` to read
+            it with ``pandas.read_pickle``.
+        :type kind: str
+        :return: The unpickled object.
+        :rtype: Any
+        :raises pickle.UnpicklingError: If the data couldn't be unpickled.
+        :raises ExceptionSandboxFailure: If the worker ran out of time or memory, or crashed, or if
+            the object references a global outside ``unpicklers.ALLOWED_GLOBALS``.
+        """
+        try:
+            worker = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise ExceptionSandboxFailure(cfg.MESSAGES["SANDBOX_BUSY"]) from None
+
+        size = memoryview(data).nbytes
+        segment = SharedMemory(create=True, size=max(size, 1))
+        healthy = False
+        try:
+            segment.buf[:size] = memoryview(data).cast("B")
+            worker.conn.send((kind, segment.name, size))
+            if not worker.conn.poll(self.timeout):
+                raise ExceptionSandboxFailure(
+                    cfg.MESSAGES["SANDBOX_LIMIT"].format(
+                        reason=f"running for {self.timeout:g} seconds", setting="SANDBOX_JOB_TIMEOUT"
+                    )
+                )
+            try:
+                header = json.loads(worker.conn.recv_bytes())
+                payload = worker.conn.recv_bytes()
+            except EOFError:
+                raise self._crash(worker) from None
+            if header.get("limit"):
+                raise ExceptionSandboxFailure(
+                    cfg.MESSAGES["SANDBOX_LIMIT"].format(
+                        reason=f"exceeding {format_bytes(self.max_memory)} of memory", setting="SANDBOX_MAX_MEMORY_BYTES"
+                    )
+                )
+            healthy = True
+            if header.get("error"):
+                raise pickle.UnpicklingError(header["error"])
+            return self._rebuild(header, payload)
+        finally:
+            segment.close()
+            segment.unlink()
+            worker.jobs += 1
+            if healthy and (not self.max_jobs or worker.jobs < self.max_jobs):
+                self._idle.put(worker)
+            else:
+                worker.stop()
+                self._idle.put(self._start())
+
+    def _crash(self, worker: _Worker) -> ExceptionSandboxFailure:
+        worker.process.join()
+        code = worker.process.exitcode
+        if resource is not None and code == -signal.SIGXCPU:
+            return ExceptionSandboxFailure(
+                cfg.MESSAGES["SANDBOX_LIMIT"].format(
+                    reason=f"using {self.cpu_seconds:,} seconds of CPU time", setting="SANDBOX_JOB_CPU_SECONDS"
+                )
+            )
+        if code >= 0:
+            reason = f"exited with status {code}"
+        else:
+            try:
+                reason = f"was killed by {signal.Signals(-code).name}"
+            except ValueError:  # A real-time signal, or one Python doesn't name
+                reason = f"was killed by signal {-code}"
+        return ExceptionSandboxFailure(cfg.MESSAGES["SANDBOX_CRASHED"].format(reason=reason))
+
+    @staticmethod
+    def _rebuild(header: dict, payload: bytes) -> Any:
+        buffers = []
+        if header["segment"]:
+            view = _map_segment(header["segment"], sum(header["sizes"]))
+            pos = 0
+            for size in header["sizes"]:
+                buffers.append(view[pos:pos + size])
+                pos += size
+        else:
+            buffers = [memoryview(b"")] * len(header["sizes"])
+        # Whatever the file, the server only rebuilds results that reference allowlisted globals,
+        # since anything else would run the code of the result in the server, without any limit:
+        try:
+            return AllowlistUnpickler(io.BytesIO(payload), buffers=buffers).load()
+        except pickle.UnpicklingError as ex:
+            raise ExceptionSandboxFailure(cfg.MESSAGES["SANDBOX_RESULT"].format(reason=ex)) from None
+
+    def close(self) -> None:
+        """
+        Stops the idle workers.
+
+        :return: None
+        """
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                return
+
+
+class SandboxedObjectStream(PickleObjectStream):
+    """
+    A ``PickleObjectStream`` whose objects are unpickled in a ``SandboxPool``: each object is read
+    from its own slice of the data, which holds all it needs since the memo of a pickle doesn't
+    outlive it.
+    """
+
+    def __init__(self, buffer: SharedBuffer, offsets: List[int], pool: SandboxPool):
+        super().__init__(buffer, offsets)
+        self.pool = pool
+
+    def _load(self, index: int) -> Any:
+        end = self.offsets[index + 1] if index + 1 < len(self.offsets) else None
+        return self.pool.load(self.buffer.getbuffer()[self.offsets[index]:end])
+
+
+@lru_cache(maxsize=1)
+def get_sandbox_pool() -> SandboxPool:
+    """
+    Returns the sandbox pool configured in ``config.CONFIG``, starting its workers on first call.
+
+    :rtype: SandboxPool
+    """
+    pool = SandboxPool(
+        workers=cfg.CONFIG["SANDBOX_WORKERS"],
+        timeout=cfg.CONFIG["SANDBOX_JOB_TIMEOUT"],
+        max_memory=cfg.CONFIG["SANDBOX_MAX_MEMORY_BYTES"],
+        cpu_seconds=cfg.CONFIG["SANDBOX_JOB_CPU_SECONDS"],
+        max_jobs=cfg.CONFIG["SANDBOX_MAX_JOBS"],
+        start_method=cfg.CONFIG["SANDBOX_START_METHOD"],
+        preload=cfg.CONFIG["SANDBOX_PRELOAD"],
+    )
+    atexit.register(pool.close)
+    return pool
@@ -0,0 +1,122 @@
+import itertools
+import sys
+from typing import Any, NamedTuple
+
+from lazy import imported
+
+CONTAINERS = (dict, list, tuple, set, frozenset)
+
+
+class SizeEstimate(NamedTuple):
+    """
+    :ivar nbytes: The bytes taken by the nodes visited.
+    :ivar nodes: The number of nodes visited.
+    :ivar complete: Whether every node was visited, i.e. ``nbytes`` isn't just a lower bound.
+    """
+    nbytes: int
+    nodes: int
+    complete: bool
+
+
+def shallow_size(obj: Any) -> int:
+    """
+    Returns the memory taken by an object, not counting the objects it refers to. NumPy arrays and
+    pandas objects count their data buffers, but not the Python objects stored in them. Neither
+    library is imported to tell: an object can only be one of theirs once they are imported.
+
+    :param obj: The object to measure.
+    :type obj: Any
+    :return: The size of the object in bytes.
+    :rtype: int
+    """
+    np, pd = imported("numpy"), imported("pandas")
+    if np and isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) if obj.base is None else obj.nbytes
+    if pd and isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=False).sum())
+    if pd and isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=False))
+    return sys.getsizeof(obj)
+
+
+def deep_size(obj: Any) -> int:
+    """
+    Returns the memory taken by an object like ``shallow_size``, except that pandas objects also
+    count the Python objects stored in them, as ``memory_usage(deep=True)`` does.
+
+    :param obj: The object to measure.
+    :type obj: Any
+    :return: The size of the object in bytes.
+    :rtype: int
+    """
+    pd = imported("pandas")
+    if pd and isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if pd and isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    return shallow_size(obj)
+
+
+def estimate_size(obj: Any, max_nodes: int, deep: bool = False) -> SizeEstimate:
+    """
+    Estimates the memory taken by an object and by the builtin containers nested in it, walking at
+    most ``max_nodes`` nodes so that the estimate stays cheap however large the object is. Objects
+    referenced more than once are only counted once, so cycles are walked once too.
+
+    With ``deep``, pandas objects are measured with ``deep_size`` and the elements of NumPy object
+    arrays are walked like those of a list.
+
+    :param obj: The object to measure.
+    :type obj: Any
+    :param max_nodes: The largest number of nodes to visit.
+    :type max_nodes: int
+    :param deep: Whether to count the Python objects stored in NumPy and pandas objects.
+    :type deep: bool
+    :return: The estimate.
+    :rtype: SizeEstimate
+    """
+    np = imported("numpy") if deep else None
+    size = deep_size if deep else shallow_size
+    seen = set()
+    stack = [obj]
+    nbytes = nodes = 0
+    truncated = False
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        if nodes >= max_nodes:
+            return SizeEstimate(nbytes, nodes, complete=False)
+        seen.add(id(node))
+        nodes += 1
+        nbytes += size(node)
+
+        if isinstance(node, dict):
+            children = itertools.chain.from_iterable(node.items())
+            count = 2 * len(node)
+        elif isinstance(node, CONTAINERS):
+            children, count = iter(node), len(node)
+        elif np and isinstance(node, np.ndarray) and node.dtype.hasobject:
+            children, count = iter(node.flat), node.size
+        else:
+            continue
+        # There is no point in stacking more nodes than can still be visited:
+        room = max(0, max_nodes - nodes - len(stack))
+        stack.extend(itertools.islice(children, room))
+        truncated = truncated or count > room
+    return SizeEstimate(nbytes, nodes, complete=not truncated)
+
+
+def format_bytes(nbytes: float) -> str:
+    """
+    Formats a size in bytes with a binary unit, e.g. ``"1.5 MiB"``.
+
+    :param nbytes: The size in bytes.
+    :type nbytes: float
+    :rtype: str
+    """
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(nbytes) < 1024 or unit == "GiB":
+            break
+        nbytes /= 1024
+    return f"{nbytes:.0f} {unit}" if unit == "B" else f"{nbytes:.1f} {unit}"
@@ -0,0 +1,58 @@
+import pickle
+import threading
+from collections.abc import Sequence
+from typing import Any, BinaryIO, Callable, List, Union
+
+
+class PickleObjectStream(Sequence):
+    """
+    The objects of a stream of concatenated pickles, unpickled on demand.
+
+    The stream is indexed by the offset at which each pickle starts, so any object can be loaded by
+    seeking to it, without unpickling the ones before it. Nothing is kept once returned: loading
+    the same object twice unpickles it twice.
+    """
+
+    def __init__(
+        self,
+        buffer: BinaryIO,
+        offsets: List[int],
+        unpickler: Callable[[BinaryIO], pickle.Unpickler] = pickle.Unpickler,
+    ):
+        """
+        :param buffer: A seekable stream over the pickle data.
+        :type buffer: BinaryIO
+        :param offsets: The offset at which each pickle starts, in order.
+        :type offsets: List[int]
+        :param unpickler: Builds the unpickler that reads an object from the buffer.
+        :type unpickler: Callable[[BinaryIO], pickle.Unpickler]
+        """
+        self.buffer = buffer
+        self.offsets = offsets
+        self.unpickler = unpickler
+        self._lock = threading.Lock()  # The buffer's position is shared by every reader
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        """
+        Unpickles the object at a position, or a list of the objects in a slice.
+
+        :raises IndexError: If there is no object at that position.
+        """
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"object index {index} out of range")
+        return self._load(index)
+
+    def _load(self, index: int) -> Any:
+        with self._lock:
+            self.buffer.seek(self.offsets[index])
+            return self.unpickler(self.buffer).load()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} of {len(self)} objects>"
@@ -0,0 +1,484 @@
+import bisect
+import contextvars
+import functools
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import config as cfg
+from sizing import estimate_size
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, where concurrent processes of a role may lose each other's loads
+    fcntl = None
+
+JSONL_FILENAME = "telemetry.jsonl"
+# The processes of a role add their loads to the same file, see ``Metrics.publish``:
+PROMETHEUS_FILENAME = "metrics.{role}.prom"
+_SAMPLE = re.compile(r"(?P<name>\w+)\{(?P<labels>.*)\} (?P<value>\S+)")
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+class Span(NamedTuple):
+    """
+    :ivar stage: The name of the stage.
+    :ivar start: When the stage started, in seconds since the start of the trace.
+    :ivar seconds: How long the stage lasted.
+    :ivar depth: The number of spans the span is nested in.
+    :ivar peak_bytes: The peak of the memory allocated by Python during the stage, above what was
+        allocated when it started, or None if the trace doesn't profile memory.
+    :ivar rss_delta: How much the resident set size of the process grew during the stage, or None
+        if the trace doesn't profile memory or the platform can't tell.
+    """
+    stage: str
+    start: float
+    seconds: float
+    depth: int
+    peak_bytes: Optional[int] = None
+    rss_delta: Optional[int] = None
+
+
+def _resident_bytes() -> Optional[int]:
+    """
+    The resident set size of the current process, or None where it can't be told.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# tracemalloc is process-wide: it is started by the first trace profiling memory and only stopped
+# once no trace profiles memory anymore, unless it was started by someone else.
+_TRACEMALLOC_LOCK = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _TRACEMALLOC_LOCK:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _TRACEMALLOC_LOCK:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+class Trace:
+    """
+    The spans timed while loading and displaying one file, in the order they were entered.
+
+    When the trace profiles memory, each span also records the peak of the memory allocated by
+    Python (as traced by ``tracemalloc``) and the growth of the resident set size of the process.
+    The peaks are process-wide: they include what other threads allocate meanwhile.
+
+    :ivar label: What was loaded, e.g. the name of the file.
+    :ivar started: When the trace started, as a Unix timestamp.
+    :ivar spans: The spans, see ``Span``.
+    :ivar attributes: What else to record about the load, e.g. its verdict.
+    :ivar memory: Whether the trace profiles memory.
+    """
+
+    def __init__(self, label: Optional[str] = None, memory: bool = False):
+        self.label = label
+        self.started = time.time()
+        self.spans: List[Span] = []
+        self.attributes: Dict[str, Any] = {}
+        self.memory = memory
+        self.depth = 0
+        # The peak traced so far by each open span, the trace itself first (see _Span):
+        self.peaks: List[int] = []
+        self.traced = 0
+        if memory:
+            tracemalloc.reset_peak()
+            self.traced = tracemalloc.get_traced_memory()[0]
+            self.peaks.append(self.traced)
+        self.origin = time.perf_counter()  # The perf_counter() spans are timed against
+        self._seconds: Optional[float] = None
+        self._peak_bytes: Optional[int] = None
+
+    @property
+    def seconds(self) -> float:
+        """
+        How long the trace lasted, or has lasted so far if it isn't finished.
+
+        :rtype: float
+        """
+        return self._seconds if self._seconds is not None else time.perf_counter() - self.origin
+
+    @property
+    def peak_bytes(self) -> Optional[int]:
+        """
+        The peak of the memory allocated by Python during the trace, or so far if it isn't finished,
+        above what was allocated when it started. None if the trace doesn't profile memory.
+
+        :rtype: Optional[int]
+        """
+        if self._peak_bytes is not None or not self.memory:
+            return self._peak_bytes
+        return max(*self.peaks, tracemalloc.get_traced_memory()[1]) - self.traced
+
+    def finish(self) -> None:
+        self._seconds = time.perf_counter() - self.origin
+        if self.memory:
+            self._peak_bytes = self.peak_bytes
+
+    def record(self) -> dict:
+        """
+        :return: A JSON-serializable record of the trace. Memory figures are only included if the
+            trace profiles memory.
+        :rtype: dict
+        """
+        record = {
+            "label": self.label,
+            "started": self.started,
+            "seconds": round(self.seconds, 6),
+        }
+        if self.memory:
+            record["peak_bytes"] = self.peak_bytes
+        record.update(self.attributes)
+        record["stages"] = [
+            {
+                "stage": span.stage, "start": round(span.start, 6), "seconds": round(span.seconds, 6), "depth": span.depth,
+                **({"peak_bytes": span.peak_bytes, "rss_delta": span.rss_delta} if self.memory else {}),
+            }
+            for span in self.spans
+        ]
+        return record
+
+
+# The trace of the load being run by the current thread (or task), None when nothing is timed:
+_TRACE: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("picklevw_trace", default=None)
+
+
+class _Span:
+    __slots__ = ("trace", "stage", "start", "position", "traced", "resident")
+
+    def __init__(self, trace: Trace, stage: str):
+        self.trace = trace
+        self.stage = stage
+
+    def __enter__(self) -> "_Span":
+        trace = self.trace
+        # The position is reserved on entry, so that nested spans are listed after their parent:
+        self.position = len(trace.spans)
+        trace.spans.append(Span(self.stage, 0.0, 0.0, trace.depth))
+        trace.depth += 1
+        if trace.memory:
+            # tracemalloc keeps a single peak, so it is handed to the enclosing span before being
+            # reset for this one:
+            self.traced, peak = tracemalloc.get_traced_memory()
+            trace.peaks[-1] = max(trace.peaks[-1], peak)
+            tracemalloc.reset_peak()
+            trace.peaks.append(self.traced)
+            self.resident = _resident_bytes()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        end = time.perf_counter()
+        trace = self.trace
+        trace.depth -= 1
+        peak_bytes = rss_delta = None
+        if trace.memory:
+            peak = max(trace.peaks.pop(), tracemalloc.get_traced_memory()[1])
+            trace.peaks[-1] = max(trace.peaks[-1], peak)
+            peak_bytes = peak - self.traced
+            resident = _resident_bytes()
+            if resident is not None and self.resident is not None:
+                rss_delta = resident - self.resident
+        trace.spans[self.position] = Span(
+            self.stage, self.start - trace.origin, end - self.start, trace.depth, peak_bytes, rss_delta
+        )
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+def enabled() -> bool:
+    """
+    :return: Whether loads are timed: when ``CONFIG["TELEMETRY"]`` or ``CONFIG["DEBUG_MODE"]`` is set.
+    :rtype: bool
+    """
+    return bool(cfg.CONFIG["TELEMETRY"] or cfg.CONFIG["DEBUG_MODE"])
+
+
+def span(stage: str):
+    """
+    Times the block of a ``with`` statement as a stage of the current trace. Outside of a trace,
+    a shared context manager that does nothing is returned, so that untimed code only pays for a
+    context variable lookup.
+
+    :param stage: The name of the stage, e.g. ``"decompress"``.
+    :type stage: str
+    :return: A context manager.
+    """
+    current = _TRACE.get()
+    return _NO_SPAN if current is None else _Span(current, stage)
+
+
+def timed(stage: str) -> Callable[[Callable], Callable]:
+    """
+    Decorates a function so that its calls are timed as a stage of the current trace, see ``span``.
+
+    :param stage: The name of the stage.
+    :type stage: str
+    :rtype: Callable[[Callable], Callable]
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            current = _TRACE.get()
+            if current is None:
+                return func(*args, **kwargs)
+            with _Span(current, stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def trace(
+    label: Optional[str] = None, force: bool = False, publish: bool = True, memory: Optional[bool] = None
+) -> Iterator[Optional[Trace]]:
+    """
+    Starts a trace for the spans entered in the block of a ``with`` statement, if telemetry is
+    enabled. Once the block is left, the trace is published (see ``publish``).
+
+    :param label: What is loaded, e.g. the name of the file.
+    :type label: Optional[str]
+    :param force: Whether to trace even if telemetry isn't enabled in ``config.CONFIG``.
+    :type force: bool
+    :param publish: Whether to publish the trace once finished. Worker processes return their
+        records to the process publishing them instead.
+    :type publish: bool
+    :param memory: Whether to profile memory too, which slows down every allocation while the
+        trace lasts. Defaults to ``CONFIG["MEMORY_PROFILING"]``, and implies ``force``.
+    :type memory: Optional[bool]
+    :return: A context manager yielding the trace, or None if telemetry isn't enabled.
+    """
+    memory = cfg.CONFIG["MEMORY_PROFILING"] if memory is None else memory
+    if not (force or memory or enabled()):
+        yield None
+        return
+
+    if memory:
+        _start_tracemalloc()
+    current = Trace(label, memory=bool(memory))
+    token = _TRACE.set(current)
+    try:
+        yield current
+    finally:
+        _TRACE.reset(token)
+        current.finish()
+        if memory:
+            _stop_tracemalloc()
+        if publish:
+            METRICS.publish(current.record())
+
+
+def measure(obj: Any) -> None:
+    """
+    Records the deep size of a loaded object (see ``sizing.estimate_size``) in the current trace,
+    if it profiles memory. At most ``CONFIG["DEEP_SIZE_NODES"]`` objects are walked.
+
+    :param obj: The loaded object.
+    :type obj: Any
+    :return: None
+    """
+    current = _TRACE.get()
+    if current is None or not current.memory:
+        return
+    with span("deep_size"):
+        estimate = estimate_size(obj, cfg.CONFIG["DEEP_SIZE_NODES"], deep=True)
+    current.attributes["deep_size"] = estimate._asdict()
+
+
+def _labels(**labels: str) -> str:
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r"\\(.)", lambda match: "\n" if match.group(1) == "n" else match.group(1), value)
+
+
+class Metrics:
+    """
+    Counters and histograms aggregated over the published trace records, exported in the Prometheus
+    text format: the number of loads by verdict, and the time spent in each stage (nested stages
+    are included in the time of their parents). Every series is labelled with the role of the
+    process, and the Prometheus file of a role combines the loads of all its processes.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...], role: str = "app"):
+        """
+        :param buckets: The upper bounds of the histogram buckets, in seconds.
+        :type buckets: Tuple[float, ...]
+        :param role: What the process publishing the metrics is, e.g. ``"app"`` or ``"cli"``.
+        :type role: str
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.role = role
+        self.loads: Dict[str, int] = {}
+        self.stages: Dict[str, List[float]] = {}  # Stage -> counts per bucket (+Inf last), then the sum
+        self._lock = threading.Lock()
+
+    def observe(self, record: dict) -> None:
+        """
+        Adds a trace record to the metrics.
+
+        :param record: The record, see ``Trace.record``.
+        :type record: dict
+        :return: None
+        """
+        with self._lock:
+            verdict = str(record.get("verdict"))
+            self.loads[verdict] = self.loads.get(verdict, 0) + 1
+            observations = [("total", record["seconds"])]
+            observations.extend((stage["stage"], stage["seconds"]) for stage in record["stages"])
+            for stage, seconds in observations:
+                counts = self.stages.setdefault(stage, [0] * (len(self.buckets) + 2))
+                counts[bisect.bisect_left(self.buckets, seconds)] += 1
+                counts[-1] += seconds
+
+    def exposition(self) -> str:
+        """
+        :return: The metrics in the Prometheus text exposition format.
+        :rtype: str
+        """
+        process = {"role": self.role}
+        with self._lock:
+            lines = [
+                "# HELP picklevw_loads_total Files loaded, by verdict.",
+                "# TYPE picklevw_loads_total counter",
+            ]
+            lines.extend(
+                f"picklevw_loads_total{_labels(**process, verdict=verdict)} {count}"
+                for verdict, count in sorted(self.loads.items())
+            )
+            lines.extend([
+                "# HELP picklevw_stage_seconds Time spent in each stage of loading and displaying a file.",
+                "# TYPE picklevw_stage_seconds histogram",
+            ])
+            for stage, counts in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, count in zip([*map(repr, self.buckets), "+Inf"], counts):
+                    cumulative += count
+                    lines.append(f"picklevw_stage_seconds_bucket{_labels(**process, stage=stage, le=bound)} {cumulative}")
+                lines.append(f"picklevw_stage_seconds_sum{_labels(**process, stage=stage)} {counts[-1]!r}")
+                lines.append(f"picklevw_stage_seconds_count{_labels(**process, stage=stage)} {cumulative}")
+            return "\n".join(lines) + "\n"
+
+    def combine(self, exposition: str) -> None:
+        """
+        Adds the metrics of an exposition to these ones.
+
+        :param exposition: Metrics exported by ``exposition`` with the same buckets.
+        :type exposition: str
+        :raises ValueError: If the exposition can't be read, or has other buckets.
+        :raises KeyError: If one of its series lacks a label.
+        :return: None
+        """
+        bounds = [*map(repr, self.buckets), "+Inf"]
+        cumulative: Dict[str, Tuple[int, int]] = {}  # Stage -> buckets read, and their count
+        with self._lock:
+            for line in exposition.splitlines():
+                if not line or line.startswith("#"):
+                    continue
+                match = _SAMPLE.fullmatch(line)
+                if match is None:
+                    raise ValueError(f"unexpected line {line!r}")
+                labels = {name: _unescape(value) for name, value in _LABEL.findall(match["labels"])}
+                name, value = match["name"], match["value"]
+                if name == "picklevw_loads_total":
+                    self.loads[labels["verdict"]] = self.loads.get(labels["verdict"], 0) + int(value)
+                elif name in ("picklevw_stage_seconds_bucket", "picklevw_stage_seconds_sum"):
+                    counts = self.stages.setdefault(labels["stage"], [0] * (len(self.buckets) + 2))
+                    if name == "picklevw_stage_seconds_sum":
+                        counts[-1] += float(value)
+                    else:  # Buckets are cumulative, and listed in order
+                        position, previous = cumulative.get(labels["stage"], (0, 0))
+                        if position == len(bounds) or labels["le"] != bounds[position]:
+                            raise ValueError(f"unexpected bucket {labels['le']!r}")
+                        counts[position] += int(value) - previous
+                        cumulative[labels["stage"]] = (position + 1, int(value))
+            if any(position != len(bounds) for position, _ in cumulative.values()):
+                raise ValueError("missing buckets")
+
+    def publish(self, record: dict) -> None:
+        """
+        Adds a trace record to the metrics, appends it to the JSON lines file and adds it to the
+        Prometheus file of the role in ``CONFIG["TELEMETRY_DIR"]``. Files are only written if it is
+        set, and failing to write them doesn't fail the load.
+
+        The Prometheus file holds the loads of every process of the role, so that its counters keep
+        growing across restarts and concurrent runs without a file (or a series) per process. The
+        processes sharing the directory take turns at updating it, by locking the JSON lines file.
+
+        :param record: The record, see ``Trace.record``.
+        :type record: dict
+        :return: None
+        """
+        self.observe(record)
+        directory = cfg.CONFIG["TELEMETRY_DIR"]
+        if not directory:
+            return
+        directory = os.path.expanduser(directory)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with self._lock, open(os.path.join(directory, JSONL_FILENAME), "a", encoding="utf-8") as file:
+                if fcntl is not None:
+                    fcntl.flock(file, fcntl.LOCK_EX)  # Released when the file is closed
+                file.write(json.dumps(record, default=str) + "\n")
+                path = os.path.join(directory, PROMETHEUS_FILENAME.format(role=self.role))
+                combined = Metrics(self.buckets, self.role)
+                try:
+                    with open(path, encoding="utf-8") as exported:
+                        combined.combine(exported.read())
+                except FileNotFoundError:
+                    pass
+                except (KeyError, ValueError):  # Exported with other buckets: started over
+                    combined = Metrics(self.buckets, self.role)
+                combined.observe(record)
+                # Replaced at once, so that scrapers never read a partially written file:
+                temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temporary, "w", encoding="utf-8") as exported:
+                    exported.write(combined.exposition())
+                os.replace(temporary, path)
+        except OSError:
+            pass  # Telemetry is best effort
+
+
+METRICS = Metrics(cfg.CONFIG["TELEMETRY_BUCKETS"])
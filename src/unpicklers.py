@@ -0,0 +1,225 @@
+import copyreg
+import functools
+import pickle
+
+import config as cfg
+
+# The reconstructors referenced by NumPy and pandas pickles, none of which can execute arbitrary
+# code. Both the current module layouts and those of older NumPy/pandas releases are listed.
+_NUMPY_GLOBALS = {
+    ("numpy", "dtype"),
+    ("numpy", "ndarray"),
+    ("numpy._core.multiarray", "_reconstruct"),
+    ("numpy._core.multiarray", "scalar"),
+    ("numpy._core.numeric", "_frombuffer"),
+    ("numpy.core.multiarray", "_reconstruct"),
+    ("numpy.core.multiarray", "scalar"),
+    ("numpy.core.numeric", "_frombuffer"),
+}
+
+_PANDAS_GLOBALS = {
+    ("pandas", name) for name in (
+        "DataFrame", "Series", "Index", "RangeIndex", "MultiIndex", "DatetimeIndex", "PeriodIndex",
+        "Categorical", "CategoricalDtype", "DatetimeTZDtype", "PeriodDtype", "IntervalDtype", "StringDtype",
+        "BooleanDtype", "Float32Dtype", "Float64Dtype", "Int8Dtype", "Int16Dtype", "Int32Dtype", "Int64Dtype",
+        "UInt8Dtype", "UInt16Dtype", "UInt32Dtype", "UInt64Dtype", "NA",
+    )
+} | {
+    ("pandas.arrays", name) for name in (
+        "ArrowStringArray", "BooleanArray", "DatetimeArray", "FloatingArray", "IntegerArray", "IntervalArray",
+        "PeriodArray", "StringArray", "TimedeltaArray",
+    )
+} | {
+    ("pandas._libs.tslibs.offsets", name) for name in (
+        "Nano", "Micro", "Milli", "Second", "Minute", "Hour", "Day", "BusinessDay", "Week", "MonthEnd",
+        "MonthBegin", "QuarterEnd", "QuarterBegin", "YearEnd", "YearBegin",
+    )
+} | {
+    ("pandas._libs.arrays", "__pyx_unpickle_NDArrayBacked"),
+    ("pandas._libs.internals", "_unpickle_block"),
+    ("pandas._libs.interval", "__pyx_unpickle_IntervalMixin"),
+    ("pandas._libs.tslibs.nattype", "__nat_unpickle"),
+    ("pandas._libs.tslibs.nattype", "_nat_unpickle"),
+    ("pandas._libs.tslibs.timestamps", "_unpickle_timestamp"),
+    ("pandas._libs.tslibs.timedeltas", "_timedelta_unpickle"),
+    ("pandas.core.arrays.boolean", "BooleanArray"),
+    ("pandas.core.arrays.boolean", "BooleanDtype"),
+    ("pandas.core.arrays.categorical", "Categorical"),
+    ("pandas.core.arrays.datetimes", "DatetimeArray"),
+    ("pandas.core.arrays.floating", "Float32Dtype"),
+    ("pandas.core.arrays.floating", "Float64Dtype"),
+    ("pandas.core.arrays.floating", "FloatingArray"),
+    ("pandas.core.arrays.integer", "IntegerArray"),
+    ("pandas.core.arrays.interval", "IntervalArray"),
+    ("pandas.core.arrays.period", "PeriodArray"),
+    ("pandas.core.arrays.string_", "StringArray"),
+    ("pandas.core.arrays.string_", "StringDtype"),
+    ("pandas.core.arrays.timedeltas", "TimedeltaArray"),
+    ("pandas.core.dtypes.dtypes", "CategoricalDtype"),
+    ("pandas.core.dtypes.dtypes", "DatetimeTZDtype"),
+    ("pandas.core.dtypes.dtypes", "IntervalDtype"),
+    ("pandas.core.dtypes.dtypes", "PeriodDtype"),
+    ("pandas.core.frame", "DataFrame"),
+    ("pandas.core.series", "Series"),
+    ("pandas.core.indexes.base", "Index"),
+    ("pandas.core.indexes.base", "_new_Index"),
+    ("pandas.core.indexes.datetimes", "DatetimeIndex"),
+    ("pandas.core.indexes.datetimes", "_new_DatetimeIndex"),
+    ("pandas.core.indexes.multi", "MultiIndex"),
+    ("pandas.core.indexes.period", "PeriodIndex"),
+    ("pandas.core.indexes.range", "RangeIndex"),
+    ("pandas.core.internals.managers", "BlockManager"),
+    ("pandas.core.internals.managers", "SingleBlockManager"),
+    # Arrow-backed string columns:
+    ("pyarrow.lib", "_restore_array"),
+    ("pyarrow.lib", "py_buffer"),
+    ("pyarrow.lib", "type_for_alias"),
+}
+
+_BUILTIN_GLOBALS = {
+    (module, name)
+    for module in ("builtins", "__builtin__")
+    for name in ("bytearray", "complex", "frozenset", "set", "slice")
+} | {
+    ("_codecs", "encode"),  # bytes, as pickled by protocols 0-2
+    ("collections", "OrderedDict"),
+    ("datetime", "date"),
+    ("datetime", "datetime"),
+    ("datetime", "time"),
+    ("datetime", "timedelta"),
+    ("datetime", "timezone"),
+    ("pytz", "_p"),
+    ("zoneinfo", "ZoneInfo"),
+}
+
+ALLOWED_GLOBALS = frozenset(_NUMPY_GLOBALS | _PANDAS_GLOBALS | _BUILTIN_GLOBALS)
+
+# The classes that pickles rebuild from their state, through NEWOBJ or by handing the class to a
+# reconstructor, and never call. Called with arguments, they would allocate whatever those ask for
+# (numpy.ndarray((10**9,)) returns a gigabyte of uninitialized memory, pandas.DataFrame(None, index,
+# columns) fills any shape), so they resolve to stand-ins instead (see _stand_in).
+_REBUILT_CLASSES = frozenset(
+    (module, name) for module, name in ALLOWED_GLOBALS if name in {
+        "ndarray", "DataFrame", "Series", "Index", "RangeIndex", "MultiIndex", "DatetimeIndex", "PeriodIndex",
+        "Categorical", "ArrowStringArray", "BooleanArray", "DatetimeArray", "FloatingArray", "IntegerArray",
+        "IntervalArray", "PeriodArray", "StringArray", "TimedeltaArray", "SingleBlockManager",
+    }
+)
+
+
+class _StandIn:
+    """
+    The base of the stand-ins of the classes in ``_REBUILT_CLASSES``. NEWOBJ gets an empty instance
+    of the class from its stand-in, for BUILD to fill, but the stand-in can't be called with any
+    arguments, and the reconstructors it's handed to get the class itself (see ``_reconstructor``).
+    """
+
+    rebuilt: type
+
+    def __new__(cls, *args, **kwargs):
+        if args or kwargs:
+            raise pickle.UnpicklingError(f"'{cls.rebuilt.__module__}.{cls.rebuilt.__qualname__}' can only be rebuilt")
+        return cls.rebuilt.__new__(cls.rebuilt)
+
+
+@functools.lru_cache(maxsize=None)
+def _stand_in(rebuilt: type) -> type:
+    return type(rebuilt.__name__, (_StandIn,), {"rebuilt": rebuilt})
+
+
+def _rebuilt(value):
+    return value.rebuilt if isinstance(value, type) and issubclass(value, _StandIn) else value
+
+
+def _reconstructor(function):
+    @functools.wraps(function)
+    def reconstruct(*args, **kwargs):
+        return function(*map(_rebuilt, args), **{key: _rebuilt(value) for key, value in kwargs.items()})
+
+    return reconstruct
+
+
+def _empty_array_reconstructor(function):
+    # NumPy pickles reconstruct an empty ndarray, then fill it from their BUILD state:
+    @functools.wraps(function)
+    def _reconstruct(subtype, shape, dtype):
+        if _rebuilt(subtype) is subtype or 0 not in tuple(shape):
+            raise pickle.UnpicklingError("NumPy arrays can only be reconstructed empty, then filled from their state")
+        return function(subtype.rebuilt, shape, dtype)
+
+    return _reconstruct
+
+
+def _bounded_index_reconstructor(function):
+    # A RangeIndex takes no memory whatever its length, until something fills an array that long:
+    @functools.wraps(function)
+    def reconstruct(*args, **kwargs):
+        index = _reconstructor(function)(*args, **kwargs)
+        if len(index) > cfg.CONFIG["LOAD_BUDGET_BYTES"] // 8:
+            raise pickle.UnpicklingError(f"an index of {len(index):,} entries doesn't fit the load budget")
+        return index
+
+    return reconstruct
+
+
+def _bytearray_of_contents(bytearray_type):
+    # bytearray(n) would allocate n bytes, none of which are in the pickle:
+    @functools.wraps(bytearray_type, updated=())
+    def new_bytearray(*args):
+        if args and isinstance(args[0], int):
+            raise pickle.UnpicklingError("bytearrays can only be rebuilt from their contents")
+        return bytearray_type(*args)
+
+    return new_bytearray
+
+
+# The allowlisted callables whose arguments are checked before they allocate anything, by name:
+_GUARDED_CALLABLES = {
+    "_reconstruct": _empty_array_reconstructor,
+    "_new_Index": _bounded_index_reconstructor,
+    "_new_DatetimeIndex": _bounded_index_reconstructor,
+    "bytearray": _bytearray_of_contents,
+}
+
+
+class AllowlistUnpickler(pickle.Unpickler):
+    """
+    An unpickler that can only import the reconstructors listed in ``ALLOWED_GLOBALS``, so that
+    common NumPy and pandas pickles load without bypassing the safety checks. Referencing any other
+    global fails with ``pickle.UnpicklingError`` before it is imported.
+
+    Nor can those reconstructors allocate more than the pickle holds: the classes of arrays and
+    pandas objects can only be rebuilt from their state, not called, arrays are only reconstructed
+    empty, and indexes can't be longer than ``CONFIG["LOAD_BUDGET_BYTES"]`` holds 8-byte values.
+    """
+
+    def find_class(self, module: str, name: str):
+        if (module, name) not in ALLOWED_GLOBALS:
+            raise pickle.UnpicklingError(f"global '{module}.{name}' is not allowlisted")
+        found = super().find_class(module, name)
+        if (module, name) in _REBUILT_CLASSES:
+            return _stand_in(found)
+        if name in _GUARDED_CALLABLES:
+            return _GUARDED_CALLABLES[name](found)
+        if not isinstance(found, type):
+            return _reconstructor(found)
+        return found
+
+
+class PlainDataUnpickler(pickle.Unpickler):
+    """
+    An unpickler that can't import anything, so that it can only build builtin containers and
+    scalars: referencing any global fails with ``pickle.UnpicklingError``, and without a global
+    there is nothing for REDUCE, OBJ or NEWOBJ to call. It runs at the speed of the C unpickler,
+    which makes it a cheaper proof that a pickle holds plain data than any pass over its opcodes.
+    """
+
+    def find_class(self, module: str, name: str):
+        raise pickle.UnpicklingError(f"global '{module}.{name}' is not plain data")
+
+    def load(self):
+        # The EXT opcodes fetch the objects already looked up in the copyreg extension registry
+        # without going through find_class:
+        if copyreg._extension_cache:
+            raise pickle.UnpicklingError("copyreg extensions are cached")
+        return super().load()
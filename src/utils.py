@@ -1,30 +1,91 @@
+import hashlib
+import importlib
 import io
-import gzip
 import json
 import pickle
-from typing import Any, Tuple, Optional, Union
-
-import numpy as np
-import pandas as pd
-from fickling.analysis import check_safety
-from fickling.exception import UnsafeFileError
-from fickling.fickle import Pickled
-from streamlit.runtime.uploaded_file_manager import UploadedFile
+from functools import cached_property
+from itertools import chain
+from typing import TYPE_CHECKING, Any, BinaryIO, Iterator, List, Tuple, Optional, Union
 
 import config as cfg
-from exceptions import ExceptionUnsafePickle
+from buffers import SharedBuffer
+from compression import decompress_capped, detect_codec
+from exceptions import ExceptionLoadBudget, ExceptionSandboxFailure, ExceptionUnsafePickle
+from lazy import imported
+from opcodes import LoadCost, OpcodeScan, memo_indices_below, scan_opcodes
+from sandbox import KIND_DATAFRAME, SandboxPool, SandboxedObjectStream, get_sandbox_pool
+from sizing import format_bytes
+from streams import PickleObjectStream
+from telemetry import measure, span, timed
+from unpicklers import ALLOWED_GLOBALS, AllowlistUnpickler, PlainDataUnpickler
+from verdicts import get_verdict_store
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from fickling.analysis import check_safety
+    from fickling.exception import UnsafeFileError
+    from fickling.fickle import Pickled
+    from streamlit.runtime.uploaded_file_manager import UploadedFile
+
+# Fickling takes about a tenth of a second to import and is only needed by pickles that import or
+# call something, so the names below are only bound on first use, see ``_import_fickling``:
+_FICKLING_NAMES = {
+    "check_safety": "fickling.analysis",
+    "UnsafeFileError": "fickling.exception",
+    "Pickled": "fickling.fickle",
+}
+
+
+def _import_fickling() -> None:
+    """
+    Imports Fickling and binds the names of ``_FICKLING_NAMES`` in this module, leaving alone those
+    already bound (e.g. patched).
+
+    :return: None
+    """
+    for name, module in _FICKLING_NAMES.items():
+        if name not in globals():
+            globals()[name] = getattr(importlib.import_module(module), name)
+
+
+def _unsafe_file_error() -> type:
+    """
+    Returns Fickling's ``UnsafeFileError``, for except clauses: they are only evaluated once an
+    exception was raised, so Fickling is still only imported when needed.
+
+    :rtype: type
+    """
+    _import_fickling()
+    return UnsafeFileError
+
+
+def __getattr__(name: str) -> Any:
+    if name in _FICKLING_NAMES:
+        _import_fickling()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class PickleSecurityChecker:
 
-    def __init__(self, buffer: io.BytesIO):
+    def __init__(self, buffer: BinaryIO, digest: Optional[str] = None, scan: Optional[OpcodeScan] = None):
         self.buffer = buffer
+        self.digest = digest
+        self.scan = scan
 
+    @timed("safety_check")
     def ensure_safe(self):
         """
         Ensures that the loaded file is safe to process by checking its safety level against a
         predefined severity threshold.
 
+        A fast linear pre-scan of the opcodes runs first: a pickle that neither imports nor calls
+        anything only holds builtin containers and scalars, and is accepted without the (much
+        slower) Fickling analysis. In a stream of concatenated pickles, only those that import or
+        call something are analyzed, each on its own. When the digest of the content is known, the severity Fickling
+        assigned to the same content before is reused from the persistent verdict store.
+
         The function loads the data from a buffer using the `Pickled` module, analyzes its safety
         level using the `check_safety` function, and compares the resulting severity to the
         class-defined severity threshold. If the safety level exceeds the threshold, an
@@ -37,19 +98,96 @@ class PickleSecurityChecker:
             beyond the acceptable threshold.
         :return: None
         """
-        pf = Pickled.load(self.buffer)
-        severity = check_safety(pf).severity
-        if severity.value[0] > cfg.CONFIG["SEVERITY_THRESHOLD"]:
-            raise UnsafeFileError(info="", filepath="")
+        scan = self._scan()
+        if scan is not None and scan.is_plain_data:
+            return
+
+        store = get_verdict_store() if self.digest else None
+        severity = store.get(self.digest) if store else None
+        if severity is None:
+            severity = self._severity(scan)
+            if store:
+                store.put(self.digest, severity, size=self.buffer.seek(0, io.SEEK_END))
+
+        if severity > cfg.CONFIG["SEVERITY_THRESHOLD"]:
+            raise _unsafe_file_error()(info="", filepath="")
+
+    def _scan(self) -> Optional[OpcodeScan]:
+        if self.scan is not None:
+            return self.scan
+        try:
+            with self.buffer.getbuffer() as view:
+                return scan_opcodes(view)
+        except ValueError:
+            return None  # Malformed data: leave the verdict to Fickling
+
+    @timed("fickling")
+    def _severity(self, scan: Optional[OpcodeScan]) -> int:
+        # Fickling only analyzes the pickle the buffer is positioned at, so each of the concatenated
+        # pickles that imports or calls something is analyzed on its own, and the stream is as
+        # severe as the worst of them. Without a scan, only the first pickle is ever read (see
+        # PickleReader.try_read_objects), and only it is analyzed:
+        starts = scan.code_objects if scan is not None and len(scan.object_offsets) > 1 else [None]
+        _import_fickling()
+        severity = 0
+        for position in starts:
+            self.buffer.seek(0 if position is None else scan.object_offsets[position])
+            severity = max(severity, check_safety(Pickled.load(self.buffer)).severity.value[0])
+        return severity
 
 
 class PickleReader:
-    def __init__(self, buffer: io.BytesIO):
+    KIND_STREAM = "stream"
+    KIND_DATAFRAME = "dataframe"
+    KIND_SERIES = "series"
+    KIND_NDARRAY = "ndarray"
+    KIND_IMAGE_BATCH = "image_batch"
+    KIND_GENERIC = "generic"
+    ARRAY_KINDS = (KIND_DATAFRAME, KIND_SERIES, KIND_NDARRAY, KIND_IMAGE_BATCH)
+
+    def __init__(self, buffer: BinaryIO, offsets: Optional[List[int]] = None):
+        """
+        :param buffer: A seekable stream over the pickle data.
+        :type buffer: BinaryIO
+        :param offsets: The offset at which each of the concatenated pickles starts, if already
+            known from an ``OpcodeScan`` of the buffer.
+        :type offsets: Optional[List[int]]
+        """
         self.buffer = buffer
+        self.offsets = offsets
 
-    def try_read_dataframe(self) -> Optional[pd.DataFrame]:
+    @staticmethod
+    def classify(obj: Any, multiple: bool) -> str:
+        """
+        Classifies an unpickled object, so that a single deserialization pass is enough to pick
+        the display path for it. Neither pandas nor NumPy is imported to tell: an object can only
+        be one of theirs once they are imported.
+
+        :param obj: The unpickled object.
+        :type obj: Any
+        :param multiple: Whether the object was built from a stream of several pickled objects.
+        :type multiple: bool
+        :return: One of the ``KIND_*`` class constants.
+        :rtype: str
         """
-        Attempts to read a Pandas DataFrame or Series from a buffer using pickle.
+        if multiple:
+            return PickleReader.KIND_STREAM
+        pd, np = imported("pandas"), imported("numpy")
+        if pd and isinstance(obj, pd.DataFrame):
+            return PickleReader.KIND_DATAFRAME
+        if pd and isinstance(obj, pd.Series):
+            return PickleReader.KIND_SERIES
+        if np and isinstance(obj, np.ndarray):
+            return PickleReader.KIND_NDARRAY
+        if np and isinstance(obj, dict) and isinstance(obj.get("data"), np.ndarray):
+            return PickleReader.KIND_IMAGE_BATCH  # e.g., CIFAR-style dict with image data
+        return PickleReader.KIND_GENERIC
+
+    @timed("unpickle_dataframe")
+    def try_read_dataframe(self) -> Optional["pd.DataFrame"]:
+        """
+        Attempts to read a Pandas DataFrame or Series from a buffer using pickle. pandas is only
+        imported then.
 
         The function resets the position of the buffer to the beginning before reading. If the
         content is successfully unpickled, the function ensures it is either a DataFrame or Series
@@ -59,6 +197,8 @@ class PickleReader:
         contain valid data.
         :rtype: Optional[pd.DataFrame]
         """
+        import pandas as pd
+
         try:
             self.buffer.seek(0)
             obj = pd.read_pickle(self.buffer)
@@ -66,7 +206,8 @@ class PickleReader:
         except (pickle.UnpicklingError, EOFError, ValueError):
             return None
 
-    def try_read_array(self) -> Optional[Union[np.ndarray, pd.DataFrame, pd.Series, dict]]:
+    @timed("unpickle_array")
+    def try_read_array(self) -> Optional[Union["np.ndarray", "pd.DataFrame", "pd.Series", dict]]:
         """
         Attempts to read a supported object (NumPy ndarray, Pandas DataFrame/Series, or a dict containing image data)
         from a buffer using pickle.
@@ -82,64 +223,219 @@ class PickleReader:
         try:
             self.buffer.seek(0)
             obj = pickle.load(self.buffer)
-
-            if isinstance(obj, dict) and isinstance(obj.get("data"), np.ndarray):
-                return obj  # e.g., CIFAR-style dict with image data
-
-            if isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray)):
-                return obj
-
-            return None
+            return obj if PickleReader.classify(obj, multiple=False) in self.ARRAY_KINDS else None
         except (pickle.UnpicklingError, EOFError, ValueError):
             return None
 
-    def try_read_objects(self) -> Tuple[Union[str, Any, None], bool]:
+    @timed("unpickle")
+    def try_read_objects(self) -> Tuple[Union[PickleObjectStream, Any, None], bool]:
         """
         Attempts to read serialized objects from the buffer using the pickle module.
 
-        The method seeks the buffer to the beginning, then iteratively tries to load objects from
-        the buffer until it encounters an EOFError or pickle.UnpicklingError.
+        A single object is unpickled straight away. A stream of several concatenated objects is
+        only indexed: the offset of each object is found in a single pass over the opcodes, and the
+        objects are unpickled one at a time, when accessed through the returned
+        ``PickleObjectStream``.
 
-        In case of any other unexpected exceptions, they are caught silently. After attempting to
-        load objects, it determines the appropriate return values based on how many objects were
-        successfully read.
+        When the opcodes can't be scanned (e.g. the stream ends with garbage), only the first object
+        is read: it is the only one ``PickleSecurityChecker`` analyzes then, so nothing after it is
+        ever unpickled. Errors are caught silently.
 
         :return: A tuple containing two elements:
-            - The first element is a string combining all extracted objects, a single
-              object, or None if the buffer is empty or object deserialization fails.
+            - The first element is a ``PickleObjectStream`` over the objects, a single object, or
+              None if the buffer is empty or object deserialization fails.
             - The second element is a boolean indicating if multiple objects were read
               (True) or if a single or no object was read (False).
-        :rtype: Tuple[Union[str, Any, None], bool]
+        :rtype: Tuple[Union[PickleObjectStream, Any, None], bool]
+        """
+        offsets = self.offsets
+        if offsets is None:
+            try:
+                offsets = self._scan_offsets()
+            except (AttributeError, ValueError):
+                offsets = [0]
+
+        if len(offsets) > 1:
+            return PickleObjectStream(self.buffer, offsets), True
+        try:
+            self.buffer.seek(0)
+            return (pickle.load(self.buffer), False) if offsets else (None, False)
+        except Exception:
+            return None, False
+
+    @timed("unpickle_allowlisted")
+    def read_allowlisted(self) -> Tuple[Union[PickleObjectStream, Any, None], bool]:
+        """
+        Reads the buffer with ``AllowlistUnpickler``, which can only import the NumPy, pandas and
+        builtin reconstructors listed in ``unpicklers.ALLOWED_GLOBALS``.
+
+        Unlike ``try_read_objects``, errors are not swallowed. A stream of several objects is
+        returned as a ``PickleObjectStream`` whose objects are read with ``AllowlistUnpickler`` too.
+
+        :return: The same tuple returned by ``try_read_objects``.
+        :rtype: Tuple[Union[PickleObjectStream, Any, None], bool]
+        :raises pickle.UnpicklingError: If the pickle references a global outside the allowlist.
+        :raises ValueError: If the buffer isn't a well-formed pickle stream.
         """
+        offsets = self.offsets if self.offsets is not None else self._scan_offsets()
+        if len(offsets) > 1:
+            return PickleObjectStream(self.buffer, offsets, unpickler=AllowlistUnpickler), True
+        if not offsets:
+            return None, False
         self.buffer.seek(0)
-        objects = []
+        return AllowlistUnpickler(self.buffer).load(), False
+
+    @timed("unpickle_plain")
+    def read_plain(self) -> Any:
+        """
+        Reads the buffer with ``PlainDataUnpickler``, which can't import anything, so that a
+        pickle holding only builtin containers and scalars is proven to do so by unpickling it,
+        without any pass over its opcodes.
+
+        :return: The unpickled object.
+        :rtype: Any
+        :raises pickle.UnpicklingError: If the pickle references a global.
+        :raises ValueError: If the buffer holds more than one pickle, or trailing bytes.
+        """
+        self.buffer.seek(0)
+        obj = PlainDataUnpickler(self.buffer).load()
+        if self.buffer.read(1):
+            raise ValueError("the buffer doesn't end with the pickle")
+        return obj
+
+    def _scan_offsets(self) -> List[int]:
+        with self.buffer.getbuffer() as view:
+            return scan_opcodes(view).object_offsets
+
+
+class SandboxedReader(PickleReader):
+    """
+    A ``PickleReader`` that unpickles in the worker processes of a ``SandboxPool`` rather than in
+    the current one. Streams of several objects are returned as a ``SandboxedObjectStream``.
+    """
+
+    def __init__(self, buffer: SharedBuffer, offsets: Optional[List[int]] = None, pool: Optional[SandboxPool] = None):
+        """
+        :param buffer: A stream over the pickle data.
+        :type buffer: SharedBuffer
+        :param offsets: The offset at which each of the concatenated pickles starts, if already
+            known from an ``OpcodeScan`` of the buffer.
+        :type offsets: Optional[List[int]]
+        :param pool: The pool unpickling the data, the one configured in ``config.CONFIG`` by default.
+        :type pool: Optional[SandboxPool]
+        """
+        super().__init__(buffer, offsets)
+        self.pool = pool or get_sandbox_pool()
+
+    @timed("sandbox_unpickle_dataframe")
+    def try_read_dataframe(self) -> Optional["pd.DataFrame"]:
+        """
+        Same as ``PickleReader.try_read_dataframe``, in a worker.
+
+        :rtype: Optional[pd.DataFrame]
+        :raises ExceptionSandboxFailure: If the worker hit its limits or crashed.
+        """
         try:
-            while True:
-                objects.append(pickle.load(self.buffer))
-        except (EOFError, pickle.UnpicklingError):
-            pass
-        except Exception as e:
-            pass
+            obj = self.pool.load(self.buffer.getbuffer(), kind=KIND_DATAFRAME)
+        except pickle.UnpicklingError:
+            return None
+        kind = PickleReader.classify(obj, multiple=False)
+        return obj if kind in (PickleReader.KIND_DATAFRAME, PickleReader.KIND_SERIES) else None
 
-        if len(objects) > 1:
-            return ", ".join(map(str, objects)), True
-        elif len(objects) == 1:
-            return objects[0], False
-        return None, False
+    @timed("sandbox_unpickle")
+    def try_read_objects(self) -> Tuple[Union[PickleObjectStream, Any, None], bool]:
+        """
+        Same as ``PickleReader.try_read_objects``, in a worker. Nothing is unpickled in the current
+        process, even to locate the objects of a stream whose opcodes can't be scanned: only its
+        first object is read then.
+
+        :rtype: Tuple[Union[PickleObjectStream, Any, None], bool]
+        :raises ExceptionSandboxFailure: If the worker hit its limits or crashed.
+        """
+        offsets = self.offsets
+        if offsets is None:
+            try:
+                offsets = self._scan_offsets()
+            except ValueError:
+                offsets = [0]
+
+        if len(offsets) > 1:
+            return SandboxedObjectStream(self.buffer, offsets, self.pool), True
+        if not offsets:
+            return None, False
+        try:
+            return self.pool.load(self.buffer.getbuffer()), False
+        except pickle.UnpicklingError:
+            return None, False
 
 
 class PickleLoader:
-    def __init__(self, file: UploadedFile, allow_unsafe_file: bool = False):
+    def __init__(self, file: "UploadedFile", allow_unsafe_file: bool = False):
         self.file = file
         self.allow_unsafe_file = allow_unsafe_file
         self.raw_data = self._read_file()
-        self.is_gzipped = self.raw_data.startswith(b"\x1f\x8b")
-        self.buffer = self._get_buffer()
+        self.codec = detect_codec(self.raw_data)
+        self.is_gzipped = self.codec is not None and self.codec.name == "gzip"
+        self.verdict = None
+
+    @cached_property
+    def buffer(self) -> SharedBuffer:
+        """
+        The (decompressed) pickle data. It is only built on first access, so that a loader whose
+        result is served from the load cache never decompresses its content.
+
+        :rtype: SharedBuffer
+        """
+        return self._get_buffer()
+
+    @cached_property
+    def digest(self) -> str:
+        """
+        The SHA-256 hex digest of the raw (possibly compressed) file content.
+
+        :rtype: str
+        """
+        return hashlib.sha256(self.raw_data).hexdigest()
+
+    @cached_property
+    def opcode_scan(self) -> Optional[OpcodeScan]:
+        """
+        The outcome of a single pass over the opcodes of the pickle data, or None if the data isn't
+        a well-formed pickle stream.
 
+        :rtype: Optional[OpcodeScan]
+        """
+        try:
+            with self.buffer.getbuffer() as view, span("scan_opcodes"):
+                return scan_opcodes(view)
+        except ValueError:
+            return None
+
+    @property
+    def cache_key(self) -> Tuple[str, bool]:
+        """
+        The key identifying the outcome of ``load`` in the load cache: the same content loaded with
+        the same ``allow_unsafe_file`` flag always yields the same result.
+
+        :rtype: Tuple[str, bool]
+        """
+        return self.digest, self.allow_unsafe_file
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The size of the decompressed pickle data, used as the estimated size of the loaded result.
+
+        :rtype: int
+        """
+        return self.buffer.getbuffer().nbytes
+
+    @timed("read")
     def _read_file(self) -> bytes:
         """
         Reads the entire content of the associated file object starting from the beginning and
-        returns it as a bytes object.
+        returns it as a bytes object. Reading an in-memory upload at once from its start returns the
+        upload's own bytes object, without copying it.
 
         :return: The content of the file as bytes.
         :rtype: bytes
@@ -147,15 +443,23 @@ class PickleLoader:
         self.file.seek(0)
         return self.file.read()
 
-    def _get_buffer(self) -> io.BytesIO:
+    @timed("decompress")
+    def _get_buffer(self) -> SharedBuffer:
         """
-        Decompresses the raw data if gzipped and returns it as a BytesIO object.
+        Decompresses the raw data if compressed (gzip, bz2, xz, lzma, zstd, lz4 or zip, detected from
+        its magic bytes) and wraps it in a SharedBuffer. The raw data itself is wrapped as-is,
+        without being copied.
+
+        Decompression is streamed into a growable buffer and stops as soon as the expanded content
+        exceeds the limits set in ``config.CONFIG``.
 
-        :return: A BytesIO object containing the decompressed or raw data.
-        :rtype: io.BytesIO
+        :return: A SharedBuffer over the decompressed or raw data.
+        :rtype: SharedBuffer
+        :raises ExceptionDecompressionLimit: If the content expands beyond the configured limits.
+        :raises ExceptionMissingCodec: If the codec needs an optional package that isn't installed.
         """
-        data = gzip.decompress(self.raw_data) if self.is_gzipped else self.raw_data
-        return io.BytesIO(data)
+        data = decompress_capped(self.raw_data, self.codec) if self.codec else self.raw_data
+        return SharedBuffer(data)
 
     def load(self) -> Tuple[Any, bool, bool]:
         """
@@ -166,8 +470,21 @@ class PickleLoader:
         If the buffer contains a valid DataFrame, it will return the DataFrame.
         If the buffer contains generic objects, it will attempt to read and return them.
 
+        Pickles whose only imports are the NumPy, pandas and builtin reconstructors listed in
+        ``unpicklers.ALLOWED_GLOBALS`` are read with a restricted unpickler straight away, without
+        the Fickling analysis and without requiring the bypass.
+
         The function also handles cases where the buffer might be deemed unsafe, allowing unsafe
-        reads for DataFrame if explicitly permitted.
+        reads for DataFrame if explicitly permitted. Such reads run in the worker processes of the
+        sandbox pool (see ``sandbox.SandboxPool``), unless ``CONFIG["SANDBOX_WORKERS"]`` is 0.
+
+        A single pickle holding only builtin containers and scalars is read first, with an unpickler
+        that can't import anything, and without scanning its opcodes, when its size is small enough
+        for the load budget set in ``config.CONFIG``. Otherwise, whatever the verdict, nothing is
+        unpickled when the opcodes show that it would take more memory than the budget allows.
+
+        When the current trace profiles memory (see ``telemetry.trace``), the deep size of a single
+        loaded object is recorded in it.
 
         :return: A tuple containing the deserialized object (DataFrame or generic object), a boolean
             indicating whether multiple objects were deserialized, and a boolean flag indicating if
@@ -175,55 +492,229 @@ class PickleLoader:
         :rtype: Tuple[Any, bool, bool]
         :raises UnsafeFileError: If the pickle buffer is determined to be unsafe and unsafe file
             reading is not allowed.
+        :raises ExceptionLoadBudget: If unpickling the buffer is expected to exceed the load budget.
+        :raises ExceptionSandboxFailure: If the sandbox worker unpickling the buffer hit its limits
+            or crashed.
         :raises Exception: When deserialization is deemed unsafe and there are potential security
             threats due to unsafe pickle.
         """
-        buf = self.buffer.getvalue()
+        obj, multiple, is_dataframe = result = self._load()
+        # The objects of a stream are only unpickled on demand, so only single objects are measured:
+        if not multiple:
+            measure(obj)
+        return result
+
+    def _load(self) -> Tuple[Any, bool, bool]:
+        # The checker and the reader get their own streams over the same, shared buffer:
+        buf = self.buffer
+
+        # Plain data is read straight away by an unpickler that can't import anything, when its
+        # size alone shows that it fits the load budget and its memo indices don't go past its size.
+        # Anything else (an import, a stream of several pickles, malformed data, containers nested
+        # too deep) falls through to the opcode scan and the checks below:
+        if self._fits_plain_data_budget():
+            try:
+                obj = PickleReader(buf.fork()).read_plain()
+            except Exception:
+                pass
+            else:
+                if _nesting_within(obj, cfg.CONFIG["LOAD_MAX_DEPTH"], self.nbytes):
+                    self.verdict = cfg.VERDICTS["SAFE"]
+                    return obj, False, False
+                del obj
+
+        scan = self.opcode_scan
+        if scan is not None:
+            self._ensure_within_budget(scan.cost)
+
+        # NumPy and pandas pickles that only import allowlisted reconstructors are read with the
+        # restricted unpickler, without the Fickling analysis and without the bypass:
+        if scan is not None and not scan.is_plain_data and scan.only_imports(ALLOWED_GLOBALS):
+            try:
+                obj, multiple = PickleReader(buf.fork(), scan.object_offsets).read_allowlisted()
+            except Exception:
+                pass  # Leave the verdict to the regular checks below
+            else:
+                self.verdict = cfg.VERDICTS["ALLOWLISTED"]
+                kind = PickleReader.classify(obj, multiple)
+                return obj, multiple, kind in (PickleReader.KIND_DATAFRAME, PickleReader.KIND_SERIES)
 
         try:
             # Always check safety first:
-            PickleSecurityChecker(io.BytesIO(buf)).ensure_safe()
+            PickleSecurityChecker(buf.fork(), digest=self.digest, scan=scan).ensure_safe()
 
             # Safe deserialization:
-            reader = PickleReader(io.BytesIO(buf))
+            self.verdict = cfg.VERDICTS["SAFE"]
+            reader = PickleReader(buf.fork(), scan.object_offsets if scan else None)
             obj, multiple = reader.try_read_objects()
             return obj, multiple, False
 
-        except UnsafeFileError:
+        except _unsafe_file_error():
             if not self.allow_unsafe_file:
+                self.verdict = cfg.VERDICTS["UNSAFE"]
                 raise ExceptionUnsafePickle(cfg.MESSAGES["POTENTIAL_THREAT"])
 
-            reader = PickleReader(io.BytesIO(buf))
-
-            df = reader.try_read_dataframe()
-            if df is not None:
-                return df, False, True  # "multiple" concept doesn't really apply here
+            self.verdict = cfg.VERDICTS["BYPASSED"]
+
+            # Unpickle once, then classify what came out of the buffer:
+            offsets = scan.object_offsets if scan else None
+            if cfg.CONFIG["SANDBOX_WORKERS"]:
+                reader = SandboxedReader(buf.fork(), offsets)
+            else:
+                reader = PickleReader(buf.fork(), offsets)
+            try:
+                obj, multiple = reader.try_read_objects()
+                if obj is None:
+                    # pandas' compatibility shims can still read some pickles written by older versions:
+                    obj, multiple = reader.try_read_dataframe(), False
+            except ExceptionSandboxFailure:
+                self.verdict = cfg.VERDICTS["KILLED"]
+                raise
 
-            arr = reader.try_read_array()
-            if arr is not None:
-                return arr, False, False
-
-            obj, multiple = reader.try_read_objects()
-            # If obj can be None, keep the guard; otherwise remove it.
             if obj is not None:
-                is_df = isinstance(obj, (pd.DataFrame, pd.Series))
-                return obj, multiple, is_df
+                kind = PickleReader.classify(obj, multiple)
+                return obj, multiple, kind in (PickleReader.KIND_DATAFRAME, PickleReader.KIND_SERIES)
 
             raise ExceptionUnsafePickle(cfg.MESSAGES["POTENTIAL_THREAT"])
 
+    def _fits_plain_data_budget(self) -> bool:
+        """
+        Whether the buffer, if it only holds builtin containers and scalars, can be unpickled
+        within ``CONFIG["LOAD_BUDGET_BYTES"]`` without scanning its opcodes first.
+
+        :rtype: bool
+        """
+        if LoadCost.of_plain_data(self.nbytes).estimated_bytes > cfg.CONFIG["LOAD_BUDGET_BYTES"]:
+            return False
+        with self.buffer.getbuffer() as view:
+            return memo_indices_below(view, self.nbytes)
+
+    def _ensure_within_budget(self, cost: LoadCost) -> None:
+        """
+        Refuses pickles whose objects are estimated, from their opcodes, to take more memory than
+        ``CONFIG["LOAD_BUDGET_BYTES"]``, or whose containers are nested deeper than
+        ``CONFIG["LOAD_MAX_DEPTH"]``.
+
+        :param cost: The cost of unpickling the buffer.
+        :type cost: LoadCost
+        :raises ExceptionLoadBudget: If the cost exceeds the budget.
+        :return: None
+        """
+        if cost.estimated_bytes > cfg.CONFIG["LOAD_BUDGET_BYTES"]:
+            reason = f"about {format_bytes(cost.estimated_bytes)} of memory"
+            setting = "LOAD_BUDGET_BYTES"
+        elif cost.max_depth > cfg.CONFIG["LOAD_MAX_DEPTH"]:
+            reason = f"containers nested {cost.max_depth:,} levels deep"
+            setting = "LOAD_MAX_DEPTH"
+        else:
+            return
+        self.verdict = cfg.VERDICTS["OVER_BUDGET"]
+        raise ExceptionLoadBudget(cfg.MESSAGES["LOAD_BUDGET"].format(reason=reason, setting=setting))
+
+
+_PLAIN_CONTAINERS = frozenset({list, tuple, dict, set, frozenset})
+
+
+def _level_items(level: List[Any]) -> Iterator[Any]:
+    # The items of all the containers of a level, dictionary keys and values alike:
+    return chain(chain.from_iterable(level), chain.from_iterable(c.values() for c in level if type(c) is dict))
+
+
+def _nesting_within(obj: Any, max_depth: int, max_items: int) -> bool:
+    """
+    Determines if the builtin containers of an unpickled object are known to be nested at most
+    ``max_depth`` levels deep, a flat container being one level deep (as ``scan_opcodes`` counts
+    them).
+
+    The containers are walked one level at a time, without recursing, and the levels without any
+    container among their items are told apart at C speed. A container shared by several others is
+    walked again at each depth it's found at, so that the longest path is measured: once more than
+    ``max_items`` items were walked that way, or if a container contains itself, the nesting is
+    reported as unknown rather than within the limit.
+
+    :param obj: The object to measure.
+    :type obj: Any
+    :param max_depth: The deepest nesting allowed.
+    :type max_depth: int
+    :param max_items: The most items to walk.
+    :type max_items: int
+    :rtype: bool
+    """
+    level = [obj] if type(obj) in _PLAIN_CONTAINERS else []
+    walked = 0
+    for _ in range(max_depth):
+        walked += sum(map(len, level))
+        if not level or _PLAIN_CONTAINERS.isdisjoint(map(type, _level_items(level))):
+            return True
+        if walked > max_items:
+            return False
+        children = {id(item): item for item in _level_items(level) if type(item) in _PLAIN_CONTAINERS}
+        level = list(children.values())
+    return not level
+
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
 
 def is_json_serializable(obj: Any) -> bool:
     """
     Determines if an object is JSON serializable.
 
+    Rather than serializing the object, its structure is walked: the walk stops at the first node
+    ``json.dumps`` would refuse (e.g. a set, a custom object, a non-string key that JSON can't
+    coerce, or a container that contains itself), and no string is built.
+
     :param obj: The object to be tested for JSON serializability.
     :type obj: Any
     :return: A boolean value indicating whether the object is JSON
         serializable.
     :rtype: bool
     """
-    try:
-        json.dumps(obj)
-        return True
-    except (TypeError, OverflowError):
-        return False
+    stack = [(obj, False)]
+    on_path = set()  # The containers being walked, to detect circular references
+    while stack:
+        node, leaving = stack.pop()
+        if leaving:
+            on_path.discard(id(node))
+            continue
+        if isinstance(node, _JSON_SCALARS):
+            continue
+        if isinstance(node, dict):
+            if not all(isinstance(key, _JSON_SCALARS) for key in node):
+                return False
+            children = node.values()
+        elif isinstance(node, (list, tuple)):
+            children = node
+        else:
+            return False
+        if id(node) in on_path:
+            return False
+        on_path.add(id(node))
+        stack.append((node, True))
+        stack.extend((child, False) for child in children)
+    return True
+
+
+def serialize_json(obj: Any, max_chars: Optional[int] = None) -> Tuple[str, bool]:
+    """
+    Serializes a JSON serializable object with an indentation of 4, stopping as soon as the output
+    reaches ``max_chars`` characters, so that the serialization of a large object is never built
+    as a whole only to be cut.
+
+    :param obj: The object to serialize.
+    :type obj: Any
+    :param max_chars: The largest number of characters to produce, ``CONFIG["JSON_MAX_CHARS"]`` by
+        default.
+    :type max_chars: Optional[int]
+    :return: The JSON text, and whether it was truncated.
+    :rtype: Tuple[str, bool]
+    """
+    max_chars = max_chars or cfg.CONFIG["JSON_MAX_CHARS"]
+    chunks = []
+    length = 0
+    for chunk in json.JSONEncoder(indent=4).iterencode(obj):
+        chunks.append(chunk)
+        length += len(chunk)
+        if length > max_chars:
+            return "".join(chunks)[:max_chars], True
+    return "".join(chunks), False
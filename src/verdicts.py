@@ -0,0 +1,140 @@
+import os
+import sqlite3
+import time
+from contextlib import closing
+from functools import lru_cache
+from importlib import metadata
+from typing import Optional
+
+import config as cfg
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    digest TEXT PRIMARY KEY,
+    severity INTEGER NOT NULL,
+    fickling_version TEXT NOT NULL,
+    threshold INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS verdicts_last_used ON verdicts (last_used);
+"""
+
+
+@lru_cache(maxsize=1)
+def fickling_version() -> str:
+    try:
+        return metadata.version("fickling")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class VerdictStore:
+    """
+    A persistent, SQLite-backed store of Fickling verdicts keyed by the SHA-256 digest of the file
+    content, so that neither the app nor the command line interface analyze the same file twice,
+    even across restarts.
+
+    A verdict is the severity Fickling assigned to the content. It is only reused if it was computed
+    by the installed Fickling version against the current ``SEVERITY_THRESHOLD``; other verdicts
+    are dropped. The least recently used verdicts are pruned once the store holds more than
+    ``max_entries`` of them, or once the files they were computed for add up to more than
+    ``max_bytes``.
+
+    The store is best-effort: if the database can't be opened or written, verdicts are simply not
+    reused.
+    """
+
+    FILENAME = "verdicts.sqlite3"
+
+    def __init__(self, directory: str, max_entries: int, max_bytes: Optional[int] = None):
+        self.path = os.path.join(os.path.expanduser(directory), self.FILENAME)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=cfg.CONFIG["VERDICT_STORE_TIMEOUT"])
+        connection.executescript(SCHEMA)
+        return connection
+
+    def get(self, digest: str) -> Optional[int]:
+        """
+        Returns the severity stored for ``digest``, provided it is still valid.
+
+        :param digest: The SHA-256 hex digest of the file content.
+        :type digest: str
+        :return: The stored severity, or None if there's no valid verdict for the digest.
+        :rtype: Optional[int]
+        """
+        try:
+            with closing(self._connect()) as connection, connection:
+                row = connection.execute(
+                    "SELECT severity, fickling_version, threshold FROM verdicts WHERE digest = ?",
+                    (digest,),
+                ).fetchone()
+                if row is None:
+                    return None
+                severity, version, threshold = row
+                if version != fickling_version() or threshold != cfg.CONFIG["SEVERITY_THRESHOLD"]:
+                    connection.execute("DELETE FROM verdicts WHERE digest = ?", (digest,))
+                    return None
+                connection.execute(
+                    "UPDATE verdicts SET last_used = ? WHERE digest = ?", (time.time(), digest)
+                )
+                return severity
+        except (sqlite3.Error, OSError):
+            return None
+
+    def put(self, digest: str, severity: int, size: int) -> None:
+        """
+        Stores the severity of the content with the given digest, then prunes the least recently
+        used verdicts beyond ``max_entries``, and those beyond ``max_bytes`` of content.
+
+        :param digest: The SHA-256 hex digest of the file content.
+        :type digest: str
+        :param severity: The severity assigned by Fickling.
+        :type severity: int
+        :param size: The size of the analyzed content in bytes.
+        :type size: int
+        :return: None
+        """
+        try:
+            with closing(self._connect()) as connection, connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        digest,
+                        severity,
+                        fickling_version(),
+                        cfg.CONFIG["SEVERITY_THRESHOLD"],
+                        size,
+                        time.time(),
+                    ),
+                )
+                connection.execute(
+                    "DELETE FROM verdicts WHERE digest IN "
+                    "(SELECT digest FROM verdicts ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                if self.max_bytes is not None:
+                    connection.execute(
+                        "DELETE FROM verdicts WHERE digest IN (SELECT digest FROM "
+                        "(SELECT digest, SUM(size) OVER (ORDER BY last_used DESC, digest) AS total FROM verdicts) "
+                        "WHERE total > ?)",
+                        (self.max_bytes,),
+                    )
+        except (sqlite3.Error, OSError):
+            pass
+
+
+def get_verdict_store() -> Optional[VerdictStore]:
+    """
+    Returns the verdict store configured in ``config.CONFIG``, or None if it is disabled.
+
+    :rtype: Optional[VerdictStore]
+    """
+    directory = cfg.CONFIG["VERDICT_STORE_DIR"]
+    if not directory:
+        return None
+    return VerdictStore(directory, cfg.CONFIG["VERDICT_STORE_MAX_ENTRIES"], cfg.CONFIG["VERDICT_STORE_MAX_BYTES"])
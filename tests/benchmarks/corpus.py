@@ -0,0 +1,232 @@
+"""
+Generates the synthetic pickles the benchmarks load: the same ``scale`` and ``seed`` always yield
+the same bytes, so that results taken on different commits can be compared.
+"""
+import gzip
+import itertools
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+PROTOCOLS = (2, 3, 4, 5)
+
+# gzip's header holds a timestamp, which is pinned so that compressed cases are reproducible too:
+GZIP_MTIME = 0
+
+
+class Case(NamedTuple):
+    """
+    :ivar name: What identifies the case across runs, e.g. ``"nested_dict-p4-gzip"``.
+    :ivar family: The kind of object pickled, see ``FAMILIES``.
+    :ivar protocol: The pickle protocol.
+    :ivar compressed: Whether the pickle is gzipped.
+    :ivar data: The content of the file.
+    """
+    name: str
+    family: str
+    protocol: int
+    compressed: bool
+    data: bytes
+
+
+class Exploit:
+    """
+    Pickles as a call to ``func`` with ``args``. Nothing is called: only the pickle is built.
+    """
+
+    def __init__(self, func: Callable, args: tuple):
+        self.func = func
+        self.args = args
+
+    def __reduce__(self):
+        return self.func, self.args
+
+
+def _scaled(count: int, scale: float) -> int:
+    return max(1, int(count * scale))
+
+
+def nested_dict(scale: float, rng: np.random.Generator) -> Any:
+    fanout = _scaled(8, scale ** (1 / 4))  # 4 levels of fanout, so the leaves grow with the scale
+
+    def node(depth: int) -> Any:
+        if depth == 0:
+            return {"id": int(rng.integers(1 << 31)), "name": f"leaf-{rng.integers(1000)}", "weight": float(rng.random())}
+        return {f"key_{i}": node(depth - 1) for i in range(fanout)}
+
+    return node(4)
+
+
+def large_list(scale: float, rng: np.random.Generator) -> Any:
+    size = _scaled(200_000, scale)
+    return [int(value) if i % 2 else float(value) for i, value in enumerate(rng.integers(0, 1 << 20, size))]
+
+
+def string_list(scale: float, rng: np.random.Generator) -> Any:
+    return [f"item-{value:08d}" for value in rng.integers(0, 10 ** 8, _scaled(100_000, scale))]
+
+
+def _frame(rows: int, columns: int, rng: np.random.Generator) -> pd.DataFrame:
+    data = {}
+    for column in range(columns):
+        kind = column % 4
+        if kind == 0:
+            data[f"f{column}"] = rng.random(rows)
+        elif kind == 1:
+            data[f"i{column}"] = rng.integers(0, 1_000, rows)
+        elif kind == 2:
+            data[f"s{column}"] = pd.Series(rng.choice(["red", "green", "blue"], rows), dtype=object)
+        else:
+            data[f"t{column}"] = pd.date_range("2020-01-01", periods=rows, freq="min")
+    return pd.DataFrame(data)
+
+
+def dataframe_long(scale: float, rng: np.random.Generator) -> Any:
+    return _frame(_scaled(100_000, scale), 4, rng)
+
+
+def dataframe_wide(scale: float, rng: np.random.Generator) -> Any:
+    return _frame(_scaled(1_000, scale), 200, rng)
+
+
+def _array(dtype: str) -> Callable[[float, np.random.Generator], Any]:
+    def build(scale: float, rng: np.random.Generator) -> Any:
+        return (rng.random((_scaled(10_000, scale), 100)) * 255).astype(dtype)
+
+    return build
+
+
+def image_batch(scale: float, rng: np.random.Generator) -> Any:
+    count = _scaled(1_000, scale)
+    return {
+        "data": rng.integers(0, 256, (count, 3072), dtype=np.uint8),
+        "labels": rng.integers(0, 10, count).tolist(),
+    }
+
+
+def object_stream(scale: float, rng: np.random.Generator) -> List[Any]:
+    return [{"record": i, "values": rng.random(10).tolist()} for i in range(_scaled(2_000, scale))]
+
+
+def deep_nesting(scale: float, rng: np.random.Generator) -> Any:
+    # Pickling recurses once per level, so the depth stays well below the recursion limit:
+    node: Any = []
+    for _ in range(min(sys.getrecursionlimit() // 4, _scaled(2_000, scale))):
+        node = [node]
+    return node
+
+
+def os_system(scale: float, rng: np.random.Generator) -> Any:
+    return {"payload": Exploit(os.system, ("echo pwned",)), "padding": list(range(_scaled(1_000, scale)))}
+
+
+def builtins_eval(scale: float, rng: np.random.Generator) -> Any:
+    return [Exploit(eval, ("1 + 1",)), *range(_scaled(1_000, scale))]
+
+
+def poisoned_stream(scale: float, rng: np.random.Generator) -> List[Any]:
+    # Only the last of the concatenated pickles is malicious:
+    return [*object_stream(scale, rng), Exploit(os.system, ("echo pwned",))]
+
+
+# Family -> builder. The lists built by the families in STREAMS are pickled as streams of
+# concatenated pickles, one per item. The adversarial families are refused by the safety checks.
+FAMILIES: Dict[str, Callable[[float, np.random.Generator], Any]] = {
+    "nested_dict": nested_dict,
+    "large_list": large_list,
+    "string_list": string_list,
+    "dataframe_long": dataframe_long,
+    "dataframe_wide": dataframe_wide,
+    "ndarray_float64": _array("float64"),
+    "ndarray_float32": _array("float32"),
+    "ndarray_int32": _array("int32"),
+    "ndarray_uint8": _array("uint8"),
+    "ndarray_bool": _array("bool"),
+    "ndarray_complex128": _array("complex128"),
+    "image_batch": image_batch,
+    "object_stream": object_stream,
+    "deep_nesting": deep_nesting,
+    "adversarial_os_system": os_system,
+    "adversarial_eval": builtins_eval,
+    "adversarial_poisoned_stream": poisoned_stream,
+}
+STREAMS = ("object_stream", "adversarial_poisoned_stream")
+
+
+def dumps(obj: Any, protocol: int, stream: bool = False) -> bytes:
+    """
+    Pickles an object, or each item of a list as its own pickle if ``stream`` is set.
+
+    :param obj: The object to pickle.
+    :type obj: Any
+    :param protocol: The pickle protocol.
+    :type protocol: int
+    :param stream: Whether to concatenate the pickles of the items of ``obj``.
+    :type stream: bool
+    :rtype: bytes
+    """
+    if stream:
+        return b"".join(pickle.dumps(item, protocol=protocol) for item in obj)
+    return pickle.dumps(obj, protocol=protocol)
+
+
+def generate(
+    scale: float = 1.0,
+    seed: int = 0,
+    families: Optional[Iterable[str]] = None,
+    protocols: Iterable[int] = PROTOCOLS,
+    compressed: Iterable[bool] = (False, True),
+) -> Iterator[Case]:
+    """
+    Generates a case for every family, protocol and compression requested. Each family is built
+    once, from its own random generator seeded with ``seed``, and pickled with every protocol.
+
+    :param scale: Scales the number of items, rows or elements of every family.
+    :type scale: float
+    :param seed: Seeds the random content.
+    :type seed: int
+    :param families: The families to generate, see ``FAMILIES``. All of them by default.
+    :type families: Optional[Iterable[str]]
+    :param protocols: The pickle protocols to use.
+    :type protocols: Iterable[int]
+    :param compressed: Whether to generate raw cases, gzipped ones, or both.
+    :type compressed: Iterable[bool]
+    :return: An iterator over the cases.
+    :rtype: Iterator[Case]
+    :raises KeyError: If a family doesn't exist.
+    """
+    compressed = tuple(compressed)
+    for family in families or FAMILIES:
+        obj = FAMILIES[family](scale, np.random.default_rng(seed))
+        for protocol, gzipped in itertools.product(protocols, compressed):
+            data = dumps(obj, protocol, stream=family in STREAMS)
+            if gzipped:
+                data = gzip.compress(data, mtime=GZIP_MTIME)
+            name = f"{family}-p{protocol}-{'gzip' if gzipped else 'raw'}"
+            yield Case(name, family, protocol, gzipped, data)
+
+
+def write_corpus(directory: str, cases: Iterable[Case]) -> List[Path]:
+    """
+    Writes each case to ``<directory>/<name>.pkl`` (or ``.pkl.gz``), e.g. to open them in the app.
+
+    :param directory: The directory, created if missing.
+    :type directory: str
+    :param cases: The cases to write.
+    :type cases: Iterable[Case]
+    :return: The paths written.
+    :rtype: List[Path]
+    """
+    root = Path(directory)
+    root.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for case in cases:
+        path = root / f"{case.name}.pkl{'.gz' if case.compressed else ''}"
+        path.write_bytes(case.data)
+        paths.append(path)
+    return paths
@@ -0,0 +1,296 @@
+"""
+Times picklevw on the synthetic corpus of ``corpus.py``, and compares the results with a baseline:
+
+    python -m tests.benchmarks.harness --output results.json
+    python -m tests.benchmarks.harness --output results.json --baseline baseline.json
+
+Each case is timed in three separate stages: ``PickleLoader.load``, ``PickleSecurityChecker.ensure_safe``
+and the preparation its handler does before rendering the first page (everything but the
+Streamlit calls). Caches are cleared before every repetition, so that each one is cold.
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import src  # noqa: F401 (puts src/ on sys.path)
+import config as cfg
+from exceptions import ExceptionDecompressionLimit, ExceptionLoadBudget, ExceptionSandboxFailure, ExceptionUnsafePickle
+from handlers.registry import get_handler_registry
+from utils import PickleLoader, PickleSecurityChecker, _unsafe_file_error
+
+from tests.benchmarks.corpus import FAMILIES, PROTOCOLS, Case, generate, write_corpus
+
+FORMAT_VERSION = 1
+
+STAGES = ("load", "ensure_safe", "render")
+
+# What PickleLoader.load raises when it refuses a file:
+REFUSALS = (ExceptionUnsafePickle, ExceptionLoadBudget, ExceptionDecompressionLimit, ExceptionSandboxFailure)
+
+# A stage regresses when its median is this much slower than in the baseline...
+DEFAULT_THRESHOLD = 0.25
+# ...and slower by at least this many seconds, so that the noise of the fastest stages is ignored:
+DEFAULT_MIN_SECONDS = 0.001
+
+
+class Regression(NamedTuple):
+    case: str
+    stage: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+def _prepare_stream(stream: Any) -> Any:
+    from handlers.stream_handlers import load_page
+    return load_page(stream, 0, min(len(stream), cfg.CONFIG["STREAM_PAGE_SIZE"]))
+
+
+def _prepare_frame(obj: Any) -> Any:
+    from handlers.pagination import serialize_page
+    return serialize_page(obj, 0, min(len(obj), cfg.CONFIG["DF_PAGE_SIZES"][0]))
+
+
+def _prepare_ndarray(obj: Any) -> Any:
+    import numpy as np
+    import pandas as pd
+    from handlers.charting import downsample_for_chart
+
+    # The corpus only holds 1-D and 2-D arrays, which are displayed as a table and a chart:
+    return pd.DataFrame(obj), downsample_for_chart(obj) if np.issubdtype(obj.dtype, np.number) else None
+
+
+def _prepare_image_batch(obj: Any) -> Any:
+    from handlers.numpy_handlers.numpy_image_batches import image_batch
+    from handlers.numpy_handlers.numpy_image_handlers import image_captions, thumbnails
+
+    images = image_batch(obj)
+    stop = min(len(images), cfg.CONFIG["GALLERY_PAGE_SIZE"])
+    return thumbnails(images, 0, stop), image_captions(obj, 0, stop)
+
+
+def _prepare_tree(obj: Any) -> Any:
+    from handlers.inspection import describe
+    from handlers.tree_handlers import iter_children
+
+    return [(step, describe(child)) for step, child in iter_children(obj, 0, cfg.CONFIG["TREE_PAGE_SIZE"])]
+
+
+def _prepare_json(obj: Any) -> Any:
+    from utils import serialize_json
+    return serialize_json(obj)
+
+
+# Built-in handler -> what it derives from an object before rendering its first page:
+PREPARERS: Dict[str, Callable[[Any], Any]] = {
+    "object_stream": _prepare_stream,
+    "dataframe": _prepare_frame,
+    "series": _prepare_frame,
+    "ndarray": _prepare_ndarray,
+    "image_batch": _prepare_image_batch,
+    "tree": _prepare_tree,
+    "json": _prepare_json,
+}
+
+
+def _clear_caches() -> None:
+    from handlers.pagination import PAGE_CACHE
+    PAGE_CACHE.clear()
+
+
+def _time(func: Callable[[], Any], repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        _clear_caches()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {"min": min(samples), "median": statistics.median(samples), "max": max(samples), "samples": samples}
+
+
+def _ensure_safe(loader: PickleLoader) -> None:
+    try:
+        PickleSecurityChecker(loader.buffer.fork()).ensure_safe()
+    except _unsafe_file_error():
+        pass  # Refusing the adversarial cases is what is timed
+
+
+def _load(data: bytes) -> Any:
+    try:
+        return PickleLoader(io.BytesIO(data)).load()
+    except REFUSALS:
+        return None
+
+
+def benchmark_case(case: Case, repeat: int) -> dict:
+    """
+    Times the stages of a case, ``repeat`` times each.
+
+    :param case: The case.
+    :type case: Case
+    :param repeat: The number of times each stage is timed.
+    :type repeat: int
+    :return: The outcome of loading the case (its verdict or the error raised), the handler of
+        the object loaded, and the ``min``, ``median`` and ``max`` seconds of each stage run.
+    :rtype: dict
+    """
+    loader = PickleLoader(io.BytesIO(case.data))
+    try:
+        obj, _, _ = loader.load()
+        outcome = loader.verdict
+    except REFUSALS as ex:
+        obj, outcome = None, loader.verdict or type(ex).__name__
+
+    result = {
+        "family": case.family,
+        "protocol": case.protocol,
+        "compressed": case.compressed,
+        "bytes": len(case.data),
+        "outcome": outcome,
+        "timings": {
+            "load": _time(lambda: _load(case.data), repeat),
+            "ensure_safe": _time(lambda: _ensure_safe(loader), repeat),
+        },
+    }
+    handler = get_handler_registry().dispatch(obj) if obj is not None else None
+    if handler is not None and handler.name in PREPARERS:
+        result["handler"] = handler.name
+        result["timings"]["render"] = _time(lambda: PREPARERS[handler.name](obj), repeat)
+    return result
+
+
+def run(cases: Iterable[Case], repeat: int = 5, log: Optional[Callable[[str], None]] = None) -> dict:
+    """
+    Times every case, without the persistent verdict store, telemetry or sandbox workers, so that
+    only the work done in the stages is timed.
+
+    :param cases: The cases.
+    :type cases: Iterable[Case]
+    :param repeat: The number of times each stage is timed.
+    :type repeat: int
+    :param log: Called with the name of each case before it is timed.
+    :type log: Optional[Callable[[str], None]]
+    :return: The JSON-serializable results.
+    :rtype: dict
+    """
+    overrides = {"VERDICT_STORE_DIR": None, "TELEMETRY": False, "MEMORY_PROFILING": False, "SANDBOX_WORKERS": 0}
+    saved = {key: cfg.CONFIG[key] for key in overrides}
+    cfg.CONFIG.update(overrides)
+    try:
+        results = {}
+        for case in cases:
+            if log:
+                log(case.name)
+            results[case.name] = benchmark_case(case, repeat)
+    finally:
+        cfg.CONFIG.update(saved)
+    return {
+        "format": FORMAT_VERSION,
+        "picklevw": cfg.CONFIG["version"],
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "cases": results,
+    }
+
+
+def compare(
+    current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD, min_seconds: float = DEFAULT_MIN_SECONDS
+) -> List[Regression]:
+    """
+    Lists the stages whose median time grew by more than ``threshold`` (and ``min_seconds``) since
+    the baseline. Cases or stages missing from either results are skipped.
+
+    :param current: The results to check, as returned by ``run``.
+    :type current: dict
+    :param baseline: The results to compare them with.
+    :type baseline: dict
+    :param threshold: The relative slowdown tolerated, e.g. 0.25 for 25%.
+    :type threshold: float
+    :param min_seconds: The absolute slowdown tolerated.
+    :type min_seconds: float
+    :return: The regressions, slowest first.
+    :rtype: List[Regression]
+    """
+    regressions = []
+    for name, result in current["cases"].items():
+        before = baseline["cases"].get(name, {}).get("timings", {})
+        for stage, timing in result["timings"].items():
+            if stage not in before:
+                continue
+            old, new = before[stage]["median"], timing["median"]
+            if new > old * (1 + threshold) and new - old > min_seconds:
+                regressions.append(Regression(name, stage, old, new))
+    return sorted(regressions, key=lambda regression: regression.ratio, reverse=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m tests.benchmarks.harness",
+        description="Times picklevw on a synthetic corpus of pickles and flags regressions against a baseline.",
+    )
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("-b", "--baseline", help="compare the results with those of this JSON file")
+    parser.add_argument("--scale", type=float, default=1.0, help="scales the size of every case (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="seeds the content of the cases (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5, help="times each stage is timed (default: %(default)s)")
+    parser.add_argument("--family", action="append", choices=sorted(FAMILIES), help="only time these families")
+    parser.add_argument("--protocol", action="append", type=int, choices=PROTOCOLS, help="only use these protocols")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="relative slowdown flagged as a regression (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--min-seconds", type=float, default=DEFAULT_MIN_SECONDS,
+        help="smallest absolute slowdown flagged as a regression (default: %(default)s)",
+    )
+    parser.add_argument("--write-corpus", metavar="DIR", help="also write the cases to this directory")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the benchmark harness.
+
+    :param argv: The command line arguments, ``sys.argv[1:]`` by default.
+    :type argv: Optional[List[str]]
+    :return: The exit status: 1 if any stage regressed against the baseline, 0 otherwise.
+    :rtype: int
+    """
+    args = build_parser().parse_args(argv)
+    cases = list(generate(args.scale, args.seed, families=args.family, protocols=args.protocol or PROTOCOLS))
+    if args.write_corpus:
+        write_corpus(args.write_corpus, cases)
+
+    results = run(cases, repeat=args.repeat, log=lambda name: print(name, file=sys.stderr))
+    results.update(scale=args.scale, seed=args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as file:
+        regressions = compare(results, json.load(file), args.threshold, args.min_seconds)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.case} {regression.stage}: {regression.baseline * 1000:.2f} ms -> "
+            f"{regression.current * 1000:.2f} ms ({regression.ratio:.2f}x)",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
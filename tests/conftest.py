@@ -0,0 +1,45 @@
+import pytest
+
+import src  # noqa: F401 (puts src/ on sys.path)
+import config
+from src.cache import ByteBoundedCache
+from src.handlers import pagination
+
+
+@pytest.fixture(autouse=True)
+def verdict_store_dir(tmp_path, monkeypatch):
+    """Keep the persistent verdict store of each test in its own temporary directory."""
+    directory = tmp_path / "verdicts"
+    monkeypatch.setitem(config.CONFIG, "VERDICT_STORE_DIR", str(directory))
+    return directory
+
+
+@pytest.fixture(autouse=True)
+def no_sandbox_workers(monkeypatch):
+    """Unpickle bypassed files in the test process, unless a test starts a sandbox pool of its own."""
+    monkeypatch.setitem(config.CONFIG, "SANDBOX_WORKERS", 0)
+
+
+@pytest.fixture(autouse=True)
+def telemetry_dir(tmp_path, monkeypatch):
+    """Export the telemetry of each test to its own temporary directory."""
+    directory = tmp_path / "telemetry"
+    monkeypatch.setitem(config.CONFIG, "TELEMETRY_DIR", str(directory))
+    return directory
+
+
+@pytest.fixture
+def page_cache_factory(monkeypatch):
+    """Give the pagination handlers an empty page cache of the given size, for the test only."""
+    def install(max_bytes: int = 1024 ** 2) -> ByteBoundedCache:
+        cache = ByteBoundedCache(max_bytes=max_bytes)
+        monkeypatch.setattr(pagination, "PAGE_CACHE", cache)
+        return cache
+
+    return install
+
+
+@pytest.fixture
+def page_cache(page_cache_factory):
+    """An empty 1 MiB page cache for the pagination handlers."""
+    return page_cache_factory()
@@ -0,0 +1,88 @@
+import gzip
+import json
+import pickle
+
+from tests.benchmarks import harness
+from tests.benchmarks.corpus import FAMILIES, PROTOCOLS, generate, write_corpus
+
+SCALE = 0.01
+
+
+def test_corpus_is_reproducible():
+    first = list(generate(SCALE, families=["nested_dict", "dataframe_long"]))
+    second = list(generate(SCALE, families=["nested_dict", "dataframe_long"]))
+
+    assert first == second
+    assert len(first) == 2 * len(PROTOCOLS) * 2
+    assert list(generate(SCALE, seed=1, families=["nested_dict"]))[0].data != first[0].data
+
+
+def test_corpus_covers_protocols_and_compression(tmp_path):
+    cases = {case.name: case for case in generate(SCALE, families=["large_list"], protocols=(2, 5))}
+
+    assert set(cases) == {"large_list-p2-raw", "large_list-p2-gzip", "large_list-p5-raw", "large_list-p5-gzip"}
+    assert cases["large_list-p5-raw"].data[1] == 5
+    assert pickle.loads(gzip.decompress(cases["large_list-p2-gzip"].data)) == pickle.loads(cases["large_list-p2-raw"].data)
+
+    paths = write_corpus(str(tmp_path), cases.values())
+    assert sorted(path.name for path in paths) == sorted(
+        ["large_list-p2-raw.pkl", "large_list-p2-gzip.pkl.gz", "large_list-p5-raw.pkl", "large_list-p5-gzip.pkl.gz"]
+    )
+
+
+def test_run_times_each_stage_of_every_case():
+    families = [
+        "nested_dict", "dataframe_wide", "ndarray_uint8", "image_batch", "object_stream", "adversarial_poisoned_stream"
+    ]
+    results = harness.run(generate(SCALE, families=families, protocols=(4,), compressed=(False,)), repeat=2)
+
+    cases = results["cases"]
+    assert set(cases) == {f"{family}-p4-raw" for family in families}
+    assert cases["dataframe_wide-p4-raw"]["handler"] == "dataframe"
+    assert cases["image_batch-p4-raw"]["handler"] == "image_batch"
+    assert cases["object_stream-p4-raw"]["handler"] == "object_stream"
+    assert set(cases["ndarray_uint8-p4-raw"]["timings"]) == set(harness.STAGES)
+    assert len(cases["nested_dict-p4-raw"]["timings"]["load"]["samples"]) == 2
+    # Refused files have nothing to render:
+    refused = cases["adversarial_poisoned_stream-p4-raw"]
+    assert refused["outcome"] == "unsafe"
+    assert set(refused["timings"]) == {"load", "ensure_safe"}
+    json.dumps(results)
+
+
+def test_every_family_loads_as_expected():
+    results = harness.run(generate(SCALE, protocols=(2,), compressed=(True,)), repeat=1)
+
+    outcomes = {case["family"]: case["outcome"] for case in results["cases"].values()}
+    assert set(outcomes) == set(FAMILIES)
+    assert {family for family, outcome in outcomes.items() if outcome == "unsafe"} == {
+        family for family in FAMILIES if family.startswith("adversarial")
+    }
+
+
+def timings(**medians):
+    return {"cases": {"case": {"timings": {stage: {"median": median} for stage, median in medians.items()}}}}
+
+
+def test_compare_flags_slowdowns_beyond_the_threshold_and_the_noise():
+    baseline = timings(load=0.010, ensure_safe=0.010, render=0.0001)
+
+    regressions = harness.compare(timings(load=0.020, ensure_safe=0.011, render=0.0005), baseline, threshold=0.25)
+
+    assert [(regression.stage, regression.ratio) for regression in regressions] == [("load", 2.0)]
+    assert harness.compare(timings(load=0.020, extra=1.0), {"cases": {}}) == []
+
+
+def test_main_exits_with_an_error_on_regressions(tmp_path, capsys):
+    baseline, output = tmp_path / "baseline.json", tmp_path / "results.json"
+    argv = ["--scale", str(SCALE), "--repeat", "1", "--family", "nested_dict", "--protocol", "4", "-o", str(output)]
+
+    assert harness.main(argv) == 0
+    results = json.loads(output.read_text())
+    for case in results["cases"].values():
+        for timing in case["timings"].values():
+            timing["median"] /= 100
+    baseline.write_text(json.dumps(results))
+
+    assert harness.main([*argv, "--baseline", str(baseline), "--min-seconds", "0"]) == 1
+    assert "REGRESSION nested_dict-p4-raw load" in capsys.readouterr().err
@@ -0,0 +1,39 @@
+import io
+import pickle
+
+import pytest
+
+from src.buffers import SharedBuffer
+
+
+def test_shared_buffer_forks_share_memory_with_independent_positions():
+    data = bytearray(b"line one\nline two\n")
+    first = SharedBuffer(data)
+    second = first.fork()
+
+    assert first.readline() == b"line one\n"
+    assert second.read(4) == b"line"
+    assert first.peek(4) == b"line"
+    assert first.tell() == 9
+    assert second.getbuffer().obj is data
+    assert second.getbuffer().readonly
+
+
+def test_shared_buffer_readinto_and_seek():
+    buffer = SharedBuffer(b"0123456789")
+    target = bytearray(4)
+
+    assert buffer.seek(-4, io.SEEK_END) == 6
+    assert buffer.readinto(target) == 4
+    assert target == b"6789"
+    assert buffer.read() == b""
+    assert buffer.getvalue() == b"0123456789"
+
+
+@pytest.mark.parametrize("protocol", [0, 2, 5])
+def test_shared_buffer_can_be_unpickled_from(protocol):
+    obj = {"text": "abc", "payload": bytes(100_000), "items": [1, 2.5, None]}
+    buffer = SharedBuffer(pickle.dumps(obj, protocol=protocol) + pickle.dumps(2))
+
+    assert pickle.load(buffer) == obj
+    assert pickle.load(buffer) == 2
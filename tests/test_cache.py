@@ -0,0 +1,133 @@
+import gc
+import pickle
+import weakref
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.cache import ByteBoundedCache, LoadCache, ExceptionLoadBudget, ExceptionSandboxFailure, ExceptionUnsafePickle
+
+
+def test_byte_bounded_cache_counts_hits_and_misses():
+    cache = ByteBoundedCache(max_bytes=100)
+    cache.put("a", 1, nbytes=10)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats() == {"entries": 1, "bytes": 10, "max_bytes": 100, "hits": 1, "misses": 1}
+
+
+def test_byte_bounded_cache_evicts_least_recently_used_entries_by_size():
+    cache = ByteBoundedCache(max_bytes=100)
+    cache.put("a", "A", nbytes=40)
+    cache.put("b", "B", nbytes=40)
+    cache.get("a")
+    cache.put("c", "C", nbytes=40)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.total_bytes == 80
+
+
+def test_byte_bounded_cache_skips_values_larger_than_the_cache():
+    cache = ByteBoundedCache(max_bytes=100)
+    cache.put("a", "A", nbytes=40)
+    cache.put("huge", "H", nbytes=101)
+
+    assert "huge" not in cache
+    assert "a" in cache
+
+
+def test_byte_bounded_cache_replacing_a_key_updates_the_size():
+    cache = ByteBoundedCache(max_bytes=100)
+    cache.put("a", "A", nbytes=40)
+    cache.put("a", "AA", nbytes=60)
+
+    assert cache.get("a") == "AA"
+    assert cache.total_bytes == 60
+
+
+def make_loader(data: bytes, allow_unsafe_file: bool = False):
+    from src.utils import PickleLoader
+
+    uploaded_file = MagicMock()
+    uploaded_file.read.return_value = data
+    return PickleLoader(uploaded_file, allow_unsafe_file=allow_unsafe_file)
+
+
+def test_load_cache_keys_on_content_and_unsafe_flag(monkeypatch):
+    cache = LoadCache(max_bytes=1024)
+    data = pickle.dumps({"a": 1})
+
+    first = make_loader(data)
+    assert cache.load(first) == ({"a": 1}, False, False)
+
+    second = make_loader(data)
+    monkeypatch.setattr(second, "load", MagicMock(side_effect=AssertionError("not cached")))
+    assert cache.load(second) == ({"a": 1}, False, False)
+    assert "buffer" not in vars(second)  # the rerun never decompressed its content
+
+    assert second.verdict == first.verdict  # the rerun still knows the verdict of its content
+
+    assert cache.load(make_loader(data, allow_unsafe_file=True)) == ({"a": 1}, False, False)
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_load_cache_remembers_unsafe_verdicts():
+    cache = LoadCache(max_bytes=1024)
+    loader = MagicMock(cache_key=("digest", False))
+    loader.load.side_effect = ExceptionUnsafePickle("threat detected")
+
+    for _ in range(2):
+        with pytest.raises(ExceptionUnsafePickle, match="threat detected"):
+            cache.load(loader)
+
+    loader.load.assert_called_once_with()
+    assert cache.hits == 1
+
+
+@pytest.mark.parametrize(
+    "error, verdict",
+    [(ExceptionLoadBudget("too expensive"), "over_budget"), (ExceptionSandboxFailure("worker killed"), "killed")],
+)
+def test_load_cache_remembers_files_that_could_not_be_loaded(error, verdict):
+    cache = LoadCache(max_bytes=1024)
+    loader = MagicMock(cache_key=("digest", True))
+    loader.load.side_effect = error
+
+    for _ in range(2):
+        with pytest.raises(type(error), match=str(error)):
+            cache.load(loader)
+
+    loader.load.assert_called_once_with()
+    assert loader.verdict == verdict
+
+
+def test_load_cache_does_not_keep_refused_loaders_alive():
+    cache = LoadCache(max_bytes=1024 * 1024)
+    loader = make_loader(b"\x80\x02cos\nsystem\nX\x04\x00\x00\x00true\x85R.")
+    loader_ref = weakref.ref(loader)
+
+    with pytest.raises(ExceptionUnsafePickle) as first:
+        cache.load(loader)
+    del loader, first
+    gc.collect()
+
+    assert loader_ref() is None
+    with pytest.raises(ExceptionUnsafePickle):
+        cache.load(make_loader(b"\x80\x02cos\nsystem\nX\x04\x00\x00\x00true\x85R."))
+    assert cache.hits == 1
+
+
+def test_load_cache_counts_refusals_against_its_size():
+    cache = LoadCache(max_bytes=1024)
+    for n in range(10):
+        loader = MagicMock(cache_key=(f"digest{n}", False))
+        loader.load.side_effect = ExceptionUnsafePickle("threat detected")
+        with pytest.raises(ExceptionUnsafePickle):
+            cache.load(loader)
+
+    assert 0 < len(cache) < 10
+    assert cache.total_bytes <= 1024
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.handlers.charting import downsample_for_chart, lttb_indices, minmax_indices
+
+
+@pytest.mark.parametrize("select", [lttb_indices, minmax_indices])
+@pytest.mark.parametrize("n", [1, 2, 5, 17, 1000, 1001])
+@pytest.mark.parametrize("points", [3, 4, 10])
+def test_indices_are_sorted_unique_and_within_budget(select, n, points):
+    indices = select(np.random.default_rng(n).random(n), points)
+
+    assert np.all(np.diff(indices) > 0)
+    assert 0 <= indices[0] and indices[-1] < n
+    assert len(indices) <= max(points, n if n <= points else 0)
+
+
+def test_lttb_keeps_the_end_points_and_the_spikes():
+    values = np.zeros(10_000)
+    values[1234] = 100.0
+    values[8765] = -100.0
+
+    indices = lttb_indices(values, 50)
+
+    assert indices[0] == 0 and indices[-1] == len(values) - 1
+    assert {1234, 8765} <= set(indices)
+
+
+def test_minmax_keeps_the_envelope_and_ignores_missing_values():
+    values = np.sin(np.linspace(0, 20, 100_000))
+    values[::7] = np.nan
+
+    indices = minmax_indices(values, 200)
+
+    assert np.nanmax(values[indices]) == np.nanmax(values)
+    assert np.nanmin(values[indices]) == np.nanmin(values)
+    assert not np.isnan(values[indices]).any()
+
+
+def test_downsample_for_chart_leaves_short_data_untouched():
+    series = pd.Series(range(10))
+
+    chart, caption = downsample_for_chart(series, max_points=10)
+
+    assert chart is series
+    assert caption is None
+
+
+def test_downsample_for_chart_keeps_original_positions_of_arrays():
+    values = np.arange(10_000, dtype=np.float32) ** 2
+
+    chart, caption = downsample_for_chart(values, max_points=100, mode="minmax")
+
+    assert isinstance(chart, pd.Series)
+    assert len(chart) <= 100
+    np.testing.assert_array_equal(chart.to_numpy(), values[chart.index.to_numpy()])
+    assert caption == "Chart downsampled from 10000 to {} points (min/max envelope).".format(len(chart))
+
+
+def test_downsample_for_chart_downsamples_each_column_independently():
+    values = np.zeros((10_000, 2))
+    values[100, 0] = 1.0
+    values[9_000, 1] = 1.0
+
+    chart, caption = downsample_for_chart(values, max_points=50, mode="lttb")
+
+    assert isinstance(chart, pd.DataFrame)
+    assert {100, 9_000} <= set(chart.index)
+    assert "Largest-Triangle-Three-Buckets" in caption
+
+
+def test_downsample_for_chart_handles_nullable_series():
+    series = pd.Series(range(1_000), dtype="Int64", index=pd.date_range("2024-01-01", periods=1_000, freq="min"))
+    series.iloc[5] = pd.NA
+
+    chart, _ = downsample_for_chart(series, max_points=20)
+
+    assert len(chart) <= 20
+    assert chart.index.isin(series.index).all()
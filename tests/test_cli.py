@@ -0,0 +1,197 @@
+import gzip
+import json
+import os
+import pickle
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import __main__ as entry_point, cli
+
+
+class Exploit:
+    def __reduce__(self):
+        return os.system, ("echo pwned",)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "plain.pkl").write_bytes(pickle.dumps({"a": [1, 2]}))
+    (tmp_path / "list.pkl.gz").write_bytes(gzip.compress(pickle.dumps([1, 2, 3])))
+    (tmp_path / "notes.txt").write_text("not a pickle target")
+    (tmp_path / "nested" / "evil.pkl").write_bytes(pickle.dumps(Exploit()))
+    (tmp_path / "nested" / "broken.pickle").write_bytes(b"garbage")
+    return tmp_path
+
+
+def records_from(output):
+    return {Path(record["path"]).name: record for record in map(json.loads, output.splitlines())}
+
+
+def test_summarize_object():
+    assert cli.summarize_object({"a": 1}) == {
+        "type": "builtins.dict", "multiple": False, "length": 1, "handler": "json", "preview": "{'a': 1}"
+    }
+    assert cli.summarize_object(7) == {"type": "builtins.int", "multiple": False, "handler": "json", "preview": "7"}
+    assert cli.summarize_object(object())["type"] == "builtins.object"
+
+
+@pytest.mark.parametrize(
+    "obj, expected",
+    [
+        (
+            pd.DataFrame({"a": [1, 2], "b": [0.5, 1.5]}),
+            {"shape": [2, 2], "handler": "dataframe", "columns": ["a", "b"], "dtypes": {"int64": 1, "float64": 1}},
+        ),
+        (np.zeros((2, 3), dtype=np.float32), {"shape": [2, 3], "handler": "ndarray", "nbytes": 24}),
+        (
+            {"data": np.zeros((5, 3072), dtype=np.uint8)},
+            {"handler": "image_batch", "images": 5, "height": 32, "width": 32, "channels": 3},
+        ),
+        ({1, 2}, {"handler": "tree", "length": 2}),
+    ],
+)
+def test_summarize_object_adds_the_summary_of_its_handler(obj, expected):
+    assert cli.summarize_object(obj).items() >= expected.items()
+
+
+def test_summaries_do_not_import_streamlit(tmp_path):
+    path = tmp_path / "frame.pkl"
+    path.write_bytes(pickle.dumps({"frame": pd.DataFrame({"a": [1]}), "data": np.zeros((1, 3072), dtype=np.uint8)}))
+    code = (
+        f"import sys; sys.path.insert(0, {str(Path(cli.__file__).parent)!r}); import cli; "
+        f"print(cli.scan_file({str(path)!r})['summary']['handler'], 'streamlit' in sys.modules)"
+    )
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.split() == ["image_batch", "False"]
+
+
+def test_iter_paths_expands_directories_and_globs(corpus):
+    top_level = [Path(path).name for path in cli.iter_paths([str(corpus)])]
+    recursive = [Path(path).name for path in cli.iter_paths([str(corpus)], recursive=True)]
+    globbed = [Path(path).name for path in cli.iter_paths([str(corpus / "**" / "*.pkl")], recursive=True)]
+
+    assert top_level == ["list.pkl.gz", "plain.pkl"]
+    assert sorted(recursive) == ["broken.pickle", "evil.pkl", "list.pkl.gz", "plain.pkl"]
+    assert sorted(globbed) == ["evil.pkl", "plain.pkl"]
+
+
+def test_iter_paths_skips_duplicates(corpus):
+    path = str(corpus / "plain.pkl")
+
+    assert list(cli.iter_paths([path, path, str(corpus / "*.pkl")])) == [path]
+
+
+class FileCreatingExploit:
+    def __init__(self, path):
+        self.path = path
+
+    def __reduce__(self):
+        return open, (self.path, "w")
+
+
+def test_scan_file_never_unpickles_unsafe_files(tmp_path):
+    marker = tmp_path / "marker"
+    path = tmp_path / "exploit.pkl"
+    path.write_bytes(pickle.dumps(FileCreatingExploit(str(marker))))
+
+    record = cli.scan_file(str(path))
+
+    assert record["verdict"] == "unsafe"
+    assert "summary" not in record
+    assert record["preview"] == {"imports": [f"{open.__module__}.open"], "calls": 1, "payload_bytes": 0}
+    assert not marker.exists()
+
+
+def test_scan_file_refuses_files_over_the_load_budget(tmp_path, monkeypatch):
+    monkeypatch.setitem(cli.cfg.CONFIG, "LOAD_BUDGET_BYTES", 10_000)
+    path = tmp_path / "large.pkl"
+    path.write_bytes(pickle.dumps(b"x" * 100_000))
+
+    record = cli.scan_file(str(path), allow_unsafe_file=True)
+
+    assert record["verdict"] == "over_budget"
+    assert "LOAD_BUDGET_BYTES" in record["error"]
+    assert "summary" not in record
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_main_prints_a_json_line_per_file(corpus, capsys, workers):
+    status = cli.main(["--recursive", "--workers", workers, str(corpus)])
+
+    records = records_from(capsys.readouterr().out)
+    assert status == 1
+    assert records["plain.pkl"]["verdict"] == "safe"
+    assert records["plain.pkl"]["summary"] == {
+        "type": "builtins.dict", "multiple": False, "length": 1, "handler": "json", "preview": "{'a': [1, 2]}"
+    }
+    assert records["list.pkl.gz"]["summary"]["length"] == 3
+    assert records["evil.pkl"]["verdict"] == "unsafe"
+    assert records["broken.pickle"]["verdict"] == "error"
+    assert "error" in records["broken.pickle"]
+
+
+def test_main_exits_cleanly_when_every_file_loads(corpus, capsys):
+    assert cli.main([str(corpus / "plain.pkl")]) == 0
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_main_times_the_stages_of_each_load(corpus, capsys, telemetry_dir, workers):
+    cli.main(["--timings", "--workers", workers, str(corpus / "plain.pkl"), str(corpus / "list.pkl.gz")])
+
+    records = records_from(capsys.readouterr().out)
+    timings = records["list.pkl.gz"]["timings"]
+    assert timings["label"].endswith("list.pkl.gz")
+    assert timings["verdict"] == "safe"
+    assert {"read", "decompress", "unpickle_plain"} <= {stage["stage"] for stage in timings["stages"]}
+    assert len((telemetry_dir / "telemetry.jsonl").read_text().splitlines()) == 2
+    exposition = (telemetry_dir / "metrics.cli.prom").read_text()
+    assert 'picklevw_loads_total{role="cli",verdict="safe"} 2' in exposition
+
+
+def test_main_profiles_memory(corpus, capsys):
+    cli.main(["--memory", "--workers", "1", str(corpus / "plain.pkl")])
+
+    timings = json.loads(capsys.readouterr().out)["timings"]
+    assert timings["peak_bytes"] >= 0
+    assert timings["deep_size"]["complete"]
+    assert timings["deep_size"]["nodes"] == 5
+    assert all("peak_bytes" in stage for stage in timings["stages"])
+
+
+def test_main_does_not_time_loads_by_default(corpus, capsys, telemetry_dir):
+    cli.main([str(corpus / "plain.pkl")])
+
+    assert "timings" not in json.loads(capsys.readouterr().out)
+    assert not telemetry_dir.exists()
+
+
+def test_package_runs_as_a_module(corpus):
+    result = subprocess.run(
+        [sys.executable, "-m", "src", "--workers", "1", str(corpus / "plain.pkl")],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0
+    assert json.loads(result.stdout)["verdict"] == "safe"
+
+
+def test_console_script_resolves_to_the_cli():
+    tomllib = pytest.importorskip("tomllib")
+    project = tomllib.loads((Path(__file__).resolve().parent.parent / "pyproject.toml").read_text())
+    module, function = project["project"]["scripts"]["picklevw"].split(":")
+    package, _, name = module.partition(".")
+
+    # The wheel installs src/ as the package the script names:
+    assert project["tool"]["hatch"]["build"]["targets"]["wheel"]["sources"] == {"src": package}
+    assert name == "__main__"
+    assert getattr(entry_point, function).__module__ == "cli"
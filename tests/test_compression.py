@@ -0,0 +1,162 @@
+import gzip
+import os
+
+import pytest
+
+from src.compression import (
+    CHUNK_SIZE,
+    ExceptionDecompressionLimit,
+    ExceptionMissingCodec,
+    decompress_capped,
+    detect_codec,
+    iter_gzip_chunks,
+)
+
+
+def test_decompress_capped_matches_gzip_decompress():
+    data = os.urandom(50_000) + bytes(3_000_000)
+
+    assert decompress_capped(gzip.compress(data)) == data
+
+
+def test_decompress_capped_handles_multi_member_files():
+    compressed = gzip.compress(b"first member, ") + gzip.compress(b"") + gzip.compress(b"second member")
+
+    assert decompress_capped(compressed) == b"first member, second member"
+
+
+def test_iter_gzip_chunks_yields_bounded_chunks():
+    compressed = gzip.compress(bytes(1_000_000))
+
+    chunks = list(iter_gzip_chunks(memoryview(compressed), chunk_size=4096))
+
+    assert max(map(len, chunks)) <= 4096
+    assert sum(map(len, chunks)) == 1_000_000
+
+
+def test_decompress_capped_rejects_truncated_data():
+    compressed = gzip.compress(os.urandom(10_000))
+
+    with pytest.raises(EOFError):
+        decompress_capped(compressed[:-100])
+
+
+def test_decompress_capped_enforces_the_maximum_size():
+    compressed = gzip.compress(os.urandom(10_000))
+
+    with pytest.raises(ExceptionDecompressionLimit, match="more than 5000 bytes"):
+        decompress_capped(compressed, max_size=5_000)
+
+
+def test_decompress_capped_enforces_the_compression_ratio(monkeypatch):
+    import src.compression as compression
+
+    monkeypatch.setitem(compression.cfg.CONFIG, "RATIO_CHECK_MIN_BYTES", 1024)
+    compressed = gzip.compress(bytes(10_000_000))
+
+    with pytest.raises(ExceptionDecompressionLimit, match="compression ratio above 100"):
+        decompress_capped(compressed, max_ratio=100)
+
+
+def test_decompress_capped_ignores_the_ratio_of_small_payloads():
+    compressed = gzip.compress(bytes(1_000_000))
+
+    assert len(decompress_capped(compressed, max_ratio=2)) == 1_000_000
+
+
+def compress_bz2(data):
+    import bz2
+
+    return bz2.compress(data)
+
+
+def compress_xz(data):
+    import lzma
+
+    return lzma.compress(data, format=lzma.FORMAT_XZ)
+
+
+def compress_lzma_alone(data):
+    import lzma
+
+    return lzma.compress(data, format=lzma.FORMAT_ALONE)
+
+
+def compress_zstd(data):
+    zstandard = pytest.importorskip("zstandard")
+    return zstandard.ZstdCompressor().compress(data)
+
+
+def compress_lz4(data):
+    lz4_frame = pytest.importorskip("lz4.frame")
+    return lz4_frame.compress(data)
+
+
+def compress_zip(data):
+    import io
+    import zipfile
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("archive/README", b"not this one")
+        zf.writestr("archive/data.pkl", data)
+    return archive.getvalue()
+
+
+@pytest.mark.parametrize(
+    "compress, codec_name",
+    [
+        (gzip.compress, "gzip"),
+        (compress_bz2, "bz2"),
+        (compress_xz, "xz"),
+        (compress_lzma_alone, "lzma"),
+        (compress_zstd, "zstd"),
+        (compress_lz4, "lz4"),
+        (compress_zip, "zip"),
+    ],
+)
+def test_decompress_capped_detects_and_streams_each_codec(compress, codec_name):
+    data = os.urandom(20_000) + bytes(2_500_000)
+    compressed = compress(data)
+
+    assert detect_codec(compressed).name == codec_name
+    assert decompress_capped(compressed) == data
+
+
+@pytest.mark.parametrize("compress", [compress_bz2, compress_xz, compress_zstd, compress_lz4])
+def test_decompress_capped_handles_concatenated_streams(compress):
+    assert decompress_capped(compress(b"first, ") + compress(b"second")) == b"first, second"
+
+
+@pytest.mark.parametrize("compress", [compress_bz2, compress_xz, compress_zstd, compress_lz4, compress_zip])
+def test_decompress_capped_enforces_the_maximum_size_for_each_codec(compress):
+    with pytest.raises(ExceptionDecompressionLimit):
+        decompress_capped(compress(bytes(3_000_000)), max_size=CHUNK_SIZE)
+
+
+def test_detect_codec_returns_none_for_plain_pickles():
+    import pickle
+
+    for protocol in range(6):
+        assert detect_codec(pickle.dumps([1, "a"], protocol=protocol)) is None
+
+
+def test_decompress_capped_rejects_uncompressed_data():
+    with pytest.raises(ValueError):
+        decompress_capped(b"\x80\x04plain pickle")
+
+
+def test_missing_optional_codec_raises_a_clear_error(monkeypatch):
+    import src.compression as compression
+
+    real_import = compression.importlib.import_module
+
+    def import_module(name, *args, **kwargs):
+        if name == "zstandard":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(compression.importlib, "import_module", import_module)
+
+    with pytest.raises(ExceptionMissingCodec, match="pip install zstandard"):
+        decompress_capped(b"\x28\xb5\x2f\xfd" + bytes(10))
@@ -0,0 +1,75 @@
+import collections
+import pickle
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.handlers import disassembly_handlers
+from src.handlers.disassembly_handlers import disassemble, handle_streamlit_disassembly, opcode_index_for
+from src.opcodes import build_opcode_index
+
+
+@pytest.fixture(autouse=True)
+def opcode_index_cache(monkeypatch):
+    from cache import ByteBoundedCache
+
+    cache = ByteBoundedCache(max_bytes=1024 ** 2)
+    monkeypatch.setattr(disassembly_handlers, "OPCODE_INDEX_CACHE", cache)
+    return cache
+
+
+@pytest.fixture
+def mock_st():
+    with patch("src.handlers.disassembly_handlers.st") as mock_st:
+        mock_st.multiselect.return_value = []
+        mock_st.number_input.return_value = 1
+        yield mock_st
+
+
+def test_opcode_index_for_only_indexes_a_file_once():
+    data = MagicMock(return_value=memoryview(pickle.dumps({"a": 1})))
+
+    first = opcode_index_for("digest", data)
+    second = opcode_index_for("digest", data)
+
+    assert first is second
+    data.assert_called_once_with()
+
+
+def test_disassemble_lists_offsets_opcodes_and_arguments():
+    data = pickle.dumps("name", protocol=2)
+
+    table = disassemble(build_opcode_index(data), range(3)).to_pandas()
+
+    assert list(table.index) == [0, 2, 11]
+    assert list(table["opcode"]) == ["PROTO", "BINUNICODE", "BINPUT"]
+    assert list(table["argument"]) == ["2", "'name'", "0"]
+
+
+def test_handle_streamlit_disassembly_only_disassembles_the_page_on_display(mock_st, monkeypatch):
+    monkeypatch.setitem(disassembly_handlers.cfg.CONFIG, "DISASSEMBLY_PAGE_SIZE", 10)
+    mock_st.number_input.return_value = 2
+    data = pickle.dumps(list(range(1_000)))
+    describe = MagicMock(side_effect=build_opcode_index(data).describe)
+
+    index = opcode_index_for("digest", lambda: memoryview(data))
+    monkeypatch.setattr(index, "describe", describe)
+    handle_streamlit_disassembly("digest", lambda: memoryview(data))
+
+    assert [call.args[0] for call in describe.call_args_list] == list(range(10, 20))
+    assert mock_st.dataframe.call_args.args[0].num_rows == 10
+
+
+def test_handle_streamlit_disassembly_filters_by_opcode_class(mock_st):
+    mock_st.multiselect.return_value = ["calls"]
+    data = pickle.dumps(collections.OrderedDict(a=1))
+
+    handle_streamlit_disassembly("digest", lambda: memoryview(data))
+
+    assert list(mock_st.dataframe.call_args.args[0].to_pandas()["opcode"]) == ["REDUCE"]
+
+
+def test_handle_streamlit_disassembly_reports_malformed_data(mock_st):
+    handle_streamlit_disassembly("digest", lambda: memoryview(pickle.dumps(1) + b"\xff"))
+
+    mock_st.warning.assert_called_once()
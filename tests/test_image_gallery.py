@@ -0,0 +1,94 @@
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.handlers import pagination
+from src.handlers.numpy_handlers.numpy_image_handlers import (
+    handle_streamlit_image_batch,
+    image_batch,
+    image_captions,
+    thumbnails,
+)
+
+
+@pytest.fixture(autouse=True)
+def page_cache(page_cache_factory):
+    return page_cache_factory(max_bytes=64 * 1024 ** 2)
+
+
+def cifar_batch(count: int) -> dict:
+    rng = np.random.default_rng(0)
+    return {
+        "data": rng.integers(0, 256, size=(count, 3072), dtype=np.uint8),
+        "labels": list(rng.integers(0, 10, size=count)),
+        "filenames": [f"img_{i}.png".encode() for i in range(count)],
+    }
+
+
+def test_image_batch_views_cifar_rows_as_channel_last_images():
+    batch = cifar_batch(4)
+
+    images = image_batch(batch)
+
+    assert images.shape == (4, 32, 32, 3)
+    assert np.shares_memory(images, batch["data"])
+    # CIFAR rows hold the red plane, then the green one, then the blue one:
+    np.testing.assert_array_equal(images[1, :, :, 2].ravel(), batch["data"][1, 2048:])
+
+
+@pytest.mark.parametrize(
+    "obj, expected_shape",
+    [
+        (np.zeros((5, 28, 28, 1)), (5, 28, 28, 1)),
+        (np.zeros((5, 3, 16, 8)), (5, 16, 8, 3)),
+        ({b"data": np.zeros((5, 784), dtype=np.uint8)}, (5, 28, 28, 1)),
+        ({"data": np.zeros((2, 4, 4, 4))}, (2, 4, 4, 4)),
+        (np.zeros((5, 28, 28, 7)), None),
+        (np.zeros((5, 28, 28)), None),
+        ({"data": np.zeros((5, 10))}, None),
+        ({"data": [1, 2]}, None),
+    ],
+)
+def test_image_batch_recognizes_image_shapes(obj, expected_shape):
+    images = image_batch(obj)
+
+    assert (images.shape if images is not None else None) == expected_shape
+
+
+def test_image_captions_combine_filenames_and_labels():
+    batch = {"filenames": [b"a.png", b"b.png", b"c.png"], "fine_labels": [7, 8, 9]}
+
+    assert image_captions(batch, 1, 3) == ["b.png · label 8", "c.png · label 9"]
+    assert image_captions({"data": None}, 0, 1) is None
+
+
+def test_thumbnails_subsample_large_images_and_scale_floats(monkeypatch):
+    monkeypatch.setitem(pagination.cfg.CONFIG, "GALLERY_THUMBNAIL_SIZE", 16)
+    images = np.full((3, 64, 32, 1), 0.5)
+
+    page = thumbnails(images, 1, 3)
+
+    assert page.shape == (2, 16, 8)
+    assert page.dtype == np.uint8
+    assert (page == 127).all()
+
+
+@patch("src.handlers.numpy_handlers.numpy_image_handlers.st")
+def test_large_batch_only_builds_the_visible_page_once(mock_st, page_cache):
+    batch = cifar_batch(50_000)
+    mock_st.number_input.return_value = 3
+    page_size = pagination.cfg.CONFIG["GALLERY_PAGE_SIZE"]
+
+    start = time.perf_counter()
+    handle_streamlit_image_batch(batch)
+    elapsed = time.perf_counter() - start
+    handle_streamlit_image_batch(batch)
+
+    assert elapsed < 1.0
+    first, second = (call.args[0] for call in mock_st.image.call_args_list)
+    assert len(first) == page_size
+    np.testing.assert_array_equal(first[0], image_batch(batch)[2 * page_size])
+    assert page_cache.hits == 1  # The second run reuses the thumbnails
+    assert mock_st.image.call_args.kwargs["caption"][0] == f"img_{2 * page_size}.png · label {batch['labels'][2 * page_size]}"
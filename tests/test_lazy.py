@@ -0,0 +1,72 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.lazy import deferred, imported
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# The modules that take the longest to import, and that starting the app or the CLI must not pay for:
+HEAVY_MODULES = ("numpy", "pandas", "pyarrow", "fickling")
+
+# How long importing an entry point may take, on top of the modules imported before it:
+IMPORT_BUDGET_SECONDS = 0.5
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {str(SRC)!r}); {code}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_times(stderr: str) -> dict:
+    """Maps the modules listed by ``-X importtime`` to their cumulative import time in seconds."""
+    times = {}
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and line.count("|") == 2:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def test_imported_does_not_import_modules():
+    assert imported("sys") is sys
+    assert imported("picklevw_module_that_does_not_exist") is None
+
+
+def test_deferred_imports_the_module_on_first_call():
+    dumps = deferred("json", "dumps")
+
+    assert dumps.__name__ == "dumps"
+    assert dumps([1, None]) == "[1, null]"
+
+
+@pytest.mark.parametrize(
+    "imports, module",
+    [
+        ("import streamlit; import picklevw", "picklevw"),  # The app, on top of Streamlit itself
+        ("import cli", "cli"),
+        ("import sandbox", "sandbox"),
+    ],
+)
+def test_entry_points_import_within_budget(imports, module):
+    times = import_times(run_python(imports).stderr)
+
+    assert not [name for name in times if name.split(".")[0] in HEAVY_MODULES]
+    assert times[module] < IMPORT_BUDGET_SECONDS
+
+
+def test_loading_plain_data_imports_neither_pandas_numpy_nor_fickling():
+    code = (
+        "import io, pickle; from utils import PickleLoader; "
+        "print(PickleLoader(io.BytesIO(pickle.dumps({'a': [1, 2.5, None]}))).load()); "
+        f"print([name for name in {HEAVY_MODULES!r} if name in sys.modules])"
+    )
+
+    assert run_python(code).stdout.splitlines() == ["({'a': [1, 2.5, None]}, False, False)", "[]"]
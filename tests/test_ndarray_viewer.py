@@ -0,0 +1,70 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.handlers.numpy_handlers.numpy_ndarray_viewer import array_summary, render_ndarray_slices, select_slice
+
+
+pytestmark = pytest.mark.usefixtures("page_cache")
+
+
+@pytest.mark.parametrize(
+    "rows_axis, cols_axis, index, expected",
+    [
+        (2, 3, {0: 1, 1: 2}, lambda a: a[1, 2]),
+        (0, 3, {1: 0, 2: 4}, lambda a: a[:, 0, 4, :]),
+        (3, 1, {0: 1, 2: 3}, lambda a: a[1, :, 3, :].T),
+    ],
+)
+def test_select_slice_returns_a_view_of_the_chosen_axes(rows_axis, cols_axis, index, expected):
+    arr = np.arange(2 * 3 * 5 * 7).reshape(2, 3, 5, 7)
+
+    view = select_slice(arr, rows_axis, cols_axis, index)
+
+    np.testing.assert_array_equal(view, expected(arr))
+    assert np.shares_memory(view, arr)
+
+
+def test_array_summary_ignores_nans_and_is_computed_once(page_cache):
+    arr = np.arange(24, dtype=np.float64).reshape(2, 3, 4)
+    arr[0, 0, 0] = np.nan
+
+    summary = array_summary(arr)
+
+    assert summary == {"min": 1.0, "max": 23.0, "mean": pytest.approx(12.0), "nans": 1}
+    assert array_summary(arr) is summary
+    assert page_cache.hits == 1
+
+
+@pytest.mark.parametrize("arr", [np.zeros((2, 0, 3)), np.array([["a"]], dtype=object)[None]])
+def test_array_summary_skips_empty_and_non_numeric_arrays(arr):
+    assert array_summary(arr) is None
+
+
+def test_array_summary_of_all_nan_array():
+    assert array_summary(np.full((2, 2, 2), np.nan))["nans"] == 8
+
+
+@patch("src.handlers.numpy_handlers.numpy_ndarray_viewer.st")
+def test_render_ndarray_slices_skips_sliders_of_unit_axes_and_caches_slices(mock_st, page_cache):
+    arr = np.arange(12).reshape(1, 3, 4)
+    mock_st.columns.return_value = (MagicMock(), MagicMock())
+    mock_st.columns.return_value[0].selectbox.return_value = 1
+    mock_st.columns.return_value[1].selectbox.return_value = 2
+
+    render_ndarray_slices(arr)
+    render_ndarray_slices(arr)
+
+    mock_st.slider.assert_not_called()
+    first, second = (call[0][0] for call in mock_st.dataframe.call_args_list)
+    assert first is second
+    np.testing.assert_array_equal(first.to_pandas().to_numpy(), arr[0])
+
+
+@patch("src.handlers.numpy_handlers.numpy_ndarray_viewer.st")
+def test_render_ndarray_slices_warns_about_empty_arrays(mock_st):
+    render_ndarray_slices(np.zeros((0, 2, 2)))
+
+    mock_st.warning.assert_called_once()
+    mock_st.dataframe.assert_not_called()
@@ -0,0 +1,228 @@
+import collections
+import pickle
+import pickletools
+
+import numpy as np
+import pytest
+
+from src.opcodes import build_opcode_index, iter_opcodes, memo_indices_below, scan_opcodes
+
+PLAIN_OBJECTS = [
+    {"a": [1, 2.5, None, True], "b": ("x", b"y" * 300)},
+    [list(range(300)), 2 ** 100, -7, "é" * 70_000],
+    "",
+]
+
+CODE_OBJECTS = [
+    collections.OrderedDict(a=1),
+    np.arange(3),
+    pickle.PickleBuffer(b"out of band"),
+]
+
+
+@pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+@pytest.mark.parametrize("obj", PLAIN_OBJECTS + CODE_OBJECTS[:2])
+def test_iter_opcodes_matches_genops(obj, protocol):
+    data = pickle.dumps(obj, protocol=protocol)
+
+    expected = [(opcode.name, pos) for opcode, _, pos in pickletools.genops(data)]
+    walked = [(opcode.name, pos) for opcode, pos, _, _ in iter_opcodes(data)]
+
+    assert walked == expected
+
+
+def test_iter_opcodes_reports_argument_spans():
+    data = pickle.dumps(b"payload", protocol=3)
+
+    spans = {opcode.name: bytes(data[start:end]) for opcode, _, start, end in iter_opcodes(data)}
+
+    assert spans["SHORT_BINBYTES"] == b"\x07payload"
+    assert spans["STOP"] == b""
+
+
+@pytest.mark.parametrize("protocol", range(3, pickle.HIGHEST_PROTOCOL + 1))  # Older ones encode bytes with a call
+@pytest.mark.parametrize("obj", PLAIN_OBJECTS)
+def test_scan_opcodes_accepts_plain_data(obj, protocol):
+    assert scan_opcodes(pickle.dumps(obj, protocol=protocol)).is_plain_data
+
+
+@pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+@pytest.mark.parametrize("obj", CODE_OBJECTS[:2])
+def test_scan_opcodes_flags_imports_and_calls(obj, protocol):
+    assert not scan_opcodes(pickle.dumps(obj, protocol=protocol)).is_plain_data
+
+
+def test_scan_opcodes_accepts_sets_from_protocol_4():
+    # Older protocols pickle sets as a call to builtins.set:
+    assert scan_opcodes(pickle.dumps([{1, 2}, frozenset({3})], protocol=4)).is_plain_data
+    assert scan_opcodes(pickle.dumps(bytearray(b"z"), protocol=5)).is_plain_data
+    assert not scan_opcodes(pickle.dumps([{1, 2}], protocol=3)).is_plain_data
+
+
+def test_scan_opcodes_records_object_offsets():
+    first = pickle.dumps({"a": 1})
+    second = pickle.dumps([2], protocol=0)
+
+    scan = scan_opcodes(first + second + first)
+
+    assert scan.object_offsets == [0, len(first), len(first) + len(second)]
+    assert scan.is_plain_data
+
+
+def test_scan_opcodes_flags_code_in_any_object_of_a_stream():
+    assert not scan_opcodes(pickle.dumps(1) + pickle.dumps(collections.OrderedDict())).is_plain_data
+
+
+@pytest.mark.parametrize("data", [b"not a pickle", pickle.dumps([1, 2])[:-1], pickle.dumps(b"x" * 1000)[:50]])
+def test_scan_opcodes_rejects_malformed_data(data):
+    with pytest.raises(ValueError):
+        scan_opcodes(data)
+
+
+def test_scan_opcodes_of_empty_data_is_not_plain():
+    assert not scan_opcodes(b"").is_plain_data
+
+
+@pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+def test_scan_opcodes_resolves_imported_globals(protocol):
+    scan = scan_opcodes(pickle.dumps(collections.OrderedDict(a=1), protocol=protocol))
+
+    assert ("collections", "OrderedDict") in scan.globals
+    assert scan.only_imports(frozenset(scan.globals))
+
+
+def test_scan_opcodes_resolves_memoized_stack_global_operands():
+    # The second array reuses the memoized module and name strings of the first one:
+    scan = scan_opcodes(pickle.dumps([np.arange(2), np.arange(3)], protocol=4))
+
+    assert (None, None) not in scan.globals
+    assert {module for module, _ in scan.globals} <= {"numpy", "numpy._core.multiarray", "numpy.core.multiarray"}
+
+
+def test_scan_opcodes_reports_unresolvable_stack_global():
+    # The operands of STACK_GLOBAL are built by a call rather than pushed as strings:
+    data = b"\x80\x04" + b"\x8c\x01a\x85\x8c\x01b\x93."
+
+    assert (None, None) in scan_opcodes(data).globals
+    assert not scan_opcodes(data).only_imports(frozenset({("a", "b")}))
+
+
+def test_scan_opcodes_records_which_objects_hold_code():
+    plain = pickle.dumps({"a": 1})
+    code = pickle.dumps(collections.OrderedDict(a=1))
+
+    scan = scan_opcodes(plain + code + plain + code + code)
+
+    assert scan.code_objects == [1, 3, 4]
+    assert not scan.is_plain_data
+
+
+@pytest.mark.parametrize("obj", PLAIN_OBJECTS + CODE_OBJECTS)
+def test_build_opcode_index_agrees_with_genops(obj):
+    data = pickle.dumps(obj, protocol=5)
+
+    index = build_opcode_index(data)
+
+    expected = [(pos, op.name) for op, _, pos in pickletools.genops(data)]
+    assert [index.describe(position)[:2] for position in range(len(index))] == expected
+    assert index.offsets.dtype == np.int64 and index.codes.dtype == np.uint8
+    assert index.error is None
+
+
+def test_opcode_index_decodes_short_arguments_and_previews_long_ones():
+    data = pickle.dumps(["name", b"x" * 1_000], protocol=4)
+    index = build_opcode_index(data)
+    rows = {name: arg for _, name, arg in map(index.describe, range(len(index)))}
+
+    assert rows["SHORT_BINUNICODE"] == "'name'"
+    assert rows["BINBYTES"].startswith("<1,004 bytes> ")
+
+
+def test_opcode_index_filters_by_opcode_class():
+    data = pickle.dumps(collections.OrderedDict(a=[1, 1]))
+    index = build_opcode_index(data)
+
+    imports = [index.describe(position)[1] for position in index.positions(["imports"])]
+    calls = [index.describe(position)[1] for position in index.positions(["calls"])]
+
+    assert imports == ["GLOBAL"] or imports == ["STACK_GLOBAL"]
+    assert calls == ["REDUCE"]
+    assert len(index.positions(["imports", "calls"])) == 2
+    assert len(index.positions()) == len(index)
+
+
+def test_build_opcode_index_keeps_what_precedes_malformed_data():
+    data = pickle.dumps({"a": 1}) + b"\xff"
+
+    index = build_opcode_index(data)
+
+    assert index.describe(len(index) - 1)[1] == "STOP"
+    assert index.end == len(data) - 1
+    assert "unknown opcode" in index.error
+
+
+def test_scan_opcodes_estimates_the_cost_of_unpickling():
+    data = pickle.dumps({"a": b"x" * 1_000, "b": [[1, 2], [3, 4]]}, protocol=4)
+
+    cost = scan_opcodes(data).cost
+
+    assert cost.payload_bytes == (1 + 1) + (1 + 1) + (4 + 1_000)  # "a", "b" and the bytes
+    assert cost.containers == 4
+    assert cost.opcodes == sum(1 for _ in pickletools.genops(data))
+    assert cost.max_memo == 6
+    # The dict, the outer list and the inner lists:
+    assert cost.max_depth == 3
+    assert cost.estimated_bytes > cost.payload_bytes
+
+
+@pytest.mark.parametrize("protocol", [0, 2, pickle.HIGHEST_PROTOCOL])
+def test_scan_opcodes_cost_grows_with_the_nesting_of_containers(protocol):
+    nested = 1
+    for _ in range(100):
+        nested = [nested]
+
+    assert scan_opcodes(pickle.dumps(nested, protocol=protocol)).cost.max_depth == 100
+
+
+@pytest.mark.parametrize("protocol", [0, 2, pickle.HIGHEST_PROTOCOL])
+@pytest.mark.parametrize("obj", [tuple(range(20_000)), list(range(20_000)), dict.fromkeys(range(20_000))])
+def test_scan_opcodes_depth_of_flat_containers_is_one(obj, protocol):
+    assert scan_opcodes(pickle.dumps(obj, protocol=protocol)).cost.max_depth == 1
+
+
+def test_scan_opcodes_depth_follows_memoized_containers():
+    # Containers are memoized before they are filled, and nested again when fetched from the memo:
+    nested = []
+    for _ in range(30):
+        nested = [nested]
+
+    assert scan_opcodes(pickle.dumps([nested, nested, [nested]])).cost.max_depth == 33
+
+
+def test_scan_opcodes_costs_concatenated_pickles_one_at_a_time():
+    small, large = pickle.dumps([1, [2]]), pickle.dumps(b"x" * 10_000)
+
+    cost = scan_opcodes(small + large + small).cost
+
+    assert cost.payload_bytes == scan_opcodes(large).cost.payload_bytes
+    assert cost.containers == scan_opcodes(small).cost.containers
+    assert cost.max_depth == scan_opcodes(small).cost.max_depth
+
+
+@pytest.mark.parametrize("protocol", [0, 2, 4])
+def test_memo_indices_below_accepts_what_the_pickler_writes(protocol):
+    data = pickle.dumps([[i, str(i), "r\xff\xff\xff\xff"] for i in range(1_000)], protocol=protocol)
+
+    assert memo_indices_below(data, len(data))
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"\x80\x02Nr\x00\x00\x00\x08.",  # LONG_BINPUT 2**27
+        b"Np134217728\n.",  # PUT 134217728
+        b"Np+1_000_000\n.",
+    ],
+)
+def test_memo_indices_below_rejects_indices_past_the_limit(data):
+    assert not memo_indices_below(data, len(data))
@@ -0,0 +1,83 @@
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from src.handlers import pagination
+
+
+@pytest.fixture
+def paging_cfg(monkeypatch):
+    monkeypatch.setitem(pagination.cfg.CONFIG, "DF_PAGINATE_ROWS", 10)
+    monkeypatch.setitem(pagination.cfg.CONFIG, "DF_PAGE_SIZES", (4, 8))
+    monkeypatch.setitem(pagination.cfg.CONFIG, "DF_MAX_ROWS", 1_000)
+
+
+@pytest.mark.parametrize(
+    "rows, page_size, page, expected",
+    [(10, 4, 1, (0, 4)), (10, 4, 3, (8, 10)), (10, 4, 99, (8, 10)), (10, 4, 0, (0, 4)), (0, 4, 1, (0, 0))],
+)
+def test_page_bounds_clamps_to_available_pages(rows, page_size, page, expected):
+    assert pagination.page_bounds(rows, page_size, page) == expected
+
+
+def test_serialize_page_converts_only_the_requested_rows(page_cache):
+    df = pd.DataFrame({"a": range(100)}, index=range(100, 200))
+
+    table = pagination.serialize_page(df, 10, 20)
+
+    pd.testing.assert_frame_equal(table.to_pandas(), df.iloc[10:20])
+    assert page_cache.total_bytes == table.nbytes
+
+
+def test_serialize_page_is_cached_per_object_and_bounds(page_cache):
+    series = pd.Series(range(50), name="s")
+
+    first = pagination.serialize_page(series, 0, 10)
+    pagination.serialize_page(series, 10, 20)
+    again = pagination.serialize_page(series, 0, 10)
+
+    assert again is first
+    assert (len(page_cache), page_cache.hits, page_cache.misses) == (2, 1, 2)
+    assert first.column_names[0] == "s"
+
+
+@patch("src.handlers.pagination.st")
+def test_render_paginated_displays_short_frames_whole(mock_st, paging_cfg):
+    df = pd.DataFrame({"a": range(10)})
+
+    pagination.render_paginated(df, key="df")
+
+    mock_st.dataframe.assert_called_once_with(df)
+    mock_st.number_input.assert_not_called()
+
+
+@patch("src.handlers.pagination.st")
+def test_render_paginated_serializes_the_selected_page(mock_st, paging_cfg, page_cache):
+    df = pd.DataFrame({"a": range(30)})
+    size_column, page_column = MagicMock(), MagicMock()
+    mock_st.columns.return_value = (size_column, page_column)
+    size_column.selectbox.return_value = 8
+    page_column.number_input.return_value = 2
+
+    pagination.render_paginated(df, key="df")
+
+    assert page_column.number_input.call_args.kwargs["max_value"] == 4
+    pd.testing.assert_frame_equal(mock_st.dataframe.call_args[0][0].to_pandas(), df.iloc[8:16])
+    mock_st.caption.assert_called_once_with("Rows 9-16 of 30")
+
+
+@patch("src.handlers.pagination.st")
+def test_render_paginated_caps_the_rows_to_browse(mock_st, paging_cfg, page_cache, monkeypatch):
+    monkeypatch.setitem(pagination.cfg.CONFIG, "DF_MAX_ROWS", 12)
+    series = pd.Series(range(30))
+    size_column, page_column = MagicMock(), MagicMock()
+    mock_st.columns.return_value = (size_column, page_column)
+    size_column.selectbox.return_value = 8
+    page_column.number_input.return_value = 2
+
+    pagination.render_paginated(series, key="series")
+
+    assert page_column.number_input.call_args.kwargs["max_value"] == 2
+    assert len(mock_st.dataframe.call_args[0][0]) == 4
+    assert "first 12 rows" in mock_st.caption.call_args_list[-1][0][0]
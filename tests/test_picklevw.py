@@ -45,7 +45,7 @@ def app():
 @pytest.fixture
 def base_run_cfg():
     return SimpleNamespace(
-        CONFIG={"allow_unsafe": False, "disable_allow_unsafe": False},
+        CONFIG={"allow_unsafe": False, "disable_allow_unsafe": False, "SANDBOX_WORKERS": 0},
         MESSAGES={
             "TOGGLER_TEXT": "Toggle",
             "TOGGLER_HELP": "Help",
@@ -173,7 +173,7 @@ def test_display_content_none_object(mock_cfg, mock_st, mock_handle_none):
     mock_handle_none.assert_called_once_with()
 
 
-@patch("src.picklevw.handle_streamlit_df")
+@patch("handlers.pandas_handlers.pandas_dataframe_handlers.handle_streamlit_df")
 @patch("src.picklevw.st")
 @patch("src.picklevw.cfg")
 def test_display_content_dataframe(mock_cfg, mock_st, mock_handle_df):
@@ -186,7 +186,7 @@ def test_display_content_dataframe(mock_cfg, mock_st, mock_handle_df):
     mock_handle_df.assert_called_once_with(df)
 
 
-@patch("src.picklevw.handle_streamlit_pd_series")
+@patch("handlers.pandas_handlers.pandas_series_handlers.handle_streamlit_pd_series")
 @patch("src.picklevw.st")
 @patch("src.picklevw.cfg")
 def test_display_content_series(mock_cfg, mock_st, mock_handle_series):
@@ -199,7 +199,7 @@ def test_display_content_series(mock_cfg, mock_st, mock_handle_series):
     mock_handle_series.assert_called_once_with(series)
 
 
-@patch("src.picklevw.handle_streamlit_ndarray")
+@patch("handlers.numpy_handlers.numpy_ndarray_handlers.handle_streamlit_ndarray")
 @patch("src.picklevw.st")
 @patch("src.picklevw.cfg")
 def test_display_content_ndarray(mock_cfg, mock_st, mock_handle_ndarray):
@@ -212,7 +212,69 @@ def test_display_content_ndarray(mock_cfg, mock_st, mock_handle_ndarray):
     mock_handle_ndarray.assert_called_once_with(arr)
 
 
-@patch("src.picklevw.handle_streamlit_json")
+@patch("handlers.numpy_handlers.numpy_image_handlers.handle_streamlit_image_batch")
+@patch("src.picklevw.st")
+@patch("src.picklevw.cfg")
+def test_display_content_image_batch(mock_cfg, mock_st, mock_handle_image_batch):
+    batch = {"data": np.zeros((2, 3072), dtype=np.uint8), "labels": [0, 1]}
+    mock_cfg.MESSAGES = {"CONTENT_DISPLAY": "Content:"}
+
+    PickleViewerApp.display_content(batch, were_spared_objs=False, is_dataframe=False)
+
+    mock_handle_image_batch.assert_called_once_with(batch)
+
+
+@patch("handlers.numpy_handlers.numpy_ndarray_handlers.handle_streamlit_ndarray")
+@patch("handlers.stream_handlers.handle_streamlit_object_stream")
+@patch("src.picklevw.st")
+@patch("src.picklevw.cfg")
+def test_display_content_object_stream(mock_cfg, mock_st, mock_handle_stream, mock_handle_ndarray):
+    from streams import PickleObjectStream  # The class the handler registry knows
+
+    data = pickle.dumps(np.arange(3)) + pickle.dumps(2)
+    stream = PickleObjectStream(io.BytesIO(data), [0, len(pickle.dumps(np.arange(3)))])
+    mock_cfg.MESSAGES = {"CONTENT_DISPLAY": "Content:"}
+
+    PickleViewerApp.display_content(stream, were_spared_objs=True, is_dataframe=False)
+
+    (handled, display), _ = mock_handle_stream.call_args
+    assert handled is stream
+    display(stream[0])  # The object picked for inspection goes through the regular handlers
+    mock_handle_ndarray.assert_called_once()
+
+
+@pytest.mark.parametrize("obj", [{"a": {1, 2}}, [object()]])
+@patch("handlers.builtin_handlers.handle_streamlit_json")
+@patch("handlers.tree_handlers.handle_streamlit_tree")
+@patch("src.picklevw.st")
+@patch("src.picklevw.cfg")
+def test_display_content_explores_non_serializable_containers(mock_cfg, mock_st, mock_handle_tree, mock_handle_json, obj):
+    mock_cfg.MESSAGES = {"CONTENT_DISPLAY": "Content:"}
+
+    PickleViewerApp.display_content(obj, were_spared_objs=False, is_dataframe=False)
+
+    mock_handle_tree.assert_called_once_with(obj)
+    mock_handle_json.assert_not_called()
+
+
+@patch("utils.is_json_serializable")
+@patch("handlers.tree_handlers.handle_streamlit_tree")
+@patch("handlers.inspection.should_explore", return_value=True)
+@patch("src.picklevw.st")
+@patch("src.picklevw.cfg")
+def test_display_content_explores_large_containers_without_serializing_them(
+    mock_cfg, mock_st, mock_should_explore, mock_handle_tree, mock_is_json_serializable
+):
+    obj = {"x": list(range(10))}
+    mock_cfg.MESSAGES = {"CONTENT_DISPLAY": "Content:"}
+
+    PickleViewerApp.display_content(obj, were_spared_objs=False, is_dataframe=False)
+
+    mock_handle_tree.assert_called_once_with(obj)
+    mock_is_json_serializable.assert_not_called()
+
+
+@patch("handlers.builtin_handlers.handle_streamlit_json")
 @patch("src.picklevw.st")
 @patch("src.picklevw.cfg")
 def test_display_content_json_serializable(mock_cfg, mock_st, mock_handle_json):
@@ -271,11 +333,29 @@ def test_display_content_suppresses_display_error_when_debug_is_disabled(mock_cf
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture
+def load_cache(monkeypatch):
+    import src.picklevw as picklevw_module
+    from cache import LoadCache
+
+    cache = LoadCache(max_bytes=1024)
+    monkeypatch.setattr(picklevw_module, "LOAD_CACHE", cache)
+    return cache
+
+
+def mock_loader_for(result, digest="digest", allow_unsafe_file=False):
+    mock_loader = MagicMock()
+    mock_loader.load.return_value = result
+    mock_loader.cache_key = (digest, allow_unsafe_file)
+    mock_loader.verdict = "safe"
+    mock_loader.nbytes = 10
+    return mock_loader
+
+
 @patch("src.picklevw.st")
 @patch("src.picklevw.PickleLoader")
-def test_process_file_success(mock_loader_class, mock_st, app):
-    mock_loader = MagicMock()
-    mock_loader.load.return_value = ({"a": 1}, False, True)
+def test_process_file_success(mock_loader_class, mock_st, app, load_cache):
+    mock_loader = mock_loader_for(({"a": 1}, False, True))
     mock_loader_class.return_value = mock_loader
     app.display_content = MagicMock()
     mock_file = MagicMock()
@@ -288,6 +368,154 @@ def test_process_file_success(mock_loader_class, mock_st, app):
     mock_st.error.assert_not_called()
 
 
+@patch("src.picklevw.st")
+@patch("src.picklevw.PickleLoader")
+def test_process_file_rerun_is_served_from_load_cache(mock_loader_class, mock_st, app, load_cache):
+    first_loader = mock_loader_for(({"a": 1}, False, False))
+    second_loader = mock_loader_for(({"a": 1}, False, False))
+    mock_loader_class.side_effect = [first_loader, second_loader]
+    app.display_content = MagicMock()
+
+    app.process_file(MagicMock(), allow_unsafe_file=False)
+    app.process_file(MagicMock(), allow_unsafe_file=False)
+
+    first_loader.load.assert_called_once_with()
+    second_loader.load.assert_not_called()
+    assert app.display_content.call_count == 2
+    assert load_cache.hits == 1
+    assert load_cache.misses == 1
+
+
+@pytest.mark.parametrize("debug", [True, False])
+@patch("src.picklevw.handle_streamlit_timings")
+@patch("src.picklevw.st")
+@patch("src.picklevw.PickleLoader")
+def test_process_file_shows_timings_in_debug_mode(
+    mock_loader_class, mock_st, mock_timings, debug, app, load_cache, monkeypatch
+):
+    import config
+
+    monkeypatch.setitem(config.CONFIG, "DEBUG_MODE", debug)
+    mock_loader_class.return_value = mock_loader_for(({"a": 1}, False, False))
+    app.display_content = MagicMock()
+
+    app.process_file(MagicMock(), allow_unsafe_file=False)
+
+    assert mock_timings.call_count == int(debug)
+    if debug:
+        current = mock_timings.call_args.args[0]
+        assert current.attributes == {"verdict": "safe", "digest": mock_loader_class.return_value.digest}
+
+
+@patch("src.picklevw.handle_streamlit_preview")
+@patch("src.picklevw.handle_streamlit_disassembly")
+@patch("src.picklevw.st")
+@patch("src.picklevw.PickleLoader")
+def test_process_file_previews_and_disassembles_refused_files(
+    mock_loader_class, mock_st, mock_disassembly, mock_preview, app, load_cache
+):
+    mock_loader = mock_loader_for(None)
+    mock_loader.load.side_effect = ExceptionUnsafePickle("unsafe")
+    mock_loader.buffer.getbuffer.return_value = memoryview(b"data")
+    mock_loader_class.return_value = mock_loader
+    app.display_content = MagicMock()
+
+    app.process_file(MagicMock(), allow_unsafe_file=False)
+
+    mock_st.error.assert_called_once_with("unsafe")
+    for handler in (mock_preview, mock_disassembly):
+        (digest, data), _ = handler.call_args
+        assert digest == mock_loader.digest
+        assert data() == b"data"
+    mock_st.stop.assert_called_once_with()
+
+
+@patch("src.picklevw.handle_streamlit_preview")
+@patch("src.picklevw.handle_streamlit_disassembly")
+@patch("src.picklevw.st")
+@patch("src.picklevw.PickleLoader")
+def test_process_file_keeps_the_unsafe_message_when_the_preview_fails(
+    mock_loader_class, mock_st, mock_disassembly, mock_preview, app, load_cache
+):
+    mock_loader = mock_loader_for(None)
+    mock_loader.load.side_effect = ExceptionUnsafePickle("unsafe")
+    mock_loader_class.return_value = mock_loader
+    mock_preview.side_effect = RecursionError("maximum recursion depth exceeded")
+    app.display_content = MagicMock()
+
+    app.process_file(MagicMock(), allow_unsafe_file=False)
+
+    mock_st.error.assert_called_once_with("unsafe")
+    mock_st.warning.assert_called_once()
+    mock_disassembly.assert_called_once()
+    mock_st.stop.assert_called_once_with()
+
+
+@pytest.mark.parametrize("verdict, disassembled", [("bypassed", True), ("safe", False), ("allowlisted", False)])
+@patch("src.picklevw.handle_streamlit_disassembly")
+@patch("src.picklevw.st")
+@patch("src.picklevw.PickleLoader")
+def test_process_file_disassembles_bypassed_files(
+    mock_loader_class, mock_st, mock_disassembly, app, load_cache, verdict, disassembled
+):
+    mock_loader = mock_loader_for(({"a": 1}, False, False))
+    mock_loader.verdict = verdict
+    mock_loader_class.return_value = mock_loader
+    app.display_content = MagicMock()
+
+    app.process_file(MagicMock(), allow_unsafe_file=True)
+
+    app.display_content.assert_called_once()
+    assert mock_disassembly.called is disassembled
+
+
+@pytest.mark.parametrize("mode, previewed", [("preview", True), ("refuse", False)])
+@patch("src.picklevw.handle_streamlit_preview")
+@patch("src.picklevw.handle_streamlit_disassembly")
+@patch("src.picklevw.st")
+@patch("src.picklevw.PickleLoader")
+def test_process_file_previews_files_over_the_load_budget(
+    mock_loader_class, mock_st, mock_disassembly, mock_preview, app, load_cache, monkeypatch, mode, previewed
+):
+    import src.picklevw as picklevw_module
+    from src.picklevw import ExceptionLoadBudget
+
+    monkeypatch.setitem(picklevw_module.cfg.CONFIG, "LOAD_OVER_BUDGET", mode)
+    mock_loader = mock_loader_for(None)
+    mock_loader.load.side_effect = ExceptionLoadBudget("too expensive")
+    mock_loader_class.return_value = mock_loader
+    app.display_content = MagicMock()
+
+    app.process_file(MagicMock(), allow_unsafe_file=True)
+
+    mock_st.error.assert_called_once_with("too expensive")
+    assert mock_preview.called is previewed
+    mock_disassembly.assert_not_called()
+    app.display_content.assert_not_called()
+    mock_st.stop.assert_called_once_with()
+
+
+@patch("src.picklevw.handle_streamlit_disassembly")
+@patch("src.picklevw.st")
+@patch("src.picklevw.PickleLoader")
+def test_process_file_disassembles_files_killed_in_the_sandbox(
+    mock_loader_class, mock_st, mock_disassembly, app, load_cache
+):
+    from src.picklevw import ExceptionSandboxFailure
+
+    mock_loader = mock_loader_for(None)
+    mock_loader.load.side_effect = ExceptionSandboxFailure("worker killed")
+    mock_loader_class.return_value = mock_loader
+    app.display_content = MagicMock()
+
+    app.process_file(MagicMock(), allow_unsafe_file=True)
+
+    mock_st.error.assert_called_once_with("worker killed")
+    mock_disassembly.assert_called_once()
+    app.display_content.assert_not_called()
+    mock_st.stop.assert_called_once_with()
+
+
 @patch("src.picklevw.st")
 def test_process_file_unsafe_exception(mock_st, app):
     app.display_content = MagicMock()
@@ -301,6 +529,20 @@ def test_process_file_unsafe_exception(mock_st, app):
     app.display_content.assert_not_called()
 
 
+@patch("src.picklevw.st")
+def test_process_file_decompression_limit(mock_st, app):
+    from src.picklevw import ExceptionDecompressionLimit
+
+    app.display_content = MagicMock()
+
+    with patch("src.picklevw.PickleLoader", side_effect=ExceptionDecompressionLimit("too big")):
+        app.process_file(MagicMock(), allow_unsafe_file=False)
+
+    mock_st.error.assert_called_once_with("too big")
+    mock_st.stop.assert_called_once_with()
+    app.display_content.assert_not_called()
+
+
 @pytest.mark.parametrize("exception_class", [IOError, OSError])
 @patch("src.picklevw.st")
 @patch("src.picklevw.cfg")
@@ -426,6 +668,25 @@ def test_run_with_unsafe_toggle_warns_and_processes_with_unsafe_flag(
     app.process_file.assert_called_once_with(uploaded_file, True)
 
 
+@pytest.mark.parametrize("allow_unsafe_file", [True, False])
+@patch("src.picklevw.get_sandbox_pool")
+@patch("src.picklevw.st")
+@patch("src.picklevw.cfg")
+@patch.object(PickleViewerApp, "upload_file", return_value=None)
+def test_run_starts_the_sandbox_workers_once_the_bypass_is_enabled(
+    mock_upload, mock_cfg, mock_st, mock_get_sandbox_pool, app, base_run_cfg, allow_unsafe_file
+):
+    mock_cfg.CONFIG = {**base_run_cfg.CONFIG, "SANDBOX_WORKERS": 2}
+    mock_cfg.MESSAGES = base_run_cfg.MESSAGES
+    mock_st.session_state = SessionState({"allow_unsafe_file": allow_unsafe_file})
+    mock_st.toggle.return_value = allow_unsafe_file
+    app.setup_page = MagicMock()
+
+    app.run()
+
+    assert mock_get_sandbox_pool.called is allow_unsafe_file
+
+
 @patch("src.picklevw.st")
 @patch("src.picklevw.cfg")
 @patch.object(PickleViewerApp, "upload_file", return_value=None)
@@ -456,9 +717,10 @@ def test_handle_streamlit_none(mock_cfg, mock_st):
     mock_st.warning.assert_called_once_with("Error loading")
 
 
+@patch("src.handlers.pagination.st")
 @patch("src.handlers.pandas_handlers.pandas_dataframe_handlers.st")
 @patch("src.handlers.pandas_handlers.pandas_dataframe_handlers.cfg")
-def test_handle_streamlit_df(mock_cfg, mock_st):
+def test_handle_streamlit_df(mock_cfg, mock_st, mock_pagination_st):
     df = pd.DataFrame({"a": [1, 2], "b": [3, 4]})
     mock_cfg.MESSAGES = {
         "row_col_summary": "Pandas DataFrame with **{rows}** rows and **{cols}** columns"
@@ -467,20 +729,21 @@ def test_handle_streamlit_df(mock_cfg, mock_st):
     handle_streamlit_df(df)
 
     mock_st.write.assert_called_once_with("Pandas DataFrame with **2** rows and **2** columns")
-    mock_st.dataframe.assert_called_once_with(df)
+    mock_pagination_st.dataframe.assert_called_once_with(df)
 
 
+@patch("src.handlers.pagination.st")
 @patch("src.handlers.pandas_handlers.pandas_series_handlers.st")
 @patch("src.handlers.pandas_handlers.pandas_series_handlers.cfg")
-def test_handle_streamlit_pd_series(mock_cfg, mock_st):
+def test_handle_streamlit_pd_series(mock_cfg, mock_st, mock_pagination_st):
     series = pd.Series([10, 20, 30], name="my_series")
     mock_cfg.MESSAGES = {"CHART": "Chart:"}
 
     handle_streamlit_pd_series(series)
 
     mock_st.write.assert_called_once_with("Pandas Series: **my_series**, 3 elements")
-    mock_st.dataframe.assert_called_once()
-    pd.testing.assert_frame_equal(mock_st.dataframe.call_args[0][0], series.to_frame())
+    mock_pagination_st.dataframe.assert_called_once()
+    pd.testing.assert_frame_equal(mock_pagination_st.dataframe.call_args[0][0], series.to_frame())
     mock_st.markdown.assert_called_with("Chart:")
     mock_st.line_chart.assert_called_once_with(series)
 
@@ -505,6 +768,18 @@ def test_handle_streamlit_json_unquotes_spared_string(mock_cfg, mock_st):
     mock_st.code.assert_called_once_with("plain string", language="json")
 
 
+@patch("src.handlers.builtin_handlers.serialize_json", return_value=('"a long str', True))
+@patch("src.handlers.builtin_handlers.st")
+@patch("src.handlers.builtin_handlers.cfg")
+def test_handle_streamlit_json_reports_truncation(mock_cfg, mock_st, mock_serialize_json):
+    mock_cfg.MESSAGES = {"JSON_TRUNCATED": "first {chars} characters"}
+
+    builtin_handlers.handle_streamlit_json("a long string", were_spared_objs=True)
+
+    mock_st.code.assert_called_once_with("a long str", language="json")
+    mock_st.caption.assert_called_once_with("first 10 characters")
+
+
 @patch("src.handlers.numpy_handlers.numpy_ndarray_handlers.st")
 @patch("src.handlers.numpy_handlers.numpy_ndarray_handlers.cfg")
 @patch("src.handlers.numpy_handlers.numpy_ndarray_handlers.pd")
@@ -579,21 +854,29 @@ def test_handle_streamlit_ndarray_2d_non_numeric(mock_pd, mock_cfg, mock_st):
     mock_st.line_chart.assert_not_called()
 
 
+@patch("src.handlers.numpy_handlers.numpy_ndarray_viewer.st")
 @patch("src.handlers.numpy_handlers.numpy_ndarray_handlers.st")
 @patch("src.handlers.numpy_handlers.numpy_ndarray_handlers.cfg")
-def test_handle_streamlit_ndarray_3d(mock_cfg, mock_st):
+def test_handle_streamlit_ndarray_3d(mock_cfg, mock_st, mock_viewer_st):
     mock_cfg.MESSAGES = {"CHART": "Chart:"}
     arr = np.array([[[1, 2], [3, 4]], [[5, 6], [7, 8]]])
+    rows_column, cols_column = MagicMock(), MagicMock()
+    mock_viewer_st.columns.return_value = (rows_column, cols_column)
+    rows_column.selectbox.return_value = 1
+    cols_column.selectbox.return_value = 2
+    mock_viewer_st.slider.return_value = 1
 
     handle_streamlit_ndarray(arr)
 
     mock_st.write.assert_called_once_with("NumPy ndarray: shape = (2, 2, 2), dtype = int64")
-    mock_st.warning.assert_called_once_with(
-        "NumPy array has more than 2 dimensions and cannot be displayed directly."
-    )
-    mock_st.dataframe.assert_not_called()
-    mock_st.markdown.assert_not_called()
+    mock_st.warning.assert_not_called()
     mock_st.line_chart.assert_not_called()
+    mock_viewer_st.write.assert_called_once_with(
+        "min = **1**, max = **8**, mean = **4.5**, NaN count = **0**"
+    )
+    mock_viewer_st.slider.assert_called_once()
+    table = mock_viewer_st.dataframe.call_args[0][0]
+    np.testing.assert_array_equal(table.to_pandas().to_numpy(), arr[1])
 
 
 @pytest.mark.parametrize(
@@ -673,6 +956,67 @@ def test_pickle_security_checker_rejects_severity_above_threshold(monkeypatch):
         utils.PickleSecurityChecker(io.BytesIO(b"pickle")).ensure_safe()
 
 
+def test_pickle_security_checker_skips_fickling_for_plain_data(monkeypatch):
+    import src.utils as utils
+
+    monkeypatch.setattr(utils.Pickled, "load", MagicMock(side_effect=AssertionError("fickling ran")))
+
+    utils.PickleSecurityChecker(io.BytesIO(pickle_bytes({"a": [1, 2.5]}, "b"))).ensure_safe()
+
+
+def test_pickle_security_checker_runs_fickling_when_code_opcodes_are_found(monkeypatch):
+    import collections
+    import src.utils as utils
+
+    monkeypatch.setattr(utils.Pickled, "load", MagicMock(return_value=object()))
+    monkeypatch.setattr(
+        utils,
+        "check_safety",
+        MagicMock(return_value=SimpleNamespace(severity=SimpleNamespace(value=(1,)))),
+    )
+    buffer = io.BytesIO(pickle.dumps(collections.OrderedDict(a=1)))
+
+    utils.PickleSecurityChecker(buffer).ensure_safe()
+
+    utils.Pickled.load.assert_called_once_with(buffer)
+
+
+class _RunsShell:
+    def __reduce__(self):
+        import os
+
+        return os.system, ("true",)
+
+
+def test_pickle_security_checker_rejects_code_hidden_after_a_plain_object(monkeypatch):
+    import src.utils as utils
+    from fickling.exception import UnsafeFileError
+
+    monkeypatch.setattr(utils.cfg, "CONFIG", {"SEVERITY_THRESHOLD": 1})
+
+    # Fickling on its own only analyzes the first, harmless, pickle of the stream:
+    with pytest.raises(UnsafeFileError):
+        utils.PickleSecurityChecker(io.BytesIO(pickle_bytes({"a": 1}, _RunsShell()))).ensure_safe()
+
+
+def test_pickle_security_checker_only_analyzes_the_pickles_holding_code(monkeypatch):
+    import collections
+    import src.utils as utils
+
+    seen = []
+    monkeypatch.setattr(utils.Pickled, "load", MagicMock(side_effect=lambda buffer: seen.append(buffer.tell())))
+    monkeypatch.setattr(
+        utils,
+        "check_safety",
+        MagicMock(return_value=SimpleNamespace(severity=SimpleNamespace(value=(1,)))),
+    )
+    plain, code = pickle.dumps({"a": 1}), pickle.dumps(collections.OrderedDict(a=1))
+
+    utils.PickleSecurityChecker(io.BytesIO(plain + code + plain + code)).ensure_safe()
+
+    assert seen == [len(plain), 2 * len(plain) + len(code)]
+
+
 @pytest.mark.parametrize("obj", [pd.DataFrame({"a": [1]}), pd.Series([1, 2], name="s")])
 def test_pickle_reader_try_read_dataframe_returns_pandas_objects(obj):
     import src.utils as utils
@@ -733,15 +1077,56 @@ def test_pickle_reader_try_read_objects_returns_single_object():
     assert multiple is False
 
 
-def test_pickle_reader_try_read_objects_returns_joined_string_for_multiple_objects():
+def test_pickle_reader_try_read_objects_returns_stream_for_multiple_objects():
     import src.utils as utils
 
     obj, multiple = utils.PickleReader(io.BytesIO(pickle_bytes("first", 2))).try_read_objects()
 
-    assert obj == "first, 2"
+    assert len(obj) == 2
+    assert list(obj) == ["first", 2]
     assert multiple is True
 
 
+def test_pickle_reader_try_read_objects_indexes_streams_without_unpickling_them(monkeypatch):
+    import src.utils as utils
+
+    reader = utils.PickleReader(io.BytesIO(pickle_bytes(*range(1000))))
+    load = MagicMock(side_effect=AssertionError("unpickled while indexing"))
+    monkeypatch.setattr(utils.pickle, "load", load)
+
+    stream, multiple = reader.try_read_objects()
+
+    load.assert_not_called()
+    assert len(stream) == 1000
+    assert stream[543] == 543
+
+
+def test_pickle_reader_try_read_objects_only_reads_the_first_object_of_streams_ending_with_garbage():
+    import src.utils as utils
+
+    obj, multiple = utils.PickleReader(io.BytesIO(pickle_bytes("first", 2) + b"garbage")).try_read_objects()
+
+    assert obj == "first"
+    assert multiple is False
+
+
+def test_pickle_loader_never_unpickles_past_the_first_object_of_an_unscannable_stream(tmp_path, uploaded_file_factory):
+    import os
+    import src.utils as utils
+
+    class Exploit:
+        def __reduce__(self):
+            return os.system, (f"touch {tmp_path / 'pwned'}",)
+
+    # The trailing byte makes the opcode scan fail, so only the first pickle is analyzed:
+    data = pickle.dumps({"a": 1}) + pickle.dumps(Exploit()) + b"\xff"
+
+    loader = utils.PickleLoader(uploaded_file_factory(data))
+    assert loader.load() == ({"a": 1}, False, False)
+    assert loader.verdict == "safe"
+    assert not (tmp_path / "pwned").exists()
+
+
 @pytest.mark.parametrize("data", [b"", b"not a pickle"])
 def test_pickle_reader_try_read_objects_returns_none_for_empty_or_unpicklable_data(data):
     import src.utils as utils
@@ -800,7 +1185,7 @@ def test_pickle_loader_safe_load_returns_generic_objects(monkeypatch, uploaded_f
 
     obj, multiple, is_dataframe = utils.PickleLoader(uploaded_file_factory(raw_data)).load()
 
-    assert obj == "first, 2"
+    assert list(obj) == ["first", 2]
     assert multiple is True
     assert is_dataframe is False
 
@@ -826,6 +1211,62 @@ def test_pickle_loader_unsafe_allowed_returns_dataframe(monkeypatch, uploaded_fi
     assert is_dataframe is True
 
 
+@pytest.mark.parametrize(
+    "obj, expected_is_dataframe",
+    [
+        (np.arange(6).reshape(2, 3), False),
+        (pd.Series([1, 2], name="s"), True),
+        ({"data": np.zeros((2, 3072), dtype=np.uint8), "labels": [0, 1]}, False),
+    ],
+)
+def test_pickle_loader_unsafe_allowed_unpickles_only_once(
+    monkeypatch,
+    uploaded_file_factory,
+    obj,
+    expected_is_dataframe,
+):
+    import src.utils as utils
+    from fickling.exception import UnsafeFileError
+
+    monkeypatch.setattr(
+        utils.PickleSecurityChecker,
+        "ensure_safe",
+        MagicMock(side_effect=UnsafeFileError(info="unsafe", filepath="file.pkl")),
+    )
+    monkeypatch.setattr(utils, "ALLOWED_GLOBALS", frozenset())  # Exercise the bypass path
+    pickle_load = MagicMock(wraps=pickle.load)
+    monkeypatch.setattr(utils.pickle, "load", pickle_load)
+    monkeypatch.setattr(pd, "read_pickle", MagicMock(side_effect=AssertionError("second pass")))
+
+    result, multiple, is_dataframe = utils.PickleLoader(
+        uploaded_file_factory(pickle.dumps(obj)),
+        allow_unsafe_file=True,
+    ).load()
+
+    # The objects are located by scanning the opcodes, so the single object is only loaded once:
+    assert pickle_load.call_count == 1
+    assert type(result) is type(obj)
+    assert multiple is False
+    assert is_dataframe is expected_is_dataframe
+
+
+@pytest.mark.parametrize(
+    "obj, multiple, expected_kind",
+    [
+        (pd.DataFrame({"a": [1]}), False, "dataframe"),
+        (pd.Series([1]), False, "series"),
+        (np.array([1]), False, "ndarray"),
+        ({"data": np.zeros((1, 3072))}, False, "image_batch"),
+        ({"data": [1, 2]}, False, "generic"),
+        (["first", 2], True, "stream"),
+    ],
+)
+def test_pickle_reader_classify(obj, multiple, expected_kind):
+    import src.utils as utils
+
+    assert utils.PickleReader.classify(obj, multiple) == expected_kind
+
+
 # def test_pickle_loader_unsafe_allowed_returns_numpy_array(monkeypatch, uploaded_file_factory):
 #     import src.picklevw as picklevw_module
 #
@@ -869,6 +1310,122 @@ def test_pickle_loader_unsafe_allowed_returns_dataframe(monkeypatch, uploaded_fi
 #     assert multiple is False
 #     assert is_dataframe is True
 
+@pytest.mark.parametrize(
+    "obj",
+    [np.arange(6).reshape(2, 3), pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}), [np.float32(1), pd.Series([2])]],
+)
+def test_pickle_loader_reads_allowlisted_pickles_without_fickling_or_bypass(
+    monkeypatch,
+    uploaded_file_factory,
+    obj,
+):
+    import src.utils as utils
+
+    monkeypatch.setattr(utils, "Pickled", MagicMock(side_effect=AssertionError("fickling analysis")))
+
+    loader = utils.PickleLoader(uploaded_file_factory(pickle.dumps(obj)))
+    result, multiple, is_dataframe = loader.load()
+
+    assert loader.verdict == "allowlisted"
+    assert type(result) is type(obj)
+    assert multiple is False
+    assert is_dataframe is isinstance(obj, pd.DataFrame)
+
+
+def test_pickle_loader_leaves_pickles_with_other_globals_to_fickling(monkeypatch, uploaded_file_factory):
+    import src.utils as utils
+    from collections import Counter
+    from fickling.exception import UnsafeFileError
+
+    ensure_safe = MagicMock(side_effect=UnsafeFileError(info="unsafe", filepath="file.pkl"))
+    monkeypatch.setattr(utils.PickleSecurityChecker, "ensure_safe", ensure_safe)
+
+    data = pickle.dumps([np.arange(3), Counter("ab")])
+    with pytest.raises(utils.ExceptionUnsafePickle):
+        utils.PickleLoader(uploaded_file_factory(data)).load()
+    ensure_safe.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "data, setting, limit",
+    [
+        (pickle.dumps(b"x" * 100_000), "LOAD_BUDGET_BYTES", 10_000),
+        (pickle.dumps([[[[SimpleNamespace()]]]]), "LOAD_MAX_DEPTH", 3),
+    ],
+)
+def test_pickle_loader_refuses_pickles_over_the_load_budget(monkeypatch, uploaded_file_factory, data, setting, limit):
+    import src.utils as utils
+
+    monkeypatch.setitem(utils.cfg.CONFIG, setting, limit)
+    monkeypatch.setattr(utils.pickle, "load", MagicMock(side_effect=AssertionError("unpickled")))
+    monkeypatch.setattr(utils.PickleReader, "try_read_objects", MagicMock(side_effect=AssertionError("unpickled")))
+
+    loader = utils.PickleLoader(uploaded_file_factory(data), allow_unsafe_file=True)
+    with pytest.raises(utils.ExceptionLoadBudget, match=setting):
+        loader.load()
+    assert loader.verdict == "over_budget"
+
+
+def test_pickle_loader_loads_large_flat_containers(uploaded_file_factory):
+    from collections import OrderedDict
+    import src.utils as utils
+
+    # The OrderedDict makes the loader scan the opcodes, and check their depth:
+    obj = [tuple(range(20_000)), list(range(20_000)), OrderedDict()]
+
+    loader = utils.PickleLoader(uploaded_file_factory(pickle.dumps(obj)))
+    assert loader.load() == (obj, False, False)
+    assert loader.verdict == "allowlisted"
+
+
+def test_pickle_loader_reads_plain_data_without_scanning_its_opcodes(monkeypatch, uploaded_file_factory):
+    import src.utils as utils
+
+    monkeypatch.setattr(utils, "scan_opcodes", MagicMock(side_effect=AssertionError("scanned")))
+    obj = list(range(200_000))
+
+    loader = utils.PickleLoader(uploaded_file_factory(pickle.dumps(obj)))
+    assert loader.load() == (obj, False, False)
+    assert loader.verdict == "safe"
+
+
+def test_pickle_loader_scans_plain_data_with_memo_indices_past_its_size(uploaded_file_factory):
+    import src.utils as utils
+
+    # A memo index far beyond the size of the pickle would make the unpickler allocate gigabytes,
+    # even though 9 bytes fit any budget:
+    data = b"\x80\x02Nr\x00\x00\x00\x08."
+
+    loader = utils.PickleLoader(uploaded_file_factory(data))
+    with pytest.raises(utils.ExceptionLoadBudget, match="LOAD_BUDGET_BYTES"):
+        loader.load()
+    assert loader.verdict == "over_budget"
+
+
+def test_pickle_loader_refuses_plain_data_nested_too_deep(monkeypatch, uploaded_file_factory):
+    import src.utils as utils
+
+    monkeypatch.setitem(utils.cfg.CONFIG, "LOAD_MAX_DEPTH", 10)
+    shared = [[[[[[]]]]]]
+    nested = [shared, [[[[[shared]]]]]]  # Only as deep as the limit through the first reference
+
+    loader = utils.PickleLoader(uploaded_file_factory(pickle.dumps(nested)))
+    with pytest.raises(utils.ExceptionLoadBudget, match="LOAD_MAX_DEPTH"):
+        loader.load()
+
+    flat = [shared, shared]
+    assert utils.PickleLoader(uploaded_file_factory(pickle.dumps(flat))).load() == (flat, False, False)
+
+
+def test_pickle_loader_does_not_allowlist_calls_to_numpy_ndarray(uploaded_file_factory):
+    import src.utils as utils
+
+    loader = utils.PickleLoader(uploaded_file_factory(b"\x80\x02cnumpy\nndarray\nM@\x1f\x85\x85R."))
+    with pytest.raises(utils.ExceptionUnsafePickle):
+        loader.load()
+    assert loader.verdict == "unsafe"
+
+
 def test_pickle_loader_unsafe_disallowed_raises_project_exception(monkeypatch, uploaded_file_factory):
     import src.utils as utils
     from fickling.exception import UnsafeFileError
@@ -881,7 +1438,7 @@ def test_pickle_loader_unsafe_disallowed_raises_project_exception(monkeypatch, u
     monkeypatch.setattr(utils.cfg, "MESSAGES", {"POTENTIAL_THREAT": "threat detected"})
 
     with pytest.raises(utils.ExceptionUnsafePickle, match="threat detected"):
-        utils.PickleLoader(uploaded_file_factory(pickle.dumps({"a": 1}))).load()
+        utils.PickleLoader(uploaded_file_factory(pickle.dumps(SimpleNamespace(a=1)))).load()
 
 
 # def test_pickle_loader_unsafe_allowed_unsupported_object_raises_project_exception(
@@ -0,0 +1,130 @@
+import collections
+import os
+import pickle
+import struct
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.handlers.preview_handlers import handle_streamlit_preview
+from src.preview import build_preview
+
+
+class RunsShell:
+    def __reduce__(self):
+        return os.system, ("echo pwned",)
+
+
+# Calls a global of a module that doesn't exist with a 2,000-byte argument:
+MISSING = (
+    b"\x80\x03cpicklevw_module_that_does_not_exist\nMissing\n"
+    + b"B" + struct.pack("<I", 2_000) + b"x" * 2_000
+    + b"\x85R."
+)
+
+
+@pytest.fixture(autouse=True)
+def preview_cache(monkeypatch):
+    from cache import ByteBoundedCache
+    from src.handlers import preview_handlers
+
+    cache = ByteBoundedCache(max_bytes=1024 ** 3)
+    monkeypatch.setattr(preview_handlers, "PREVIEW_CACHE", cache)
+    return cache
+
+
+def test_build_preview_outlines_containers_and_scalars():
+    preview = build_preview(pickle.dumps({"a": [1, 2.5, None], "b": ("x", True)}))
+
+    assert preview.outline() == "\n".join([
+        "dict of 2",
+        "    'a': list of 3",
+        "        [0] 1",
+        "        [1] 2.5",
+        "        [2] None",
+        "    'b': tuple of 2",
+        "        [0] 'x'",
+        "        [1] True",
+    ])
+    assert preview.error is None
+    assert not preview.globals and not preview.calls
+
+
+def test_build_preview_records_globals_and_calls_without_importing_them():
+    preview = build_preview(pickle.dumps(RunsShell()) + MISSING)
+
+    assert preview.globals[(os.system.__module__, "system")] == 1
+    assert preview.globals[("picklevw_module_that_does_not_exist", "Missing")] == 1
+    calls = [node.inline() for _, node in preview.calls]
+    assert calls[0] == f"{os.system.__module__}.system('echo pwned')"
+    assert calls[1] == "picklevw_module_that_does_not_exist.Missing(<bytes, 2.0 KiB>)"
+
+
+def test_build_preview_sizes_large_payloads_without_decoding_them():
+    data = pickle.dumps(np.zeros(100_000, dtype=np.uint8))
+
+    preview = build_preview(data)
+
+    assert [(opcode, size) for _, opcode, size in preview.payloads] == [("BINBYTES", 100_004)]
+    assert preview.payload_bytes == 100_004
+    assert "<bytes, 97.7 KiB>" in preview.outline()
+
+
+def test_build_preview_keeps_a_bounded_number_of_items(monkeypatch):
+    import config
+
+    monkeypatch.setitem(config.CONFIG, "PREVIEW_MAX_ITEMS", 3)
+
+    preview = build_preview(pickle.dumps(list(range(1_000))))
+
+    assert preview.roots[0].length == 1_000
+    assert len(preview.roots[0].children) == 3
+    assert preview.outline().endswith("... 997 more")
+
+
+def test_build_preview_outline_survives_self_references():
+    items = [1]
+    items.append(items)
+
+    assert build_preview(pickle.dumps(items)).outline() == "list of 2\n    [0] 1\n    [1] <memo 0>"
+
+
+def test_build_preview_outline_survives_calls_built_with_themselves():
+    preview = build_preview(b"\x80\x02cos\nsystem\nX\x04\x00\x00\x00true\x85Rq\x00h\x00b.")
+
+    assert preview.outline() == "os.system('true', state=<memo 0>)\n    'true'\n    state=<memo 0>"
+
+
+def test_build_preview_elides_deeply_nested_calls():
+    data = b"\x80\x02" + b"cbuiltins\nid\n" * 10_000 + b"N" + b"\x85R" * 10_000 + b"."
+
+    assert build_preview(data).outline(max_depth=1).splitlines() == [
+        "builtins.id(builtins.id(builtins.id(<...>)))", "    builtins.id(builtins.id(builtins.id(<...>)))"
+    ]
+
+
+def test_build_preview_covers_each_concatenated_pickle():
+    preview = build_preview(pickle.dumps("first") + pickle.dumps(collections.OrderedDict(a=1)))
+
+    assert preview.outline().splitlines()[:2] == ["#0: 'first'", "#1: collections.OrderedDict('a': 1)"]
+
+
+@pytest.mark.parametrize("data", [b"\x80\x04R.", pickle.dumps([1, 2])[:-3]])
+def test_build_preview_reports_where_the_run_stopped(data):
+    preview = build_preview(data)
+
+    assert preview.error
+
+
+@patch("src.handlers.preview_handlers.st")
+def test_handle_streamlit_preview_lists_globals_calls_and_payloads(mock_st):
+    data = pickle.dumps(RunsShell()) + MISSING
+
+    handle_streamlit_preview("digest", lambda: memoryview(data))
+
+    tables = [call.args[0] for call in mock_st.dataframe.call_args_list]
+    assert list(tables[0]["name"]) == ["system", "Missing"]
+    assert len(tables[1]) == 2
+    assert list(tables[2]["opcode"]) == ["BINBYTES"]
+    mock_st.warning.assert_not_called()
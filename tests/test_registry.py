@@ -0,0 +1,94 @@
+import collections
+import sys
+from types import ModuleType, SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.handlers import registry
+from src.handlers.registry import Handler, HandlerRegistry, get_handler_registry
+
+rendered = []
+
+
+def render_with_options(obj, were_spared_objs, display):
+    rendered.append((obj, were_spared_objs, display))
+
+
+def test_dispatch_follows_the_method_resolution_order():
+    handlers = HandlerRegistry()
+    mapping = handlers.register(Handler("mapping", [dict], render=print))
+    ordered = handlers.register(Handler("ordered", [collections.OrderedDict], render=print))
+
+    assert handlers.dispatch({}) is mapping
+    assert handlers.dispatch(collections.OrderedDict()) is ordered
+    assert handlers.dispatch(collections.defaultdict(list)) is mapping
+    assert handlers.dispatch([]) is None
+
+
+def test_dispatch_tries_the_handlers_of_a_type_in_turn():
+    handlers = HandlerRegistry()
+    large = handlers.register(Handler("large", [list], render=print, accepts=lambda obj: len(obj) > 2))
+    small = handlers.register(Handler("small", [list], render=print))
+
+    assert handlers.dispatch([1, 2, 3]) is large
+    assert handlers.dispatch([1]) is small
+
+
+def test_handlers_of_a_type_are_cached_until_a_handler_is_registered():
+    handlers = HandlerRegistry()
+    handlers.register(Handler("any", [object], render=print))
+
+    assert handlers.handlers_for(int) is handlers.handlers_for(int)
+
+    first = handlers.handlers_for(int)
+    handlers.register(Handler("int", [int], render=print))
+    assert [handler.name for handler in handlers.handlers_for(int)] == ["int", "any"]
+    assert first is not handlers.handlers_for(int)
+
+
+def test_type_names_are_resolved_once_their_module_is_imported(monkeypatch):
+    handlers = HandlerRegistry()
+    thing = handlers.register(Handler("thing", ["picklevw_registry_module.Thing"], render=print))
+
+    assert handlers.dispatch(object()) is None
+    assert "picklevw_registry_module" not in sys.modules
+
+    module = ModuleType("picklevw_registry_module")
+    module.Thing = type("Thing", (), {})
+    monkeypatch.setitem(sys.modules, "picklevw_registry_module", module)
+
+    assert handlers.dispatch(module.Thing()) is thing
+
+
+def test_handler_resolves_references_and_passes_its_options():
+    rendered.clear()
+    handler = Handler(
+        "counter", [str], render=f"{__name__}:render_with_options", summarize="collections:Counter",
+        options=("were_spared_objs", "display"),
+    )
+
+    handler.render("aab", display=print, were_spared_objs=True)
+
+    assert rendered == [("aab", True, print)]
+    assert handler.summarize("aab") == {"a": 2, "b": 1}
+    assert Handler("silent", [str], render=print).summarize("aab") == {}
+
+
+def test_plugins_take_precedence_over_the_builtin_handlers(monkeypatch):
+    plugin = Handler("plugin", [dict], render=print)
+    broken = MagicMock(side_effect=ImportError("missing dependency"))
+    entry_points = MagicMock(return_value=[
+        SimpleNamespace(name="one", load=lambda: plugin),
+        SimpleNamespace(name="many", load=lambda: [Handler("sets", [set], render=print)]),
+        SimpleNamespace(name="broken", load=broken),
+    ])
+    monkeypatch.setattr(registry.metadata, "entry_points", entry_points)
+
+    with pytest.warns(UserWarning, match="'broken': missing dependency"):
+        handlers = get_handler_registry.__wrapped__()
+
+    entry_points.assert_called_once_with(group=registry.ENTRY_POINT_GROUP)
+    assert handlers.dispatch({"a": 1}) is plugin
+    assert handlers.dispatch({1}).name == "sets"
+    assert handlers.dispatch([1]).name == "json"
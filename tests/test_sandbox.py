@@ -0,0 +1,192 @@
+import collections
+import os
+import pickle
+import signal
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.buffers import SharedBuffer
+from src.sandbox import ExceptionSandboxFailure, SandboxPool, SandboxedObjectStream, _hand_off, resource
+
+
+class Call:
+    """Pickles as a call to ``func(*args)``, which is run by whoever unpickles it."""
+
+    def __init__(self, func, *args):
+        self.func, self.args = func, args
+
+    def __reduce__(self):
+        return self.func, self.args
+
+
+GET_PID = pickle.dumps(Call(os.getpid))
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def factory(**kwargs):
+        options = {"workers": 1, "timeout": 10.0, "start_method": "forkserver", "preload": ("numpy", "pandas")}
+        pools.append(SandboxPool(**{**options, **kwargs}))
+        return pools[-1]
+
+    yield factory
+    for pool in pools:
+        pool.close()
+
+
+@pytest.fixture
+def pool(make_pool):
+    return make_pool()
+
+
+def test_hand_off_leaves_array_data_out_of_the_pickle():
+    header, payload = _hand_off({"images": np.zeros((100, 32, 32, 3), dtype=np.uint8)})
+
+    assert header["segment"] is not None
+    assert header["sizes"] == [100 * 32 * 32 * 3]
+    assert len(payload) < 1_000
+
+
+def test_sandbox_pool_unpickles_in_a_worker_process(pool):
+    assert pool.load(GET_PID) != os.getpid()
+    assert pool.load(pickle.dumps({"a": [1, 2]})) == {"a": [1, 2]}
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        np.arange(100_000, dtype=np.float32).reshape(100, -1).T,
+        pd.DataFrame({"a": np.arange(1_000), "b": ["x"] * 1_000}),
+        pd.Series(np.arange(10), name="s"),
+    ],
+)
+def test_sandbox_pool_hands_arrays_and_pandas_objects_back(pool, obj):
+    result = pool.load(pickle.dumps(obj))
+
+    if isinstance(obj, np.ndarray):
+        np.testing.assert_array_equal(result, obj)
+        assert result.flags.writeable
+    else:
+        assert result.equals(obj)
+
+
+def test_sandbox_pool_reports_unpicklable_data(pool):
+    with pytest.raises(pickle.UnpicklingError):
+        pool.load(b"garbage")
+
+    assert pool.load(pickle.dumps(1)) == 1
+
+
+def test_sandbox_pool_kills_workers_running_past_the_timeout(make_pool):
+    pool = make_pool(timeout=0.5)
+    pid = pool.load(GET_PID)
+    start = time.perf_counter()
+
+    with pytest.raises(ExceptionSandboxFailure, match="SANDBOX_JOB_TIMEOUT"):
+        pool.load(pickle.dumps(Call(time.sleep, 30)))
+
+    assert time.perf_counter() - start < 5
+    assert pool.load(GET_PID) not in (pid, os.getpid())
+
+
+def test_sandbox_pool_replaces_crashed_workers(pool):
+    with pytest.raises(ExceptionSandboxFailure, match="exited with status 3"):
+        pool.load(pickle.dumps(Call(os._exit, 3)))
+
+    assert pool.load(pickle.dumps("still serving")) == "still serving"
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGRTMIN"), reason="real-time signals only exist on some platforms")
+def test_sandbox_pool_reports_workers_killed_by_unnamed_signals(pool):
+    with pytest.raises(ExceptionSandboxFailure, match=f"was killed by signal {signal.SIGRTMIN + 6}"):
+        pool.load(pickle.dumps(Call(signal.raise_signal, signal.SIGRTMIN + 6)))
+
+
+def test_sandbox_pool_refuses_results_it_would_have_to_unpickle_in_full(pool):
+    with pytest.raises(ExceptionSandboxFailure, match="collections.Counter"):
+        pool.load(pickle.dumps(collections.Counter("ab")))
+
+    assert pool.load(pickle.dumps(collections.OrderedDict(a=1))) == {"a": 1}
+
+
+@pytest.mark.skipif(resource is None, reason="resource limits are only set where the resource module exists")
+def test_sandbox_pool_limits_the_memory_of_workers(make_pool):
+    pool = make_pool(max_memory=256 * 1024 ** 2)
+
+    with pytest.raises(ExceptionSandboxFailure, match="SANDBOX_MAX_MEMORY_BYTES"):
+        pool.load(pickle.dumps(Call(bytearray, 8 * 1024 ** 3)))
+
+    assert pool.load(pickle.dumps(bytearray(1024))) == bytearray(1024)
+
+
+@pytest.mark.skipif(resource is None, reason="resource limits are only set where the resource module exists")
+def test_sandbox_pool_limits_the_cpu_time_of_jobs(make_pool):
+    pool = make_pool(cpu_seconds=1)
+
+    with pytest.raises(ExceptionSandboxFailure, match="SANDBOX_JOB_CPU_SECONDS"):
+        pool.load(pickle.dumps(Call(eval, "sum(range(10 ** 12))")))
+
+
+def test_sandbox_pool_recycles_workers_after_max_jobs(make_pool):
+    pool = make_pool(max_jobs=2)
+
+    pids = [pool.load(GET_PID) for _ in range(3)]
+
+    assert pids[0] == pids[1] != pids[2]
+
+
+def test_sandboxed_object_stream_unpickles_each_object_in_a_worker(pool):
+    parts = [pickle.dumps("first"), GET_PID, pickle.dumps(np.arange(3))]
+    offsets = [0, len(parts[0]), len(parts[0]) + len(parts[1])]
+
+    stream = SandboxedObjectStream(SharedBuffer(b"".join(parts)), offsets, pool)
+
+    assert stream[0] == "first"
+    assert stream[1] != os.getpid()
+    np.testing.assert_array_equal(stream[-1], np.arange(3))
+
+
+@pytest.fixture
+def bypassed_loader(pool, monkeypatch):
+    import src.utils as utils
+    from fickling.exception import UnsafeFileError
+
+    monkeypatch.setitem(utils.cfg.CONFIG, "SANDBOX_WORKERS", 1)
+    monkeypatch.setattr(utils, "get_sandbox_pool", lambda: pool)
+    monkeypatch.setattr(
+        utils.PickleSecurityChecker,
+        "ensure_safe",
+        MagicMock(side_effect=UnsafeFileError(info="unsafe", filepath="file.pkl")),
+    )
+
+    def factory(data):
+        return utils.PickleLoader(SharedBuffer(data), allow_unsafe_file=True)
+
+    return factory
+
+
+def test_pickle_loader_unpickles_bypassed_files_in_the_sandbox(bypassed_loader):
+    import src.utils as utils
+
+    loader = bypassed_loader(GET_PID + pickle.dumps(np.arange(3)))
+
+    stream, multiple, _ = loader.load()
+
+    assert isinstance(stream, utils.SandboxedObjectStream)
+    assert multiple is True
+    assert stream[0] != os.getpid()
+    assert loader.verdict == "bypassed"
+
+
+def test_pickle_loader_reports_files_killed_in_the_sandbox(bypassed_loader):
+    loader = bypassed_loader(pickle.dumps(Call(os._exit, 1)))
+
+    with pytest.raises(ExceptionSandboxFailure):
+        loader.load()
+    assert loader.verdict == "killed"
@@ -0,0 +1,70 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.sizing import deep_size, estimate_size, format_bytes, shallow_size
+
+
+def test_estimate_size_walks_nested_containers_once():
+    shared = ["x" * 100]
+    obj = {"a": shared, "b": shared, "c": (1.5,)}
+
+    estimate = estimate_size(obj, max_nodes=1_000)
+
+    assert estimate.complete
+    # The dict, its 3 keys, the shared list and its string, the tuple and its float:
+    assert estimate.nodes == 8
+    assert estimate.nbytes >= sys.getsizeof(obj) + sys.getsizeof(shared[0])
+
+
+def test_estimate_size_stops_at_the_node_budget():
+    obj = [[i] for i in range(100_000)]
+
+    estimate = estimate_size(obj, max_nodes=50)
+
+    assert not estimate.complete
+    assert estimate.nodes == 50
+    assert estimate.nbytes >= sys.getsizeof(obj)
+
+
+def test_estimate_size_is_complete_when_the_budget_is_just_enough():
+    assert estimate_size([1.5, 2.5], max_nodes=3).complete
+    assert not estimate_size([1.5, 2.5], max_nodes=2).complete
+
+
+def test_shallow_size_counts_array_and_frame_buffers():
+    arr = np.zeros(1_000)
+    df = pd.DataFrame({"a": np.zeros(1_000)})
+
+    assert shallow_size(arr) >= arr.nbytes
+    assert shallow_size(arr[::2]) == arr[::2].nbytes
+    assert shallow_size(df) >= 8_000
+
+
+def test_format_bytes():
+    assert format_bytes(10) == "10 B"
+    assert format_bytes(1536) == "1.5 KiB"
+    assert format_bytes(3 * 1024 ** 3) == "3.0 GiB"
+
+
+def test_deep_size_counts_the_objects_stored_in_frames():
+    df = pd.DataFrame({"a": pd.Series(["x" * 1_000] * 10, dtype=object)})
+
+    assert deep_size(df) >= shallow_size(df) + 10 * 1_000
+    assert deep_size(df["a"]) >= 10 * 1_000
+    assert deep_size([1, 2]) == shallow_size([1, 2])
+
+
+def test_deep_estimate_walks_object_arrays():
+    arr = np.empty(3, dtype=object)
+    arr[:] = ["x" * 1_000, "y" * 1_000, arr]
+
+    shallow = estimate_size(arr, max_nodes=100)
+    deep = estimate_size(arr, max_nodes=100, deep=True)
+
+    assert shallow.nodes == 1
+    # The array and its strings, the array itself being visited once:
+    assert deep.nodes == 3 and deep.complete
+    assert deep.nbytes >= shallow.nbytes + 2 * 1_000
+    assert not estimate_size(arr, max_nodes=2, deep=True).complete
@@ -0,0 +1,82 @@
+import io
+import pickle
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.handlers import stream_handlers
+from src.handlers.stream_handlers import UnreadableObject, handle_streamlit_object_stream, load_page
+from src.opcodes import scan_opcodes
+from src.streams import PickleObjectStream
+
+
+def stream_of(*objects, unpickler=pickle.Unpickler):
+    data = b"".join(pickle.dumps(obj) for obj in objects)
+    return PickleObjectStream(io.BytesIO(data), scan_opcodes(data).object_offsets, unpickler=unpickler)
+
+
+class CountingUnpickler(pickle.Unpickler):
+    loaded = []
+
+    def load(self):
+        obj = super().load()
+        CountingUnpickler.loaded.append(obj)
+        return obj
+
+
+@pytest.fixture
+def mock_st():
+    with patch("src.handlers.stream_handlers.st") as mock_st:
+        mock_st.columns.side_effect = lambda spec: [MagicMock() for _ in range(len(spec))]
+        mock_st.number_input.return_value = 2
+        mock_st.selectbox.side_effect = lambda label, options, **kwargs: options[1]
+        yield mock_st
+
+
+def test_load_page_marks_the_objects_that_cannot_be_unpickled():
+    class Refusing(pickle.Unpickler):
+        def find_class(self, module, name):
+            raise pickle.UnpicklingError(f"{module}.{name}")
+
+    page = load_page(stream_of(1, complex(3, 4), "x", unpickler=Refusing), 0, 3)
+
+    assert page[0] == 1
+    assert isinstance(page[1], UnreadableObject)
+    assert page[2] == "x"
+
+
+def test_handle_streamlit_object_stream_only_unpickles_the_page_on_display(mock_st, monkeypatch):
+    monkeypatch.setitem(stream_handlers.cfg.CONFIG, "STREAM_PAGE_SIZE", 10)
+    CountingUnpickler.loaded = []
+    stream = stream_of(*range(100), unpickler=CountingUnpickler)
+    display = MagicMock()
+
+    handle_streamlit_object_stream(stream, display)
+
+    assert CountingUnpickler.loaded == list(range(10, 20))
+    display.assert_called_once_with(11)
+    assert list(mock_st.selectbox.call_args.args[1]) == list(range(10, 20))
+
+
+def test_handle_streamlit_object_stream_caches_the_page_on_display(mock_st, monkeypatch):
+    monkeypatch.setitem(stream_handlers.cfg.CONFIG, "STREAM_PAGE_SIZE", 10)
+    CountingUnpickler.loaded = []
+    stream = stream_of(*range(100), unpickler=CountingUnpickler)
+
+    handle_streamlit_object_stream(stream, MagicMock())
+    handle_streamlit_object_stream(stream, MagicMock())
+
+    assert CountingUnpickler.loaded == list(range(10, 20))
+
+
+def test_handle_streamlit_object_stream_does_not_display_unreadable_objects(mock_st):
+    class Refusing(pickle.Unpickler):
+        def find_class(self, module, name):
+            raise pickle.UnpicklingError(f"{module}.{name}")
+
+    mock_st.number_input.return_value = 1
+    display = MagicMock()
+
+    handle_streamlit_object_stream(stream_of(1, complex(3, 4), unpickler=Refusing), display)
+
+    display.assert_not_called()
@@ -0,0 +1,54 @@
+import io
+import pickle
+
+import pytest
+
+from src.streams import PickleObjectStream
+from src.opcodes import scan_opcodes
+
+
+def stream_of(*objects, unpickler=pickle.Unpickler):
+    data = b"".join(pickle.dumps(obj) for obj in objects)
+    return PickleObjectStream(io.BytesIO(data), scan_opcodes(data).object_offsets, unpickler=unpickler)
+
+
+def test_stream_loads_objects_by_position():
+    stream = stream_of("first", {"a": 1}, [2, 3])
+
+    assert len(stream) == 3
+    assert stream[1] == {"a": 1}
+    assert stream[-1] == [2, 3]
+    assert stream[0] == "first"
+
+
+def test_stream_only_unpickles_the_objects_accessed():
+    loaded = []
+
+    class CountingUnpickler(pickle.Unpickler):
+        def load(self):
+            obj = super().load()
+            loaded.append(obj)
+            return obj
+
+    stream = stream_of(*range(1000), unpickler=CountingUnpickler)
+
+    assert stream[5432 % 1000] == 432
+    assert stream[10:13] == [10, 11, 12]
+    assert loaded == [432, 10, 11, 12]
+
+
+def test_stream_iterates_over_every_object():
+    stream = stream_of("first", 2, None)
+
+    assert list(stream) == ["first", 2, None]
+    assert 2 in stream
+
+
+@pytest.mark.parametrize("index", [3, -4])
+def test_stream_raises_index_error_out_of_range(index):
+    with pytest.raises(IndexError):
+        stream_of("first", 2, None)[index]
+
+
+def test_stream_repr_does_not_unpickle():
+    assert repr(stream_of(1, 2)) == "<PickleObjectStream of 2 objects>"
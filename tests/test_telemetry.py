@@ -0,0 +1,241 @@
+import gzip
+import io
+import json
+import pickle
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+import config as cfg
+import telemetry  # Not src.telemetry: the loaders time their stages against the top-level module
+from telemetry import Metrics, Trace, measure, span, timed, trace
+from utils import PickleLoader
+
+
+def stages(current):
+    return [(span.stage, span.depth) for span in current.spans]
+
+
+def test_spans_are_listed_in_the_order_they_were_entered():
+    with trace("file.pkl", force=True, publish=False) as current:
+        with span("outer"):
+            with span("inner"):
+                pass
+        with span("next"):
+            pass
+
+    assert current.label == "file.pkl"
+    assert stages(current) == [("outer", 0), ("inner", 1), ("next", 0)]
+    outer, inner, following = current.spans
+    assert outer.start <= inner.start and inner.seconds <= outer.seconds
+    assert following.start >= outer.start + outer.seconds
+    assert current.seconds >= sum(span.seconds for span in current.spans if span.depth == 0)
+    assert current.peak_bytes is None and outer.peak_bytes is None
+
+
+def test_nothing_is_timed_unless_telemetry_is_enabled(monkeypatch):
+    monkeypatch.setitem(cfg.CONFIG, "TELEMETRY", False)
+    monkeypatch.setitem(cfg.CONFIG, "DEBUG_MODE", False)
+
+    with trace() as current:
+        assert span("stage") is span("other")
+
+    assert current is None
+
+    monkeypatch.setitem(cfg.CONFIG, "DEBUG_MODE", True)
+    with trace(publish=False) as current:
+        pass
+    assert isinstance(current, Trace)
+
+
+def test_timed_functions_are_spans_of_the_current_trace():
+    @timed("double")
+    def double(value):
+        return value * 2
+
+    assert double(2) == 4
+    with trace(force=True, publish=False) as current:
+        assert double(3) == 6
+
+    assert stages(current) == [("double", 0)]
+    assert double.__name__ == "double"
+
+
+def test_spans_are_recorded_when_the_block_raises():
+    with pytest.raises(ValueError):
+        with trace(force=True, publish=False) as current:
+            with span("failing"):
+                raise ValueError
+
+    assert stages(current) == [("failing", 0)]
+    assert current.record()["seconds"] >= current.record()["stages"][0]["seconds"]
+
+
+def test_exposition_counts_loads_and_stage_durations():
+    metrics = Metrics((0.1, 1.0))
+    metrics.observe({"seconds": 0.5, "verdict": "safe", "stages": [{"stage": "read", "seconds": 0.05}]})
+    metrics.observe({"seconds": 2.0, "verdict": "safe", "stages": [{"stage": "read", "seconds": 0.5}]})
+    metrics.observe({"seconds": 0.01, "verdict": "unsafe", "stages": []})
+
+    exposition = metrics.exposition()
+
+    process = 'role="app"'
+    assert f'picklevw_loads_total{{{process},verdict="safe"}} 2' in exposition
+    assert f'picklevw_loads_total{{{process},verdict="unsafe"}} 1' in exposition
+    assert f'picklevw_stage_seconds_bucket{{{process},stage="read",le="0.1"}} 1' in exposition
+    assert f'picklevw_stage_seconds_bucket{{{process},stage="read",le="1.0"}} 2' in exposition
+    assert f'picklevw_stage_seconds_bucket{{{process},stage="total",le="1.0"}} 2' in exposition
+    assert f'picklevw_stage_seconds_bucket{{{process},stage="total",le="+Inf"}} 3' in exposition
+    assert f'picklevw_stage_seconds_sum{{{process},stage="read"}} 0.55' in exposition
+    assert f'picklevw_stage_seconds_count{{{process},stage="total"}} 3' in exposition
+    assert exposition.endswith("\n")
+
+
+def test_published_traces_are_exported(telemetry_dir, monkeypatch):
+    monkeypatch.setattr(telemetry, "METRICS", Metrics(cfg.CONFIG["TELEMETRY_BUCKETS"]))
+
+    with trace("file.pkl", force=True) as current:
+        current.attributes["verdict"] = 'quoted "verdict"'
+        with span("read"):
+            pass
+
+    record = json.loads((telemetry_dir / telemetry.JSONL_FILENAME).read_text())
+    assert record["label"] == "file.pkl"
+    assert record["verdict"] == 'quoted "verdict"'
+    assert [stage["stage"] for stage in record["stages"]] == ["read"]
+    prometheus_filename = telemetry.PROMETHEUS_FILENAME.format(role="app")
+    exposition = (telemetry_dir / prometheus_filename).read_text()
+    assert 'verdict="quoted \\"verdict\\""} 1' in exposition
+    assert sorted(path.name for path in telemetry_dir.iterdir()) == sorted([telemetry.JSONL_FILENAME, prometheus_filename])
+
+
+def test_processes_of_a_role_combine_their_metrics_in_one_file(telemetry_dir):
+    record = {"seconds": 0.5, "verdict": 'quoted "verdict"', "stages": [{"stage": "read", "seconds": 2.0}]}
+    Metrics((1.0,), role="app").publish(record)
+    Metrics((1.0,), role="app").publish(record)
+    Metrics((1.0,), role="cli").publish(record)
+
+    app = (telemetry_dir / telemetry.PROMETHEUS_FILENAME.format(role="app")).read_text()
+    assert 'picklevw_loads_total{role="app",verdict="quoted \\"verdict\\""} 2' in app
+    assert 'picklevw_stage_seconds_bucket{role="app",stage="read",le="1.0"} 0' in app
+    assert 'picklevw_stage_seconds_bucket{role="app",stage="read",le="+Inf"} 2' in app
+    assert 'picklevw_stage_seconds_sum{role="app",stage="read"} 4.0' in app
+    cli = (telemetry_dir / telemetry.PROMETHEUS_FILENAME.format(role="cli")).read_text()
+    assert 'picklevw_loads_total{role="cli",verdict="quoted \\"verdict\\""} 1' in cli
+    assert len((telemetry_dir / telemetry.JSONL_FILENAME).read_text().splitlines()) == 3
+
+
+def test_metrics_exported_with_other_buckets_are_started_over(telemetry_dir):
+    record = {"seconds": 0.5, "verdict": "safe", "stages": []}
+    Metrics((1.0,)).publish(record)
+    Metrics((0.1, 1.0)).publish(record)
+
+    exposition = (telemetry_dir / telemetry.PROMETHEUS_FILENAME.format(role="app")).read_text()
+    assert 'picklevw_loads_total{role="app",verdict="safe"} 1' in exposition
+    assert 'picklevw_stage_seconds_bucket{role="app",stage="total",le="0.1"} 0' in exposition
+
+
+def test_failing_to_export_does_not_fail_the_load(tmp_path, monkeypatch):
+    (tmp_path / "file").write_text("")
+    monkeypatch.setitem(cfg.CONFIG, "TELEMETRY_DIR", str(tmp_path / "file"))
+
+    with trace(force=True):
+        pass
+
+
+def test_loads_time_their_stages():
+    buffer = io.BytesIO(gzip.compress(pickle.dumps({"a": [1, 2]})))
+
+    with trace(force=True, publish=False) as current:
+        PickleLoader(buffer).load()
+
+    names = [stage for stage, _ in stages(current)]
+    assert names == ["read", "decompress", "unpickle_plain"]
+
+
+def test_allowlisted_loads_time_their_stages():
+    buffer = io.BytesIO(pickle.dumps(pd.DataFrame({"a": [1, 2]})))
+
+    with trace(force=True, publish=False) as current:
+        PickleLoader(buffer).load()
+
+    assert stages(current) == [
+        ("read", 0), ("decompress", 0), ("unpickle_plain", 0), ("scan_opcodes", 0), ("unpickle_allowlisted", 0)
+    ]
+
+
+def test_streams_of_plain_data_time_their_stages():
+    buffer = io.BytesIO(pickle.dumps({"a": 1}) + pickle.dumps([2]))
+
+    with trace(force=True, publish=False) as current:
+        PickleLoader(buffer).load()
+
+    names = [stage for stage, _ in stages(current)]
+    assert {"unpickle_plain", "scan_opcodes", "safety_check", "unpickle"} <= set(names)
+    assert names.index("unpickle_plain") < names.index("scan_opcodes")
+
+
+def test_memory_peaks_are_recorded_per_stage():
+    with trace(memory=True, publish=False) as current:
+        assert tracemalloc.is_tracing()
+        with span("outer"):
+            with span("inner"):
+                block = bytearray(4_000_000)
+                del block
+            with span("small"):
+                pass
+
+    assert not tracemalloc.is_tracing()
+    outer, inner, small = current.spans
+    assert inner.peak_bytes >= 4_000_000
+    assert outer.peak_bytes >= inner.peak_bytes
+    assert small.peak_bytes < 1_000_000
+    assert current.peak_bytes >= outer.peak_bytes
+    assert current.record()["stages"][1]["peak_bytes"] == inner.peak_bytes
+    assert "rss_delta" in current.record()["stages"][1]
+
+
+def test_memory_profiling_leaves_tracemalloc_running_if_started_elsewhere():
+    tracemalloc.start()
+    try:
+        with trace(memory=True, publish=False):
+            with trace(memory=True, publish=False):
+                pass
+            assert tracemalloc.is_tracing()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_memory_profiling_measures_the_loaded_object():
+    obj = {"frame": pd.DataFrame({"a": ["x" * 100] * 100})}
+
+    measure(obj)  # Outside of a trace, nothing is measured
+    with trace(force=True, publish=False) as current:
+        measure(obj)
+    assert "deep_size" not in current.attributes
+
+    with trace(memory=True, publish=False) as current:
+        PickleLoader(io.BytesIO(pickle.dumps(obj))).load()
+
+    assert current.attributes["deep_size"]["nbytes"] >= 100 * 100
+    assert current.attributes["deep_size"]["complete"]
+    assert current.spans[-1].stage == "deep_size"
+
+
+def test_timings_table_lists_memory_columns_when_profiling():
+    from handlers.timing_handlers import timings_table
+
+    with trace(force=True, publish=False) as timed_only:
+        with span("read"):
+            pass
+    with trace(memory=True, publish=False) as profiled:
+        with span("read"):
+            with span("decompress"):
+                pass
+
+    assert list(timings_table(timed_only).columns) == ["stage", "start (ms)", "duration (ms)"]
+    table = timings_table(profiled)
+    assert list(table.columns) == ["stage", "start (ms)", "duration (ms)", "peak", "RSS delta"]
+    assert list(table["stage"]) == ["read", " decompress"]
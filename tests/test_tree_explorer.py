@@ -0,0 +1,94 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.handlers import tree_handlers
+from src.handlers.tree_handlers import describe, handle_streamlit_tree, iter_children, resolve, should_explore
+
+
+class SessionState(dict):
+    pass
+
+
+@pytest.fixture
+def mock_st():
+    with patch("src.handlers.tree_handlers.st") as mock_st:
+        mock_st.session_state = SessionState()
+        mock_st.columns.side_effect = lambda spec: [MagicMock() for _ in range(spec if isinstance(spec, int) else len(spec))]
+        mock_st.button.return_value = False
+        yield mock_st
+
+
+def test_should_explore_only_large_containers(monkeypatch):
+    monkeypatch.setitem(tree_handlers.cfg.CONFIG, "TREE_MIN_NODES", 100)
+
+    assert should_explore(list(range(1_000)))
+    assert not should_explore(list(range(10)))
+    assert not should_explore("x" * 1_000)
+
+
+@pytest.mark.parametrize(
+    "node, start, stop, expected",
+    [
+        ({"a": 1, "b": 2, "c": 3}, 1, 3, [("b", 2), ("c", 3)]),
+        ([10, 20, 30], 2, 5, [(2, 30)]),
+        ((10, 20), 0, 1, [(0, 10)]),
+        (frozenset({7}), 0, 1, [(0, 7)]),
+    ],
+)
+def test_iter_children_yields_the_requested_page(node, start, stop, expected):
+    assert list(iter_children(node, start, stop)) == expected
+
+
+def test_resolve_follows_keys_and_positions():
+    root = {"a": [{"b": {42}}]}
+
+    assert resolve(root, ("a", 0, "b", 0)) == 42
+    with pytest.raises(LookupError):
+        resolve(root, ("missing",))
+    with pytest.raises(LookupError):
+        resolve(root, ("a", 0, "b", 0, 1))
+
+
+def test_describe_reports_children_and_bounded_size(monkeypatch):
+    monkeypatch.setitem(tree_handlers.cfg.CONFIG, "TREE_SIZE_NODES", 10)
+
+    kind, size = describe(list(range(100)))
+
+    assert kind == "list of 100"
+    assert size.startswith("≥ ")
+
+
+def test_handle_streamlit_tree_renders_one_page_of_the_opened_node(mock_st, monkeypatch):
+    monkeypatch.setitem(tree_handlers.cfg.CONFIG, "TREE_PAGE_SIZE", 10)
+    mock_st.number_input.return_value = 2
+    root = {"items": [[i] for i in range(25)], "meta": {"v": 1}}
+    mock_st.session_state.update(tree_root=id(root), tree_path=("items",))
+
+    handle_streamlit_tree(root)
+
+    mock_st.write.assert_called_once_with("list of 25, " + describe(root["items"])[1])
+    assert mock_st.number_input.call_args.kwargs["max_value"] == 3
+    assert mock_st.columns.call_count == 1 + 10  # The breadcrumbs, then one row per child
+    mock_st.download_button.assert_not_called()
+
+
+def test_handle_streamlit_tree_resets_the_path_of_a_new_object(mock_st):
+    mock_st.session_state.update(tree_root=-1, tree_path=("gone",))
+
+    handle_streamlit_tree({"a": 1})
+
+    assert mock_st.session_state["tree_path"] == ()
+
+
+def test_handle_streamlit_tree_only_serializes_on_export(mock_st, monkeypatch):
+    dumps = MagicMock(return_value="{}")
+    monkeypatch.setattr(tree_handlers.json, "dumps", dumps)
+
+    handle_streamlit_tree({"a": {1, 2}})
+    dumps.assert_not_called()
+
+    mock_st.button.side_effect = lambda label, key, **kwargs: key == "tree_export"
+    handle_streamlit_tree({"a": {1, 2}})
+    dumps.assert_called_once()
+    mock_st.download_button.assert_called_once()
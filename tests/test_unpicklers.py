@@ -0,0 +1,92 @@
+import io
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.opcodes import scan_opcodes
+from src.unpicklers import ALLOWED_GLOBALS, AllowlistUnpickler, PlainDataUnpickler
+
+SCIENTIFIC_OBJECTS = [
+    np.arange(12, dtype=np.float32).reshape(3, 4),
+    np.float64(1.5),
+    pd.DataFrame({"a": [1, 2], "b": ["x", "y"], "c": pd.to_datetime(["2024-01-01", "2024-01-02"])}),
+    pd.Series([1.0, None], index=pd.Index(["x", "y"], name="k"), dtype="Float64"),
+    pd.Categorical(["a", "b", "a"]),
+]
+
+
+class Exploit:
+    def __reduce__(self):
+        return os.system, ("echo pwned",)
+
+
+@pytest.mark.parametrize("protocol", range(2, pickle.HIGHEST_PROTOCOL + 1))
+@pytest.mark.parametrize("obj", SCIENTIFIC_OBJECTS)
+def test_scientific_pickles_only_import_allowlisted_globals(obj, protocol):
+    data = pickle.dumps(obj, protocol=protocol)
+
+    assert scan_opcodes(data).only_imports(ALLOWED_GLOBALS)
+    loaded = AllowlistUnpickler(io.BytesIO(data)).load()
+    assert type(loaded) is type(obj)
+
+
+def test_allowlist_unpickler_refuses_other_globals():
+    data = pickle.dumps(Exploit())
+
+    assert not scan_opcodes(data).only_imports(ALLOWED_GLOBALS)
+    with pytest.raises(pickle.UnpicklingError, match="not allowlisted"):
+        AllowlistUnpickler(io.BytesIO(data)).load()
+
+
+def test_allowlist_unpickler_refuses_builtin_getattr():
+    data = b"\x80\x02cbuiltins\ngetattr\n."
+
+    with pytest.raises(pickle.UnpicklingError):
+        AllowlistUnpickler(io.BytesIO(data)).load()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"\x80\x02cnumpy\nndarray\nM@\x1f\x85\x85R.",  # numpy.ndarray((8000,)), uninitialized
+        b"\x80\x02cnumpy\nndarray\nJ\x00\xe1\xf5\x05\x85\x85R.",  # numpy.ndarray((100_000_000,)), 800 MB
+        b"\x80\x02cpandas\nDataFrame\nN\x85R.",
+    ],
+)
+def test_allowlist_unpickler_refuses_to_call_rebuilt_classes(data):
+    assert scan_opcodes(data).only_imports(ALLOWED_GLOBALS)
+    with pytest.raises(pickle.UnpicklingError, match="can only be rebuilt"):
+        AllowlistUnpickler(io.BytesIO(data)).load()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        # numpy.core.multiarray._reconstruct(numpy.ndarray, (100_000_000,), b"b"):
+        b"\x80\x02cnumpy.core.multiarray\n_reconstruct\ncnumpy\nndarray\nJ\x00\xe1\xf5\x05\x85U\x01b\x87R.",
+        # bytearray(100_000_000):
+        b"\x80\x02c__builtin__\nbytearray\nJ\x00\xe1\xf5\x05\x85R.",
+        # pandas.core.indexes.base._new_Index(pandas.RangeIndex, {"start": 0, "stop": 2**44, "step": 1}):
+        b"\x80\x02cpandas.core.indexes.base\n_new_Index\ncpandas\nRangeIndex\n}(X\x05\x00\x00\x00startK\x00"
+        b"X\x04\x00\x00\x00stop\x8a\x06\x00\x00\x00\x00\x00\x10X\x04\x00\x00\x00stepK\x01u\x86R.",
+    ],
+)
+def test_allowlist_unpickler_refuses_to_allocate_what_the_pickle_does_not_hold(data):
+    with pytest.raises(pickle.UnpicklingError):
+        AllowlistUnpickler(io.BytesIO(data)).load()
+
+
+@pytest.mark.parametrize("protocol", range(0, pickle.HIGHEST_PROTOCOL + 1))
+def test_plain_data_unpickler_reads_builtin_containers_and_scalars(protocol):
+    obj = {"a": [1, 2.5, None, True], "b": ("x", "y"), "c": {"d": -(1 << 70)}}
+
+    assert PlainDataUnpickler(io.BytesIO(pickle.dumps(obj, protocol=protocol))).load() == obj
+
+
+@pytest.mark.parametrize("obj", [Exploit(), np.arange(3), {1, 2}])
+def test_plain_data_unpickler_refuses_any_global(obj):
+    with pytest.raises(pickle.UnpicklingError, match="not plain data"):
+        PlainDataUnpickler(io.BytesIO(pickle.dumps(obj, protocol=3))).load()
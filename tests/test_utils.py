@@ -1,6 +1,11 @@
 import pytest
+import json
 import gzip
 import pickle
+import subprocess
+import sys
+from pathlib import Path
+import numpy as np
 import pandas as pd
 from io import BytesIO
 from unittest.mock import MagicMock, patch
@@ -60,6 +65,7 @@ def test_pickle_loader_dataframe(mock_ensure_safe, mock_cfg, raw_pickle_df):
     # simulate unsafe pickle
     mock_ensure_safe.side_effect = UnsafeFileError(info="test", filepath="file")
     mock_cfg.MESSAGES = {"POTENTIAL_THREAT": "threat detected"}
+    mock_cfg.CONFIG = {"LOAD_BUDGET_BYTES": 2 * 1024 ** 3, "LOAD_MAX_DEPTH": 10_000}
 
     uploaded_file = create_mock_uploaded_file(raw_pickle_df)
     loader = PickleLoader(uploaded_file, allow_unsafe_file=True)
@@ -81,6 +87,7 @@ def test_pickle_loader_unsafe(mock_ensure_safe, mock_cfg):
         info="Test unsafe file", filepath="test.pickle"
     )
     mock_cfg.MESSAGES = {"POTENTIAL_THREAT": "threat detected"}
+    mock_cfg.CONFIG = {"LOAD_BUDGET_BYTES": 2 * 1024 ** 3, "LOAD_MAX_DEPTH": 10_000}
 
     dummy_data = b"not_really_pickle"
     uploaded_file = create_mock_uploaded_file(dummy_data)
@@ -98,3 +105,133 @@ def test_is_json_serializable():
 
     assert is_json_serializable({"key": "value"})
     assert not is_json_serializable({1, 2, 3})  # set is not JSON serializable
+
+
+def _json_dumps_succeeds(obj):
+    try:
+        json.dumps(obj)
+        return True
+    except (TypeError, ValueError, OverflowError):
+        return False
+
+
+shared = [1, 2]
+cyclic = [1]
+cyclic.append(cyclic)
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        {"a": [1, 2.5, None, True, "x"], "b": ({"c": -1},)},
+        {1: "int key", 2.5: "float key", None: "none key", False: "bool key"},
+        {(1, 2): "tuple key"},
+        [1, [2, [3, [set()]]]],
+        [b"bytes"],
+        {"shared": shared, "again": shared},
+        cyclic,
+        {"value": np.float64(1.5)},
+        {"value": np.int64(1)},
+        "",
+        object(),
+    ],
+)
+def test_is_json_serializable_agrees_with_json_dumps(obj):
+    from src.utils import is_json_serializable
+
+    assert is_json_serializable(obj) is _json_dumps_succeeds(obj)
+
+
+def test_is_json_serializable_stops_at_the_first_unserializable_node(monkeypatch):
+    from src.utils import is_json_serializable
+
+    visited = MagicMock()
+
+    class Trap(list):
+        def __iter__(self):
+            visited()
+            return super().__iter__()
+
+    assert not is_json_serializable([Trap([1]), object()])
+    visited.assert_not_called()
+
+
+def test_serialize_json_matches_json_dumps_within_budget():
+    from src.utils import serialize_json
+
+    obj = {"a": list(range(5)), "b": {"c": None}}
+
+    assert serialize_json(obj, max_chars=10_000) == (json.dumps(obj, indent=4), False)
+
+
+def test_serialize_json_stops_at_the_character_budget(monkeypatch):
+    from src.utils import serialize_json
+
+    produced = []
+    obj = [{"key": i} for i in range(100_000)]
+    expected = json.dumps(obj, indent=4)[:1_000]
+    iterencode = json.JSONEncoder.iterencode
+
+    def counting_iterencode(self, o, _one_shot=False):
+        for chunk in iterencode(self, o, _one_shot):
+            produced.append(chunk)
+            yield chunk
+
+    monkeypatch.setattr(json.JSONEncoder, "iterencode", counting_iterencode)
+    text, truncated = serialize_json(obj, max_chars=1_000)
+
+    assert truncated
+    assert text == expected
+    assert sum(map(len, produced)) < 2_000
+
+
+PEAK_RSS_SCRIPT = """
+import os, sys
+from unittest.mock import MagicMock
+
+sys.path.insert(0, sys.argv[1])
+import utils
+
+def current_rss():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def peak_rss():
+    # Unlike ru_maxrss, VmHWM doesn't inherit the peak of the parent process across exec:
+    with open("/proc/self/status") as status:
+        line = next(line for line in status if line.startswith("VmHWM:"))
+        return int(line.split()[1]) * 1024
+
+with open(sys.argv[2], "rb") as f:
+    data = f.read()
+
+utils.PickleSecurityChecker.ensure_safe = lambda self: None
+uploaded_file = MagicMock()
+uploaded_file.read.return_value = data
+
+before = current_rss()
+obj, _, _ = utils.PickleLoader(uploaded_file).load()
+peak = peak_rss()
+print(peak - before, len(obj))
+"""
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc/self/statm and /proc/self/status")
+def test_pickle_loader_peak_rss_stays_close_to_decompressed_payload(tmp_path):
+    payload_size = 48 * 1024 * 1024
+    path = tmp_path / "payload.pkl.gz"
+    path.write_bytes(gzip.compress(pickle.dumps(bytes(payload_size), protocol=5), compresslevel=1))
+
+    src_dir = Path(__file__).resolve().parent.parent / "src"
+    result = subprocess.run(
+        [sys.executable, "-c", PEAK_RSS_SCRIPT, str(src_dir), str(path)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    peak_growth, loaded_size = map(int, result.stdout.split())
+
+    # The decompressed buffer and the unpickled object are the two copies of the payload that can't be
+    # avoided, and no other copy (not even a partial one) may add more than 10% on top of them:
+    assert loaded_size == payload_size
+    assert peak_growth < 2.1 * payload_size
@@ -0,0 +1,104 @@
+import collections
+import io
+import pickle
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+import src.verdicts as verdicts
+
+
+@pytest.fixture
+def store(verdict_store_dir):
+    return verdicts.VerdictStore(str(verdict_store_dir), max_entries=3)
+
+
+def test_verdict_store_round_trip(store):
+    assert store.get("digest") is None
+
+    store.put("digest", severity=4, size=123)
+
+    assert store.get("digest") == 4
+
+
+def test_verdict_store_persists_across_instances(store, verdict_store_dir):
+    store.put("digest", severity=2, size=1)
+
+    assert verdicts.VerdictStore(str(verdict_store_dir), max_entries=3).get("digest") == 2
+
+
+def test_verdict_store_invalidates_verdicts_of_other_fickling_versions(store, monkeypatch):
+    store.put("digest", severity=2, size=1)
+    monkeypatch.setattr(verdicts, "fickling_version", lambda: "999.0.0")
+
+    assert store.get("digest") is None
+
+
+def test_verdict_store_invalidates_verdicts_of_other_thresholds(store, monkeypatch):
+    store.put("digest", severity=2, size=1)
+    monkeypatch.setitem(verdicts.cfg.CONFIG, "SEVERITY_THRESHOLD", 3)
+
+    assert store.get("digest") is None
+
+
+def test_verdict_store_prunes_least_recently_used_verdicts(store, monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr(verdicts.time, "time", lambda: next(clock))
+    for digest in "abc":
+        store.put(digest, severity=1, size=1)
+    store.get("a")
+    store.put("d", severity=1, size=1)
+
+    assert [store.get(digest) for digest in "abcd"] == [1, None, 1, 1]
+
+
+def test_verdict_store_prunes_least_recently_used_verdicts_by_total_size(verdict_store_dir, monkeypatch):
+    store = verdicts.VerdictStore(str(verdict_store_dir), max_entries=10, max_bytes=100)
+    clock = iter(range(100))
+    monkeypatch.setattr(verdicts.time, "time", lambda: next(clock))
+    for digest in "abc":
+        store.put(digest, severity=1, size=30)
+    store.get("a")
+    store.put("d", severity=1, size=20)
+
+    assert [store.get(digest) for digest in "abcd"] == [1, None, 1, 1]
+
+    store.put("huge", severity=1, size=101)
+
+    assert store.get("huge") is None
+
+
+def test_verdict_store_failures_are_not_fatal(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("a file where the store directory should be")
+    store = verdicts.VerdictStore(str(blocker), max_entries=3)
+
+    store.put("digest", severity=1, size=1)
+
+    assert store.get("digest") is None
+
+
+def test_get_verdict_store_can_be_disabled(monkeypatch):
+    monkeypatch.setitem(verdicts.cfg.CONFIG, "VERDICT_STORE_DIR", None)
+
+    assert verdicts.get_verdict_store() is None
+
+
+def test_security_checker_reuses_stored_verdicts(monkeypatch):
+    import src.utils as utils
+
+    data = pickle.dumps(collections.OrderedDict(a=1))
+    monkeypatch.setattr(utils.Pickled, "load", MagicMock(return_value=object()))
+    monkeypatch.setattr(
+        utils,
+        "check_safety",
+        MagicMock(return_value=SimpleNamespace(severity=SimpleNamespace(value=(5,)))),
+    )
+
+    for _ in range(2):
+        with pytest.raises(utils.UnsafeFileError):
+            utils.PickleSecurityChecker(io.BytesIO(data), digest="digest").ensure_safe()
+
+    utils.Pickled.load.assert_called_once()
+    assert utils.get_verdict_store().get("digest") == 5